@@ -22,12 +22,13 @@ import time
 import traceback
 import unicodedata
 
+from collections import OrderedDict
 from io import StringIO
 from html.parser import HTMLParser
 
 from exceptions_helper import ex, ConnectionSkipException
 from json_helper import json_loads
-from cachecontrol import CacheControl, caches
+from cachecontrol import CacheControlAdapter, caches
 from lib.dateutil.parser import parser
 # from lib.tmdbsimple.configuration import Configuration
 # from lib.tmdbsimple.genres import Genres
@@ -140,6 +141,93 @@ db = None
 NOTIFIERS = None
 
 
+class FailureLedger(object):
+    """
+    Write-behind buffer of provider and domain failures for cache.db
+
+    Failures and fail values are kept in memory and written in one transaction at most `interval` seconds after the
+    first pending write. Old failures are pruned once per flush, and pending writes are flushed on shutdown
+    """
+    def __init__(self, interval=30, prune_days=28):
+        # type: (int, int) -> None
+        self.interval = interval
+        self.prune_days = prune_days
+        self.lock = threading.Lock()
+        self._fails = []  # type: List[Tuple[AnyStr, AnyStr, List]]
+        self._values = OrderedDict()  # type: OrderedDict[Tuple[AnyStr, AnyStr, AnyStr, AnyStr], Any]
+        self._timer = None  # type: Optional[threading.Timer]
+
+    @property
+    def pending(self):
+        # type: (...) -> int
+        return len(self._fails) + len(self._values)
+
+    def _schedule(self):
+        if None is self._timer:
+            self._timer = threading.Timer(self.interval, self.flush)
+            self._timer.name = 'FAILURELEDGER'
+            self._timer.daemon = True
+            self._timer.start()
+
+    def add_fail(self, table, key_field, key, fail_type, fail_code, fail_time):
+        # type: (AnyStr, AnyStr, AnyStr, int, Optional[int], integer_types) -> None
+        """
+        :param table: fails table
+        :param key_field: name of key field in table
+        :param key: provider or domain
+        :param fail_type: fail type
+        :param fail_code: fail code
+        :param fail_time: timestamp of fail
+        """
+        with self.lock:
+            self._fails.append((table, key_field, [key, fail_type, fail_code, fail_time]))
+            self._schedule()
+
+    def set_value(self, table, key_field, key, field, value):
+        # type: (AnyStr, AnyStr, AnyStr, AnyStr, Any) -> None
+        """
+        :param table: fails count table
+        :param key_field: name of key field in table
+        :param key: provider or domain
+        :param field: field to set, a pending value of the same field is replaced
+        :param value: value
+        """
+        with self.lock:
+            self._values[(table, key_field, key, field)] = value
+            self._schedule()
+
+    def flush(self):
+        """
+        write pending failures and values to db
+        """
+        with self.lock:
+            fails, values = self._fails, self._values
+            self._fails, self._values = [], OrderedDict()
+            if None is not self._timer:
+                self._timer.cancel()
+                self._timer = None
+        if None is db or not (fails or values):
+            return
+
+        time_limit = _totimestamp(datetime.datetime.now() - datetime.timedelta(days=self.prune_days))
+        cl = [['DELETE FROM %s WHERE fail_time < ?' % cur_table, [time_limit]]
+              for cur_table in sorted(set([_f[0] for _f in fails]))]
+        for cur_table, cur_key_field, cur_row in fails:
+            cl.append(['INSERT OR IGNORE INTO %s (%s, fail_type, fail_code, fail_time) VALUES (?,?,?,?)'
+                       % (cur_table, cur_key_field), cur_row])
+        for (cur_table, cur_key_field, cur_key, cur_field), cur_value in iteritems(values):
+            cl.append(['INSERT OR IGNORE INTO %s (%s) VALUES (?)' % (cur_table, cur_key_field), [cur_key]])
+            cl.append(['UPDATE %s SET %s = ? WHERE %s = ?' % (cur_table, cur_field, cur_key_field),
+                       [cur_value, cur_key]])
+        try:
+            db.DBConnection('cache.db').mass_action(cl)
+        except (BaseException, Exception) as e:
+            logger.warning('Failed to save %s failure records: %s' % (len(cl), ex(e)))
+
+
+FAILURE_LEDGER = FailureLedger()
+
+
 class ConnectionFailTypes(object):
     http = 1
     connection = 2
@@ -525,10 +613,12 @@ class ConnectionFailList(object):
                 self._fails.append(fail)
                 logger.debug('Adding fail.%s for %s' % (ConnectionFailTypes.names.get(
                     fail.fail_type, ConnectionFailTypes.names[ConnectionFailTypes.other]), self.url))
-            self.save_list()
+            FAILURE_LEDGER.add_fail('connection_fails', 'domain_url', self.url,
+                                    fail.fail_type, fail.code, _totimestamp(fail.fail_time))
 
     def _load_fail_values(self):
         if None is not DATA_DIR:
+            FAILURE_LEDGER.flush()
             my_db = db.DBConnection('cache.db')
             if my_db.has_table('connection_fails_count'):
                 r = my_db.select('SELECT * FROM connection_fails_count WHERE domain_url = ?', [self.url])
@@ -550,36 +640,20 @@ class ConnectionFailList(object):
                 self._last_fail_type = self.last_fail
 
     def _save_fail_value(self, field, value):
-        my_db = db.DBConnection('cache.db')
-        if my_db.has_table('connection_fails_count'):
-            r = my_db.action('UPDATE connection_fails_count SET %s = ? WHERE domain_url = ?' % field,
-                             [value, self.url])
-            if 0 == r.rowcount:
-                my_db.action('REPLACE INTO connection_fails_count (domain_url, %s) VALUES (?,?)' % field,
-                             [self.url, value])
+        FAILURE_LEDGER.set_value('connection_fails_count', 'domain_url', self.url, field, value)
 
     def save_list(self):
+        """
+        write pending failures now instead of on the next ledger flush
+        """
         if self.dirty:
-            self.clear_old()
-            if None is not db:
-                with self.lock:
-                    try:
-                        my_db = db.DBConnection('cache.db')
-                        cl = []
-                        for f in self._fails:
-                            cl.append(['INSERT OR IGNORE INTO connection_fails (domain_url, fail_type, fail_code, '
-                                       'fail_time) '
-                                       'VALUES (?,?,?,?)', [self.url, f.fail_type, f.code,
-                                                            _totimestamp(f.fail_time)]])
-                        self.dirty = False
-                        if cl:
-                            my_db.mass_action(cl)
-                    except (BaseException, Exception):
-                        pass
+            FAILURE_LEDGER.flush()
+            self.dirty = False
             self.last_save = datetime.datetime.now()
 
     def load_list(self):
         if None is not db:
+            FAILURE_LEDGER.flush()
             with self.lock:
                 try:
                     my_db = db.DBConnection('cache.db')
@@ -770,6 +844,144 @@ def proxy_setting(setting, request_url, force=False):
     return (False, proxy_address)[request_url_match], True
 
 
+class SessionManager(object):
+    """
+    Process wide registry of pooled http adapters keyed by host, proxy, and cache use
+
+    A session made by get_url is cheap and keeps its cookies and headers to itself, whereas the adapter mounted on it
+    holds the bounded connection pool that every request to a host reuses (keep-alive, no new TLS handshake).
+    Cached adapters share one cache backend, and each host has a concurrency limit, request count and latency.
+    """
+    def __init__(self, max_hosts=100, pool_maxsize=10, host_concurrency=10):
+        # type: (int, int, int) -> None
+        """
+        :param max_hosts: number of adapters kept, least recently used are closed
+        :param pool_maxsize: number of connections kept open per host
+        :param host_concurrency: number of concurrent requests allowed per host
+        """
+        self.max_hosts = max_hosts
+        self.pool_maxsize = pool_maxsize
+        self.host_concurrency = host_concurrency
+        self.lock = threading.Lock()
+        self._adapters = OrderedDict()  # type: OrderedDict[Tuple, requests.adapters.HTTPAdapter]
+        self._limits = {}  # type: Dict[AnyStr, threading.BoundedSemaphore]
+        self._metrics = {}  # type: Dict[AnyStr, Dict]
+        self._cache = None  # type: Optional[caches.FileCache]
+
+    @staticmethod
+    def get_host(url):
+        # type: (AnyStr) -> AnyStr
+        try:
+            return urlsplit(url).netloc.lower()
+        except (BaseException, Exception):
+            return ''
+
+    @property
+    def cache(self):
+        # type: (...) -> caches.FileCache
+        if None is self._cache:
+            self._cache = caches.FileCache(os.path.join(CACHE_DIR or get_system_temp_dir(), 'sessions'))
+        return self._cache
+
+    def get_adapter(self, url, proxies=None, cached=False):
+        # type: (AnyStr, Optional[Dict], bool) -> requests.adapters.HTTPAdapter
+        """
+        :param url: address of request
+        :param proxies: proxies of session
+        :param cached: True for an adapter that uses the http cache
+        :return: shared adapter for host of url
+        """
+        host = self.get_host(url)
+        key = (host, proxies and tuple(sorted(iteritems(proxies))) or None, cached)
+        with self.lock:
+            adapter = self._adapters.pop(key, None)
+            if None is adapter:
+                # a few pools per adapter serve redirects to other hosts
+                pool_kwargs = dict(pool_connections=4, pool_maxsize=self.pool_maxsize)
+                if cached:
+                    adapter = CacheControlAdapter(self.cache, **pool_kwargs)
+                else:
+                    adapter = requests.adapters.HTTPAdapter(**pool_kwargs)
+            self._adapters[key] = adapter
+            while self.max_hosts < len(self._adapters):
+                (old_host, _, _), old_adapter = self._adapters.popitem(last=False)
+                old_adapter.close()
+                if not any(old_host == _k[0] for _k in self._adapters):
+                    self._limits.pop(old_host, None)
+        return adapter
+
+    def mount(self, session, url, cached=False):
+        # type: (requests.Session, AnyStr, bool) -> None
+        """
+        mount shared adapter for host of url on session
+        """
+        adapter = self.get_adapter(url, session.proxies, cached)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    def limit(self, url):
+        # type: (AnyStr) -> threading.BoundedSemaphore
+        """
+        :param url: address of request
+        :return: semaphore that limits concurrent requests to host of url
+        """
+        host = self.get_host(url)
+        with self.lock:
+            if host not in self._limits:
+                self._limits[host] = threading.BoundedSemaphore(self.host_concurrency)
+            return self._limits[host]
+
+    def record(self, url, elapsed, failed=False):
+        # type: (AnyStr, float, bool) -> None
+        """
+        :param url: address of request
+        :param elapsed: seconds taken by request
+        :param failed: True if request raised an error
+        """
+        host = self.get_host(url)
+        with self.lock:
+            metrics = self._metrics.setdefault(host, dict(requests=0, failed=0, latency=0.0, max_latency=0.0))
+            metrics['requests'] += 1
+            metrics['failed'] += int(failed)
+            metrics['latency'] += elapsed
+            metrics['max_latency'] = max(metrics['max_latency'], elapsed)
+
+    def stats(self):
+        # type: (...) -> Dict[AnyStr, Dict]
+        """
+        :return: per host, requests, failed, connections made, connections reused, and average/max latency ms
+        """
+        with self.lock:
+            result = dict([(_host, dict(requests=_m['requests'], failed=_m['failed'], connections=0, reused=0,
+                                        latency_ms=round(1000 * _m['latency'] / max(1, _m['requests']), 1),
+                                        max_latency_ms=round(1000 * _m['max_latency'], 1)))
+                           for _host, _m in iteritems(self._metrics)])
+            for (cur_host, _, _), cur_adapter in iteritems(self._adapters):
+                host_stats = result.setdefault(cur_host, dict(requests=0, failed=0, connections=0, reused=0,
+                                                              latency_ms=0.0, max_latency_ms=0.0))
+                for cur_manager in [cur_adapter.poolmanager] + list(itervalues(cur_adapter.proxy_manager)):
+                    for cur_key in cur_manager.pools.keys():
+                        pool = cur_manager.pools.get(cur_key)
+                        if None is not pool:
+                            host_stats['connections'] += pool.num_connections
+                            host_stats['reused'] += max(0, pool.num_requests - pool.num_connections)
+        return result
+
+    def clear(self):
+        """
+        close all pooled connections and reset metrics
+        """
+        with self.lock:
+            for cur_adapter in itervalues(self._adapters):
+                cur_adapter.close()
+            self._adapters.clear()
+            self._limits.clear()
+            self._metrics.clear()
+
+
+SESSIONS = SessionManager()
+
+
 def get_url(url,  # type: AnyStr
             post_data=None,  # type: Optional
             params=None,  # type: Optional
@@ -847,7 +1059,8 @@ def get_url(url,  # type: AnyStr
 
     # reuse or instantiate request session
     resp_sess = kwargs.pop('resp_sess', None)
-    if None is session:
+    new_session = None is session
+    if new_session:
         session = CloudflareScraper.create_scraper()
         session.headers.update({'User-Agent': USER_AGENT})
 
@@ -864,9 +1077,7 @@ def get_url(url,  # type: AnyStr
         # session streaming
         session.stream = True
 
-    if not kwargs.pop('nocache', False):
-        cache_dir = CACHE_DIR or get_system_temp_dir()
-        session = CacheControl(sess=session, cache=caches.FileCache(os.path.join(cache_dir, 'sessions')))
+    cached = not kwargs.pop('nocache', False)
 
     provider = kwargs.pop('provider', None)
 
@@ -911,6 +1122,10 @@ def get_url(url,  # type: AnyStr
                 logger.debug('Using %s' % msg)
                 session.proxies = {'http': proxy_address, 'https': proxy_address}
 
+        # pooled connections, a given session keeps its own adapters unless cached as before
+        if new_session or cached:
+            SESSIONS.mount(session, url, cached)
+
         if None is not use_method:
 
             method = getattr(session, use_method.strip().lower())
@@ -930,19 +1145,27 @@ def get_url(url,  # type: AnyStr
         else:
             method = session.get
 
-        for r in range(0, 5):
-            response = method(url, timeout=timeout, **kwargs)
-            if not savename and response.ok and not response.content:
-                if 'url=' in response.headers.get('Refresh', '').lower():
-                    url = response.headers.get('Refresh').lower().split('url=')[1].strip('/')
-                    if not url.startswith('http'):
-                        parsed[2] = '/%s' % url
-                        url = urlunparse(parsed)
-                    response = session.get(url, timeout=timeout, **kwargs)
-                elif 'github' in url:
-                    time.sleep(2)
-                    continue
-            break
+        request_url = url
+        started = time.time()
+        try:
+            for r in range(0, 5):
+                # a slot of the host is taken per request, so that a wait to retry does not hold the slot
+                with SESSIONS.limit(url):
+                    response = method(url, timeout=timeout, **kwargs)
+                if not savename and response.ok and not response.content:
+                    if 'url=' in response.headers.get('Refresh', '').lower():
+                        url = response.headers.get('Refresh').lower().split('url=')[1].strip('/')
+                        if not url.startswith('http'):
+                            parsed[2] = '/%s' % url
+                            url = urlunparse(parsed)
+                        with SESSIONS.limit(url):
+                            response = session.get(url, timeout=timeout, **kwargs)
+                    elif 'github' in url:
+                        time.sleep(2)
+                        continue
+                break
+        finally:
+            SESSIONS.record(request_url, time.time() - started, failed=None is response)
 
         # if encoding is not in header try to use best guess
         # ignore downloads with savename
@@ -1066,7 +1289,6 @@ def get_url(url,  # type: AnyStr
                 logger.info('Unblocking: %s' % domain)
             DOMAIN_FAILURES.domain_list[domain].failure_count = 0
             DOMAIN_FAILURES.domain_list[domain].failure_time = None
-            save_failure(url, domain, False, post_data, post_json)
         elif not exclude_no_data:
             DOMAIN_FAILURES.inc_failure_count(url, ConnectionFail(fail_type=ConnectionFailTypes.nodata))
             save_failure(url, domain, True, post_data, post_json)
@@ -1075,7 +1297,7 @@ def get_url(url,  # type: AnyStr
 
 
 def save_failure(url, domain, log_failure_url, post_data, post_json):
-    DOMAIN_FAILURES.domain_list[domain].save_list()
+    # failures are written to db by FAILURE_LEDGER
     if log_failure_url:
         _log_failure_url(url, post_data, post_json)
 
@@ -93,10 +93,10 @@ from exceptions_helper import ex
 import sickgear
 from sickgear import db, logger, name_cache, network_timezones
 from sickgear.event_queue import Events
-from sickgear.tv import TVShow
+from sickgear.tv import load_show_list
 from sickgear.webserveInit import WebServer
 
-from six import integer_types, iteritems
+from six import integer_types
 
 throwaway = datetime.datetime.strptime('20110101', '%Y%m%d')
 rollback_loaded = None
@@ -702,49 +702,7 @@ class SickGear(object):
 
         logger.log('Loading initial show list')
 
-        my_db = db.DBConnection(row_type='dict')
-        sql_result = my_db.select(
-            """
-            SELECT tv_shows.indexer AS tv_id, tv_shows.indexer_id AS prod_id, tv_shows.*,
-             ii.akas AS ii_akas, 
-             ii.certificates AS ii_certificates,
-             ii.countries AS ii_countries, ii.country_codes AS ii_country_codes,
-             ii.genres AS ii_genres, ii.imdb_id AS ii_imdb_id,
-             ii.indexer AS ii_indexer, ii.indexer_id AS ii_indexer_id,
-             ii.last_update AS ii_ii_last_update,
-             ii.rating AS ii_rating, ii.runtimes AS ii_runtimes,
-             ii.is_mini_series AS ii_is_mini_series, ii.episode_count AS ii_episode_count,
-             ii.title AS ii_title, ii.votes AS ii_votes, ii.year AS ii_year,
-             tsnf.fail_count AS tsnf_fail_count, tsnf.indexer AS tsnf_indexer,
-             tsnf.indexer_id AS tsnf_indexer_id, tsnf.last_check AS tsnf_last_check,
-             tsnf.last_success AS tsnf_last_success
-            FROM tv_shows
-            LEFT JOIN imdb_info ii
-             ON tv_shows.indexer = ii.indexer AND tv_shows.indexer_id = ii.indexer_id
-            LEFT JOIN tv_shows_not_found tsnf
-             ON tv_shows.indexer = tsnf.indexer AND tv_shows.indexer_id = tsnf.indexer_id
-            """)
-        sickgear.showList = []
-        sickgear.showDict = {}
-        for cur_result in sql_result:
-            try:
-                tv_id = int(cur_result['tv_id'])
-                prod_id = int(cur_result['prod_id'])
-                if cur_result['ii_indexer_id']:
-                    imdb_info_sql = {_fk.replace('ii_', ''): _fv for _fk, _fv in iteritems(cur_result)
-                                     if _fk.startswith('ii_')}
-                else:
-                    imdb_info_sql = None
-                show_obj = TVShow(tv_id, prod_id, show_result=cur_result, imdb_info_result=imdb_info_sql)
-                if cur_result['tsnf_indexer_id']:
-                    failed_result = {_fk.replace('tsnf_', ''): _fv for _fk, _fv in iteritems(cur_result)
-                                     if _fk.startswith('tsnf_')}
-                    show_obj.helper_load_failed_db(sql_result=failed_result)
-                sickgear.showList.append(show_obj)
-                sickgear.showDict[show_obj.sid_int] = show_obj
-                _ = show_obj.ids
-            except (BaseException, Exception) as err:
-                logger.error('There was an error creating the show in %s: %s' % (cur_result['location'], ex(err)))
+        load_show_list()
         sickgear.webserve.Home.make_showlist_unique_names()
 
     @staticmethod
@@ -780,6 +738,9 @@ class SickGear(object):
                 except (BaseException, Exception):
                     pass
 
+            # close pooled db connections, this also merges any WAL content into the db files
+            db.DBPool.close_all()
+
             # if run as daemon delete the pidfile
             if self.run_as_daemon and self.create_pid:
                 self.remove_pid_file(self.pid_file)
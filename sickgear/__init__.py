@@ -36,6 +36,7 @@ import zlib
 from . import classes, db, helpers, image_cache, indexermapper, logger, metadata, naming, people_queue, providers, \
     scene_exceptions, scene_numbering, scheduler, search_backlog, search_propers, search_queue, search_recent, \
     show_queue, show_updater, subtitles, trakt_helpers, version_checker, watchedstate_queue
+from .name_parser.parser import name_parser_cache
 from . import auto_media_process, properFinder  # must come after the above imports
 from .common import SD, SKIPPED, USER_AGENT
 from .config import check_section, check_setting_int, check_setting_str, ConfigMigrator, minimax
@@ -43,8 +44,10 @@ from .databases import cache_db, failed_db, mainDB
 from .event_queue import ConfigEvents
 from .indexers.indexer_api import TVInfoAPI
 from .indexers.indexer_config import TVINFO_IMDB, TVINFO_TVDB, TmdbIndexer
+from .notify_dispatcher import NOTIFY_DISPATCHER
 from .providers.generic import GenericProvider
 from .providers.newznab import NewznabConstants
+from .search_executor import PROVIDER_EXECUTOR
 from .tv import TVidProdid
 from .watchedstate import EmbyWatchedStateUpdater, PlexWatchedStateUpdater
 from .webserve import History
@@ -289,6 +292,8 @@ ADD_SHOWS_WO_DIR = False
 ADD_SHOWS_METALANG = 'en'
 CREATE_MISSING_SHOW_DIRS = False
 SHOW_DIRS_WITH_DOTS = False
+NAMEPARSER_CACHE_SIZE = 1000
+NAMEPARSER_CACHE_TTL = 0
 RENAME_EPISODES = False
 RENAME_TBA_EPISODES = True
 RENAME_NAME_CHANGED_EPISODES = False
@@ -671,7 +676,7 @@ def init_stage_1(console_logging):
     # Misc
     global showList, showDict, switched_shows, provider_list, newznab_providers, torrent_rss_providers, \
         WEB_HOST, WEB_ROOT, ACTUAL_CACHE_DIR, CACHE_DIR, ZONEINFO_DIR, ADD_SHOWS_WO_DIR, ADD_SHOWS_METALANG, \
-        CREATE_MISSING_SHOW_DIRS, SHOW_DIRS_WITH_DOTS, \
+        CREATE_MISSING_SHOW_DIRS, SHOW_DIRS_WITH_DOTS, NAMEPARSER_CACHE_SIZE, NAMEPARSER_CACHE_TTL, \
         RECENTSEARCH_STARTUP, NAMING_FORCE_FOLDERS, SOCKET_TIMEOUT, DEBUG, TVINFO_DEFAULT, \
         CONFIG_FILE, CONFIG_VERSION, CONFIG_OLD, CONFIG_LOADED, \
         REMOVE_FILENAME_CHARS, IMPORT_DEFAULT_CHECKED_SHOWS, WANTEDLIST_CACHE, MODULE_UPDATE_STRING, EXT_UPDATES
@@ -1039,6 +1044,10 @@ def init_stage_1(console_logging):
     NFO_RENAME = bool(check_setting_int(CFG, 'General', 'nfo_rename', 1))
     CREATE_MISSING_SHOW_DIRS = bool(check_setting_int(CFG, 'General', 'create_missing_show_dirs', 0))
     SHOW_DIRS_WITH_DOTS = bool(check_setting_int(CFG, 'General', 'show_dirs_with_dots', 0))
+    NAMEPARSER_CACHE_SIZE = minimax(check_setting_int(CFG, 'General', 'nameparser_cache_size', 1000),
+                                    1000, 100, 100000)
+    NAMEPARSER_CACHE_TTL = max(0, check_setting_int(CFG, 'General', 'nameparser_cache_ttl', 0))
+    name_parser_cache.configure(NAMEPARSER_CACHE_SIZE, NAMEPARSER_CACHE_TTL)
     ADD_SHOWS_WO_DIR = bool(check_setting_int(CFG, 'General', 'add_shows_wo_dir', 0))
     ADD_SHOWS_METALANG = check_setting_str(CFG, 'General', 'add_shows_metalang', 'en')
     REMOVE_FILENAME_CHARS = check_setting_str(CFG, 'General', 'remove_filename_chars', '')
@@ -1879,6 +1888,15 @@ def halt():
             except RuntimeError:
                 pass
 
+            # drop provider fetches still queued
+            PROVIDER_EXECUTOR.shutdown()
+
+            # send notifications still queued
+            NOTIFY_DISPATCHER.shutdown()
+
+            # write failures buffered since the last flush
+            sg_helpers.FAILURE_LEDGER.flush()
+
             __INITIALIZED__ = False
             started = False
 
@@ -2054,6 +2072,8 @@ def _save_config(force=False, **kwargs):
     new_config['General']['airdate_episodes'] = int(AIRDATE_EPISODES)
     new_config['General']['create_missing_show_dirs'] = int(CREATE_MISSING_SHOW_DIRS)
     new_config['General']['show_dirs_with_dots'] = int(SHOW_DIRS_WITH_DOTS)
+    new_config['General']['nameparser_cache_size'] = int(NAMEPARSER_CACHE_SIZE)
+    new_config['General']['nameparser_cache_ttl'] = int(NAMEPARSER_CACHE_TTL)
     new_config['General']['add_shows_wo_dir'] = int(ADD_SHOWS_WO_DIR)
     new_config['General']['add_shows_metalang'] = ADD_SHOWS_METALANG
     new_config['General']['remove_filename_chars'] = REMOVE_FILENAME_CHARS
@@ -28,7 +28,9 @@ from six import integer_types, iterkeys, string_types
 # noinspection PyUnresolvedReferences
 # noinspection PyUnreachableCode
 if False:
-    from typing import List, Tuple
+    from typing import AnyStr, Dict, List, Tuple
+    # noinspection PyUnresolvedReferences
+    from re import Pattern
 
 try:
     INSTANCE_ID = str(uuid.uuid1())
@@ -78,6 +80,36 @@ multiEpStrings = {NAMING_REPEAT: 'Repeat',
                   NAMING_LIMITED_EXTEND_E_PREFIXED: 'Extend (Limited, E-prefixed)'}
 
 
+class QualityMarkers(dict):
+
+    def __init__(self, markers, name):
+        # type: (Dict[AnyStr, Pattern], AnyStr) -> None
+        """
+        Quality markers found in a name, where each marker pattern is searched at most once, and only if needed
+
+        :param markers: marker name, precompiled pattern
+        :param name: name
+        """
+        super(QualityMarkers, self).__init__()
+        self.markers = markers
+        self.name = name
+
+    def __missing__(self, marker):
+        found = self[marker] = None is not self.markers[marker].search(self.name)
+        return found
+
+    def has(self, *markers):
+        # type: (AnyStr) -> bool
+        """
+        :param markers: marker names
+        :return: True if all markers are found in name
+        """
+        for cur_marker in markers:
+            if not self[cur_marker]:
+                return False
+        return True
+
+
 class Quality(object):
     NONE = 0  # 0
     SDTV = 1  # 1
@@ -240,18 +272,13 @@ class Quality(object):
 
         name = os.path.basename(name)
 
-        # if we have our exact text then assume we put it there
-        for _x in sorted(iterkeys(Quality.qualityStrings), reverse=True):
-            if Quality.UNKNOWN == _x:
-                continue
+        # if we have our exact text then assume we put it there, the highest quality text found wins
+        if name_quality_any(name):
+            for cur_quality, cur_rc in name_quality_markers:
+                if cur_rc.search(name):
+                    return cur_quality
 
-            if Quality.NONE == _x:  # Last chance
-                return Quality.scene_quality(name, anime)
-
-            regex = r'\W' + Quality.qualityStrings[_x].replace(' ', r'\W') + r'\W'
-            regex_match = re.search(regex, name, re.I)
-            if regex_match:
-                return _x
+        return Quality.scene_quality(name, anime)
 
     @staticmethod
     def scene_quality(name, anime=False):
@@ -267,23 +294,19 @@ class Quality(object):
         from sickgear import logger
         name = os.path.basename(name)
 
-        name_has = (lambda quality_list, func=all: func([re.search(q, name, re.I) for q in quality_list]))
-
         if anime:
-            sd_options = name_has(['360p', '480p', '848x480', 'XviD'], any)
-            sd_options |= name_has([r'^SD\.|\.SD$'], any)  # specific to a provider
-            dvd_options = name_has(['dvd', 'dvdrip'], any)
-            blue_ray_options = name_has(['bluray', 'blu-ray', 'BD'], any)
+            found = QualityMarkers(anime_quality_markers, name)
+            sd_options = found['sd']
+            dvd_options = found['dvd']
+            blue_ray_options = found['bluray']
 
             if sd_options and not dvd_options and not blue_ray_options:
                 return Quality.SDTV
             if dvd_options:
                 return Quality.SDDVD
 
-            hd_options = name_has(['720p', r'\[720\]', '1280x720', '960x720'], any)
-            hd_options |= name_has([r'^HD\s*720\.|\.HD\s*720$'], any)  # specific to a provider
-            full_hd = name_has(['1080p', r'\[1080\]', '1920x1080'], any)
-            full_hd |= name_has([r'^HD(\s*1080)?\.|\.HD(\s*1080)?$'], any)  # specific to a provider
+            hd_options = found['hd']
+            full_hd = found['full_hd']
             if not blue_ray_options:
                 if hd_options and not full_hd:
                     return Quality.HDTV
@@ -302,53 +325,64 @@ class Quality(object):
                 return Quality.HDTV
             return Quality.UNKNOWN
 
-        fmt = '((h.?|x)26[45]|vp9|av1|hevc)'
-        webfmt = 'web.?(dl|rip|.%s)' % fmt
-        rips = 'b[r|d]rip'
-        hd_rips = 'blu.?ray|hddvd|%s' % rips
+        has = QualityMarkers(scene_quality_markers, name).has
 
-        if not name_has(['(720|1080|2160)[pi]|720hd']):
-            if name_has(['(dvd.?rip|%s)(.ws)?(.(xvid|divx|%s))?' % (rips, fmt)]):
+        if not has('res'):
+            if has('dvd_rip'):
                 return Quality.SDDVD
-            if (not name_has(['hr.ws.pdtv.(h.?|x)264'])
-                and (name_has([r'(hdtv|pdtv|dsr|tvrip)([-]|.((aac|ac3|dd).?\d\.?\d.)*(xvid|%s))' % fmt])
-                     or name_has(['(xvid|divx|480p|hevc|x265)']))) \
-                    or name_has([webfmt, 'xvid|%s' % fmt]):
+            if (not has('hr_pdtv_264') and (has('tv_rip') or has('sd_fmt'))) or has('web', 'xvid_fmt'):
                 return Quality.SDTV
 
-        if not name_has(['(1080|2160)[pi]']):
-            if name_has(['720p']):
-                if name_has([hd_rips, fmt]):
+        if not has('fhd_uhd'):
+            if has('_720p'):
+                if has('hd_rip', 'fmt'):
                     return Quality.HDBLURAY
-                if name_has([webfmt]) or name_has(['itunes', fmt]):
+                if has('web') or has('itunes', 'fmt'):
                     return Quality.HDWEBDL
-                if name_has([fmt]):
+                if has('fmt'):
                     return Quality.HDTV
             # p2p
-            if name_has(['720hd']) \
-                    or name_has(['hr.ws.pdtv.%s' % fmt]):
+            if has('_720hd') \
+                    or has('hr_pdtv'):
                 return Quality.HDTV
-        if name_has(['720p|1080i', 'hdtv', 'mpeg-?2']) or name_has(['1080[pi].hdtv', 'h.?264']):
+        if has('_720p_1080i', 'hdtv', 'mpeg2') or has('_1080_hdtv', 'h264'):
             return Quality.RAWHDTV
-        if name_has(['1080[pi]', 'remux']) and not name_has(['hdtv']):
+        if has('_1080', 'remux') and not has('hdtv'):
             return Quality.FULLHDBLURAY
-        if name_has(['1080p']):
-            if name_has([hd_rips, fmt]) or name_has([hd_rips, 'avc|vc[ -.]?1']):
+        if has('_1080p'):
+            if has('hd_rip', 'fmt') or has('hd_rip', 'avc'):
                 return Quality.FULLHDBLURAY
-            if name_has([webfmt]) or name_has(['itunes', fmt]):
+            if has('web') or has('itunes', 'fmt'):
                 return Quality.FULLHDWEBDL
-            if name_has([fmt]):
+            if has('fmt'):
                 return Quality.FULLHDTV
-        if name_has(['2160p']):
-            if name_has(['bluray']):
+        if has('_2160p'):
+            if has('bluray'):
                 return Quality.UHD4KBLURAY
-            if name_has([webfmt]):
+            if has('web'):
                 return Quality.UHD4KWEB
             # for some non scene releases that have no source in name
             return Quality.UHD4KWEB
 
         return Quality.UNKNOWN
 
+    @staticmethod
+    def scene_qualities(names, anime=False):
+        # type: (List[AnyStr], bool) -> List[int]
+        """
+        Return the qualities of a list of scene names, such as a page of provider results, where a repeated name is
+        only classified once
+
+        :param names: names
+        :param anime: is anime
+        :return: quality of each name
+        """
+        qualities = {}
+        for cur_name in names:
+            if cur_name not in qualities:
+                qualities[cur_name] = Quality.scene_quality(cur_name, anime)
+        return [qualities[cur_name] for cur_name in names]
+
     @staticmethod
     def file_quality(filename):
         """
@@ -516,6 +550,52 @@ class Quality(object):
     FAILED = None
 
 
+_fmt = '((h.?|x)26[45]|vp9|av1|hevc)'
+_webfmt = 'web.?(dl|rip|.%s)' % _fmt
+_rips = 'b[r|d]rip'
+_hd_rips = 'blu.?ray|hddvd|%s' % _rips
+# marker names are prefixed with "_" where a name would start with a digit
+scene_quality_markers = dict([(cur_marker, re.compile(cur_pattern, re.I)) for cur_marker, cur_pattern in [
+    ('res', '(720|1080|2160)[pi]|720hd'),
+    ('dvd_rip', '(dvd.?rip|%s)(.ws)?(.(xvid|divx|%s))?' % (_rips, _fmt)),
+    ('hr_pdtv_264', 'hr.ws.pdtv.(h.?|x)264'),
+    ('tv_rip', r'(hdtv|pdtv|dsr|tvrip)([-]|.((aac|ac3|dd).?\d\.?\d.)*(xvid|%s))' % _fmt),
+    ('sd_fmt', '(xvid|divx|480p|hevc|x265)'),
+    ('web', _webfmt),
+    ('xvid_fmt', 'xvid|%s' % _fmt),
+    ('fhd_uhd', '(1080|2160)[pi]'),
+    ('_720p', '720p'),
+    ('hd_rip', _hd_rips),
+    ('fmt', _fmt),
+    ('itunes', 'itunes'),
+    ('_720hd', '720hd'),
+    ('hr_pdtv', 'hr.ws.pdtv.%s' % _fmt),
+    ('_720p_1080i', '720p|1080i'),
+    ('hdtv', 'hdtv'),
+    ('mpeg2', 'mpeg-?2'),
+    ('_1080_hdtv', '1080[pi].hdtv'),
+    ('h264', 'h.?264'),
+    ('_1080', '1080[pi]'),
+    ('remux', 'remux'),
+    ('_1080p', '1080p'),
+    ('avc', 'avc|vc[ -.]?1'),
+    ('_2160p', '2160p'),
+    ('bluray', 'bluray')]])
+anime_quality_markers = dict([(cur_marker, re.compile(cur_pattern, re.I)) for cur_marker, cur_pattern in [
+    ('sd', r'360p|480p|848x480|XviD|^SD\.|\.SD$'),  # ^SD. and .SD$ are specific to a provider
+    ('dvd', 'dvd|dvdrip'),
+    ('bluray', 'bluray|blu-ray|BD'),
+    ('hd', r'720p|\[720\]|1280x720|960x720|^HD\s*720\.|\.HD\s*720$'),
+    ('full_hd', r'1080p|\[1080\]|1920x1080|^HD(\s*1080)?\.|\.HD(\s*1080)?$')]])
+# highest quality first, with one search for any quality string to rule out most names
+name_quality_markers = [(cur_quality, re.compile(r'\W%s\W' % Quality.qualityStrings[cur_quality].replace(' ', r'\W'),
+                                                 re.I))
+                        for cur_quality in sorted(iterkeys(Quality.qualityStrings), reverse=True)
+                        if cur_quality not in (Quality.NONE, Quality.UNKNOWN)]
+name_quality_any = re.compile(r'\W(?:%s)\W' % '|'.join(
+    [Quality.qualityStrings[cur_quality].replace(' ', r'\W') for cur_quality, _ in name_quality_markers]), re.I).search
+
+
 class WantedQualities(dict):
     wantedlist = 1
     bothlists = 2
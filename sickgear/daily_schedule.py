@@ -0,0 +1,215 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+from datetime import date as dt_date, timedelta
+import re
+import threading
+
+import sickgear
+from . import db, helpers, logger, network_timezones
+from .common import ARCHIVED, DOWNLOADED, IGNORED, SKIPPED, SNATCHED_ANY, WANTED, Quality
+from .indexers.indexer_config import TVINFO_IMDB
+
+from lib.dateutil import tz
+from six import string_types
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import Any, Dict, List, Optional, Tuple
+
+SCHEDULE_COLUMNS = ('%(ep)s.network AS episode_network, tv_shows.status AS show_status,'
+                    ' tv_shows.network AS show_network, tv_shows.timezone AS show_timezone,'
+                    ' tv_shows.airtime AS show_airtime, %(ep)s.timezone AS ep_timezone, %(ep)s.airtime AS ep_airtime')
+
+
+class DailySchedule(object):
+    """
+    Episodes of the daily schedule and calendar feed with network localised air times, cached for the day
+
+    The cache is built again on a new day, on a change of the missed range or of network timezones, when any episode
+    is inserted, deleted, or changes status or airdate (recorded by db triggers in show_stats_changes), or when
+    invalidate() is called by a show or episode save. Values that depend on display settings, e.g. the local time
+    and sort names, are added to copies of the cached rows by each reader.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._generation = 0  # type: int
+        self._key = None  # type: Optional[Tuple]
+        self._network_dict = None  # type: Optional[Dict]
+        self._schedule = None  # type: Optional[List[Dict[str, Any]]]
+        self._calendar = None  # type: Optional[List[Dict[str, Any]]]
+
+    def invalidate(self):
+        """
+        discard cached episodes, they are built again on next use
+        """
+        self._generation += 1
+
+    @staticmethod
+    def _change_seq():
+        # type: (...) -> int
+        # noinspection SqlResolve
+        sql_result = db.DBConnection().select('SELECT MAX(seq) AS seq FROM show_stats_changes')
+        return sql_result and sql_result[0]['seq'] or 0
+
+    @staticmethod
+    def _select_schedule(today):
+        # type: (int) -> List[Dict[str, Any]]
+        yesterday = today - 1
+        tomorrow = today + 1
+        next_week = today + 8
+        recently = yesterday - sickgear.EPISODE_VIEW_MISSED_RANGE
+
+        qualities = Quality.SNATCHED + Quality.DOWNLOADED + Quality.ARCHIVED + [IGNORED, SKIPPED]
+
+        my_db = db.DBConnection()
+        sql_result = my_db.select(
+            'SELECT *, ' + SCHEDULE_COLUMNS % dict(ep='tv_episodes') +
+            ' FROM tv_episodes, tv_shows'
+            ' WHERE tv_shows.indexer = tv_episodes.indexer AND tv_shows.indexer_id = tv_episodes.showid'
+            ' AND season != 0 AND airdate >= ? AND airdate <= ?'
+            ' AND tv_episodes.status NOT IN (%s)' % ','.join(['?'] * len(qualities)),
+            [yesterday, next_week] + qualities)
+
+        done_shows = set([(cur_result['indexer'], cur_result['showid']) for cur_result in sql_result])
+
+        # the episodes at the first airdate after next week of each show that has no episode in the week
+        sql_result += [cur_result for cur_result in my_db.select(
+            'SELECT outer_eps.*, tv_shows.*, ' + SCHEDULE_COLUMNS % dict(ep='outer_eps') +
+            ' FROM tv_episodes outer_eps'
+            ' JOIN (SELECT indexer, showid, MIN(airdate) AS next_airdate FROM tv_episodes'
+            ' WHERE season != 0 AND airdate >= ? GROUP BY indexer, showid) next_eps'
+            ' ON next_eps.indexer = outer_eps.indexer AND next_eps.showid = outer_eps.showid'
+            ' AND next_eps.next_airdate = outer_eps.airdate'
+            ' JOIN tv_shows ON tv_shows.indexer = outer_eps.indexer AND tv_shows.indexer_id = outer_eps.showid'
+            ' WHERE outer_eps.season != 0 AND outer_eps.status NOT IN (%s)'
+            % ','.join(['?'] * len(Quality.SNATCHED + Quality.DOWNLOADED)),
+            [next_week] + Quality.SNATCHED + Quality.DOWNLOADED)
+            if (cur_result['indexer'], cur_result['showid']) not in done_shows]
+
+        sql_result += my_db.select(
+            'SELECT *, ' + SCHEDULE_COLUMNS % dict(ep='tv_episodes') +
+            ' FROM tv_episodes, tv_shows'
+            ' WHERE season != 0'
+            ' AND tv_shows.indexer = tv_episodes.indexer AND tv_shows.indexer_id = tv_episodes.showid'
+            ' AND airdate <= ? AND airdate >= ? AND tv_episodes.status = ? AND tv_episodes.status NOT IN (%s)'
+            % ','.join(['?'] * len(qualities)),
+            [tomorrow, recently, WANTED] + qualities)
+
+        schedule, done_eps = [], set()
+        for cur_result in sql_result:
+            ep_key = (cur_result['indexer'], cur_result['showid'], cur_result['season'], cur_result['episode'])
+            if ep_key in done_eps or Quality.split_composite_status(helpers.try_int(cur_result['status']))[0] in \
+                    SNATCHED_ANY + [DOWNLOADED, ARCHIVED, IGNORED, SKIPPED]:
+                continue
+            done_eps.add(ep_key)
+            item = dict(cur_result)
+
+            item['tv_id'] = item['indexer']
+            item['prod_id'] = item['showid']
+
+            item['network'] = (item['show_network'], item['episode_network'])[
+                isinstance(item['episode_network'], string_types) and 0 != len(item['episode_network'].strip())]
+
+            item['parsed_datetime'] = network_timezones.get_episode_time(
+                item['airdate'], item['airs'], item['show_network'], item['show_airtime'], item['show_timezone'],
+                item['timestamp'], item['episode_network'], item['ep_airtime'], item['ep_timezone'])
+            if not item['runtime']:
+                item['runtime'] = 5
+
+            imdb_id = None
+            if item['imdb_id']:
+                try:
+                    imdb_id = helpers.try_int(re.search(r'(\d+)', item['imdb_id']).group(1))
+                except (BaseException, Exception):
+                    pass
+            if imdb_id:
+                item['imdb_url'] = sickgear.indexers.indexer_config.tvinfo_config[TVINFO_IMDB]['show_url'] % imdb_id
+            else:
+                item['imdb_url'] = ''
+            schedule.append(item)
+
+        return schedule
+
+    @staticmethod
+    def _select_calendar(today):
+        # type: (int) -> List[Dict[str, Any]]
+        past_date = (dt_date.fromordinal(today) + timedelta(weeks=-52)).toordinal()
+        future_date = (dt_date.fromordinal(today) + timedelta(weeks=52)).toordinal()
+        utc = tz.gettz('GMT', zoneinfo_priority=True)
+
+        # episodes of the shows that are not paused and are currently on air
+        sql_result = db.DBConnection().select(
+            'SELECT tv_shows.show_name, tv_shows.network, tv_shows.airs, tv_shows.runtime,'
+            ' tv_episodes.name, tv_episodes.season, tv_episodes.episode, tv_episodes.description,'
+            ' tv_episodes.airdate'
+            ' FROM tv_shows'
+            ' JOIN tv_episodes ON tv_episodes.indexer = tv_shows.indexer AND tv_episodes.showid = tv_shows.indexer_id'
+            ' WHERE (tv_shows.status = \'Continuing\' OR tv_shows.status = \'Returning Series\')'
+            ' AND tv_shows.paused != \'1\''
+            ' AND tv_episodes.airdate >= ? AND tv_episodes.airdate < ?'
+            ' ORDER BY tv_shows.show_id, tv_episodes.season, tv_episodes.episode',
+            [past_date, future_date])
+
+        calendar = []
+        for cur_result in sql_result:
+            item = dict(cur_result)
+            item['air_date_time'] = network_timezones.parse_date_time(
+                item['airdate'], item['airs'], item['network']).astimezone(utc)
+            item['air_date_time_end'] = item['air_date_time'] + timedelta(
+                minutes=helpers.try_int(item['runtime'], 60))
+            calendar.append(item)
+
+        return calendar
+
+    def _refresh(self):
+        # type: (...) -> int
+        today = dt_date.today().toordinal()
+        key = (today, sickgear.EPISODE_VIEW_MISSED_RANGE, self._generation, self._change_seq())
+        # network timezones may be reloaded with changes
+        if key != self._key or network_timezones.network_dict != self._network_dict:
+            self._network_dict = network_timezones.network_dict
+            self._schedule = self._calendar = None
+            self._key = key
+        return today
+
+    def schedule(self):
+        # type: (...) -> List[Dict[str, Any]]
+        """
+        :return: copies of the episodes of the daily schedule with network localised air time as parsed_datetime
+        """
+        with self.lock:
+            today = self._refresh()
+            if None is self._schedule:
+                self._schedule = self._select_schedule(today)
+                logger.debug('Cached daily schedule of %s episodes' % len(self._schedule))
+            return [dict(cur_item) for cur_item in self._schedule]
+
+    def calendar(self):
+        # type: (...) -> List[Dict[str, Any]]
+        """
+        :return: copies of the episodes that air 52 weeks either side of today of the shows that are on air and not
+        paused, with air_date_time and air_date_time_end in utc
+        """
+        with self.lock:
+            today = self._refresh()
+            if None is self._calendar:
+                self._calendar = self._select_calendar(today)
+                logger.debug('Cached calendar of %s episodes' % len(self._calendar))
+            return [dict(cur_item) for cur_item in self._calendar]
+
+
+DAILY_SCHEDULE = DailySchedule()
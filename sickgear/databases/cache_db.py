@@ -19,7 +19,7 @@ from collections import OrderedDict
 from .. import db
 
 MIN_DB_VERSION = 1
-MAX_DB_VERSION = 7
+MAX_DB_VERSION = 8
 TEST_BASE_VERSION = None  # the base production db version, only needed for TEST db versions (>=100000)
 
 
@@ -92,6 +92,13 @@ class InitialSchema(db.SchemaUpgrade):
                 ' uid NUMERIC NOT NULL)',
                 'CREATE UNIQUE INDEX idx_show_queue_uid ON show_queue(uid)',
                 'CREATE UNIQUE INDEX idx_show_queue ON show_queue(tvid, prodid, action_id)'
+            ]),
+            ('provider_cache_episodes', [
+                'CREATE TABLE provider_cache_episodes(provider TEXT NOT NULL, indexer NUMERIC NOT NULL,'
+                ' indexerid NUMERIC NOT NULL, season NUMERIC NOT NULL, episode NUMERIC NOT NULL, url TEXT NOT NULL)',
+                'CREATE UNIQUE INDEX idx_provider_cache_episodes ON provider_cache_episodes'
+                ' (provider, indexer, indexerid, season, episode, url)',
+                'CREATE INDEX idx_provider_cache_proper ON provider_cache (provider, is_proper, time)'
             ])
         ])
 
@@ -163,3 +170,25 @@ class AddSaveQueues(AddGenericFailureHandling):
     def execute(self):
         self.do_query(self.queries['save_queues'])
         self.finish()
+
+
+class AddProviderCacheEpisodes(AddSaveQueues):
+    def test(self):
+        return 7 < self.call_check_db_version()
+
+    def execute(self):
+        self.add_column('provider_cache', 'is_proper', 'INTEGER', 0, set_default=True)
+        self.do_query(self.queries['provider_cache_episodes'])
+
+        # noinspection SqlResolve
+        cl = [['UPDATE provider_cache SET is_proper = 1'
+               ' WHERE name LIKE \'%.PROPER.%\' OR name LIKE \'%.REPACK.%\' OR name LIKE \'%.REAL.%\'']]
+        for cur_result in self.connection.select(
+                'SELECT provider, season, episodes, indexerid, url, indexer FROM provider_cache'):
+            for cur_episode in filter(lambda e: e.isdigit(), (cur_result['episodes'] or '').split('|')):
+                cl.append(['INSERT OR IGNORE INTO provider_cache_episodes'
+                           ' (provider, indexer, indexerid, season, episode, url) VALUES (?,?,?,?,?,?)',
+                           [cur_result['provider'], cur_result['indexer'], cur_result['indexerid'],
+                            cur_result['season'], int(cur_episode), cur_result['url']]])
+        self.connection.mass_action(cl)
+        self.finish()
@@ -27,9 +27,10 @@ from six import iteritems
 # noinspection PyUnreachableCode
 if False:
     from _23 import DirEntry
+    from typing import AnyStr, List
 
 MIN_DB_VERSION = 9  # oldest db version we support migrating from
-MAX_DB_VERSION = 20016
+MAX_DB_VERSION = 20021
 TEST_BASE_VERSION = None  # the base production db version, only needed for TEST db versions (>=100000)
 
 
@@ -2088,3 +2089,116 @@ class ChangeTmdbID(db.SchemaUpgrade):
 
         return self.set_db_version(20016)
 
+
+def show_stats_triggers():
+    # type: (...) -> List[List[AnyStr]]
+    """
+    :return: queries to create the tv_episodes triggers that record a changed show in show_stats_changes
+    """
+    # delete then insert, instead of INSERT OR REPLACE, as the conflict clause of a trigger statement is overridden
+    # by that of the outer statement, e.g. the ON CONFLICT upsert of TVEpisode.get_sql
+    mark_changed = 'DELETE FROM show_stats_changes WHERE indexer = %(row)s.indexer AND showid = %(row)s.showid;' \
+                   ' INSERT INTO show_stats_changes (indexer, showid) VALUES (%(row)s.indexer, %(row)s.showid);'
+    return [
+        ['DROP TRIGGER IF EXISTS show_stats_insert'],
+        ['DROP TRIGGER IF EXISTS show_stats_update'],
+        ['DROP TRIGGER IF EXISTS show_stats_delete'],
+        ['CREATE TRIGGER show_stats_insert AFTER INSERT ON tv_episodes'
+         ' BEGIN %s END' % (mark_changed % {'row': 'NEW'})],
+        ['CREATE TRIGGER show_stats_update AFTER UPDATE OF indexer, showid, season, episode, airdate, status'
+         ' ON tv_episodes'
+         ' WHEN OLD.indexer IS NOT NEW.indexer OR OLD.showid IS NOT NEW.showid OR OLD.season IS NOT NEW.season'
+         ' OR OLD.episode IS NOT NEW.episode OR OLD.airdate IS NOT NEW.airdate OR OLD.status IS NOT NEW.status'
+         ' BEGIN %s %s END' % (mark_changed % {'row': 'OLD'}, mark_changed % {'row': 'NEW'})],
+        ['CREATE TRIGGER show_stats_delete AFTER DELETE ON tv_episodes'
+         ' BEGIN %s END' % (mark_changed % {'row': 'OLD'})],
+    ]
+
+
+# 20016 -> 20017
+class AddShowStatsChanges(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        self.upgrade_log('Adding show stats changes table and tv_episodes triggers')
+        self.do_query([
+            'CREATE TABLE show_stats_changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, indexer NUMERIC, showid NUMERIC,'
+            ' UNIQUE (indexer, showid))',
+        ])
+        self.connection.mass_action(show_stats_triggers())
+
+        return self.set_db_version(20017)
+
+
+# 20017 -> 20018
+class AddHistoryDateIndex(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        if not self.connection.has_index('history', 'idx_history_hide_date'):
+            self.upgrade_log('Adding index on hide and date to history')
+            self.connection.action('CREATE INDEX idx_history_hide_date ON history (hide, date)')
+
+        return self.set_db_version(20018)
+
+
+# 20018 -> 20019
+class AddProcessedReleases(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        if not self.has_table('processed_releases'):
+            self.upgrade_log('Adding processed releases table')
+            self.do_query([
+                'CREATE TABLE processed_releases (indexer NUMERIC, showid NUMERIC, season NUMERIC, episode NUMERIC,'
+                ' basename TEXT, release_name TEXT,'
+                ' UNIQUE (indexer, showid, season, episode, basename, release_name))',
+                'CREATE INDEX idx_processed_releases_basename ON processed_releases (basename)',
+                'CREATE INDEX idx_processed_releases_release_name ON processed_releases (release_name)',
+            ])
+
+            self.upgrade_log('Adding processed releases from download history and episodes')
+            # noinspection SqlResolve
+            sql_result = self.connection.select(
+                'SELECT DISTINCT indexer, showid, season, episode, resource FROM history'
+                ' WHERE action IN (%s)' % ','.join([str(x) for x in common.Quality.DOWNLOADED + common.Quality.ARCHIVED]))
+            cl = [['INSERT OR IGNORE INTO processed_releases'
+                   ' (indexer, showid, season, episode, basename, release_name) VALUES (?,?,?,?,?,?)',
+                   [cur_result['indexer'], cur_result['showid'], cur_result['season'], cur_result['episode'],
+                    re.split(r'[\\/]', cur_result['resource'] or '')[-1], '']]
+                  for cur_result in sql_result]
+            cl += [['INSERT OR IGNORE INTO processed_releases'
+                    ' (indexer, showid, season, episode, basename, release_name)'
+                    ' SELECT indexer, showid, season, episode, ?, release_name FROM tv_episodes'
+                    ' WHERE release_name IS NOT NULL AND release_name != ?', ['', '']]]
+            self.connection.mass_action(cl)
+
+        return self.set_db_version(20019)
+
+
+# 20019 -> 20020
+class AddEpisodeFileNameIndex(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        if not self.connection.has_index('tv_episodes', 'idx_tv_episodes_file_name'):
+            self.upgrade_log('Adding index of episode file names')
+            self.do_query(['CREATE INDEX idx_tv_episodes_file_name ON tv_episodes (%s)'
+                           % db.file_name_sql('location')])
+
+        if not self.connection.has_index('tv_episodes_watched', 'idx_tv_episodes_watched_location'):
+            self.upgrade_log('Adding index of watched episode locations')
+            self.do_query(['CREATE INDEX idx_tv_episodes_watched_location ON tv_episodes_watched (location, label)'])
+
+        return self.set_db_version(20020)
+
+
+# 20020 -> 20021
+class ChangeShowStatsTriggers(db.SchemaUpgrade):
+    def execute(self):
+        db.backup_database(self.connection, 'sickbeard.db', self.call_check_db_version())
+
+        self.upgrade_log('Changing tv_episodes triggers of show stats changes')
+        self.connection.mass_action(show_stats_triggers())
+
+        return self.set_db_version(20021)
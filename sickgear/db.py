@@ -21,6 +21,7 @@ import re
 import sqlite3
 import threading
 import time
+import weakref
 
 from exceptions_helper import ex
 
@@ -36,10 +37,9 @@ from six import iterkeys, iteritems, itervalues
 # noinspection PyUnreachableCode
 if False:
     # noinspection PyUnresolvedReferences
-    from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
+    from typing import Any, AnyStr, Dict, Iterator, List, Optional, Tuple, Union
 
 
-db_lock = threading.Lock()
 db_support_multiple_insert = (3, 7, 11) <= sqlite3.sqlite_version_info  # type: bool
 db_support_partial_index = (3, 8, 0) <= sqlite3.sqlite_version_info  # type: bool
 db_support_column_rename = (3, 25, 0) <= sqlite3.sqlite_version_info  # type: bool
@@ -47,6 +47,10 @@ db_support_upsert = (3, 25, 0) <= sqlite3.sqlite_version_info  # type: bool
 db_supports_backup = hasattr(sqlite3.Connection, 'backup') and (3, 6, 11) <= sqlite3.sqlite_version_info  # type: bool
 db_supports_setconfig_dqs = (hasattr(sqlite3.Connection, 'setconfig') and hasattr(sqlite3, 'SQLITE_DBCONFIG_DQS_DDL')
                              and hasattr(sqlite3, 'SQLITE_DBCONFIG_DQS_DML'))  # type: bool
+db_support_wal = (3, 7, 0) <= sqlite3.sqlite_version_info  # type: bool
+
+
+is_read_query = re.compile(r'(?i)^\s*SELECT\b').match
 
 
 def db_filename(filename='sickbeard.db', suffix=None):
@@ -89,17 +93,193 @@ def mass_upsert_sql(table_name, value_dict, key_dict, sanitise=True):
                (table_name, ', '.join(gen_params(value_dict)), ' AND '.join(gen_params(key_dict))),
                list(value_dict.values()) + list(key_dict.values())])
 
+    # parameterised, so that the statement is parsed once for a list of rows
     # noinspection SqlResolve
-    cl.append(['INSERT INTO [' + table_name + '] (' +
-               ', '.join(["'%s'" % ('%s' % v).replace("'", "''") for v in
-                          itertools.chain(iterkeys(value_dict), iterkeys(key_dict))]) + ')' +
-               ' SELECT ' +
-               ', '.join(["'%s'" % ('%s' % v).replace("'", "''") for v in
-                          itertools.chain(itervalues(value_dict), itervalues(key_dict))]) +
-               ' WHERE changes() = 0'])
+    cl.append(['INSERT INTO [%s] (%s) SELECT %s WHERE changes() = 0' % (
+        table_name, ', '.join(itertools.chain(iterkeys(value_dict), iterkeys(key_dict))),
+        ', '.join(['?'] * (len(value_dict) + len(key_dict)))),
+        list(value_dict.values()) + list(key_dict.values())])
     return cl
 
 
+def file_name_sql(column):
+    # type: (AnyStr) -> AnyStr
+    """
+    SQL expression of the lowercase file name of a path column, i.e. the text after the last / or \\ of the path
+
+    rtrim removes each char that is not a separator from the end of the path to leave the folder part, and so the
+    expression is of builtin functions that can be used for an index. A query must use the same expression as an index
+    for the index to be used.
+
+    :param column: name of column with path
+    :return: SQL expression
+    """
+    return "lower(replace(%s, rtrim(%s, replace(replace(%s, '/', ''), '\\', '')), ''))" % ((column,) * 3)
+
+
+class DBPool(object):
+    """
+    Pool of sqlite connections to one database file
+
+    Each thread is handed its own connection that is reused for the life of the thread, so the schema and statement
+    caches of a connection survive between DBConnection instances. Writes are serialised by a lock that is only shared
+    by users of the same database file, and with WAL journaling, reads run without taking the lock at all.
+    """
+    _pools = {}  # type: Dict[AnyStr, DBPool]
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_src):
+        # type: (AnyStr) -> None
+        self.db_src = db_src
+        self.lock = threading.RLock()
+        self.lock_wait = 0.0  # type: float
+        self.lock_count = 0  # type: int
+        self._inode = None  # type: Optional[int]
+        self._local = threading.local()
+        self._connections = {}  # type: Dict[int, Tuple[weakref.ReferenceType, sqlite3.Connection]]
+        self._connections_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, db_src):
+        # type: (AnyStr) -> DBPool
+        """
+        :param db_src: full path to a database file
+        :return: the pool for the database file
+        """
+        pool = cls._pools.get(db_src)
+        if None is pool:
+            with cls._pools_lock:
+                pool = cls._pools.setdefault(db_src, DBPool(db_src))
+        return pool
+
+    @classmethod
+    def close_all(cls):
+        """close every pooled connection to every database file"""
+        with cls._pools_lock:
+            pools = list(itervalues(cls._pools))
+        for cur_pool in pools:
+            cur_pool.close()
+
+    def validate(self):
+        """
+        drop pooled connections if the database file was removed or replaced since they were opened
+        """
+        if None is self._inode:
+            return
+        try:
+            inode = os.stat(self.db_src).st_ino
+        except OSError:
+            inode = None
+        if inode != self._inode:
+            self.close()
+
+    def connection(self):
+        # type: (...) -> sqlite3.Connection
+        """
+        :return: the connection to the database file owned by the current thread
+        """
+        connection = getattr(self._local, 'connection', None)
+        if None is connection:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def _connect(self):
+        # type: (...) -> sqlite3.Connection
+        connection = sqlite3.connect(self.db_src, timeout=20, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        # enable legacy double quote support
+        if db_supports_setconfig_dqs:
+            connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DDL, True)
+            connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DML, True)
+        if db_support_wal:
+            try:
+                # WAL is persisted in the db file, readers no longer block on a writer and vice versa
+                connection.execute('PRAGMA journal_mode = WAL')
+                connection.execute('PRAGMA synchronous = NORMAL')
+            except sqlite3.OperationalError as e:
+                logger.debug(f'Unable to set WAL journal mode on {self.db_src}: {ex(e)}')
+        try:
+            self._inode = os.stat(self.db_src).st_ino
+        except OSError:
+            pass
+
+        with self._connections_lock:
+            # prune connections left by threads that have ended
+            for cur_id, (cur_ref, cur_connection) in list(iteritems(self._connections)):
+                cur_thread = cur_ref()
+                if None is cur_thread or not cur_thread.is_alive():
+                    del self._connections[cur_id]
+                    self._close_connection(cur_connection)
+            cur_thread = threading.current_thread()
+            self._connections[id(cur_thread)] = (weakref.ref(cur_thread), connection)
+        return connection
+
+    def release(self):
+        """close the connection owned by the current thread"""
+        connection = getattr(self._local, 'connection', None)
+        if None is not connection:
+            self._local.connection = None
+            with self._connections_lock:
+                self._connections.pop(id(threading.current_thread()), None)
+            self._close_connection(connection)
+
+    def close(self):
+        """close the connections of all threads, the next use by any thread opens a new connection"""
+        with self.lock:
+            with self._connections_lock:
+                connections = [cur_connection for _, cur_connection in itervalues(self._connections)]
+                self._connections = {}
+                self._local = threading.local()
+                self._inode = None
+            for cur_connection in connections:
+                self._close_connection(cur_connection)
+
+    def checkpoint(self):
+        """write the content of the WAL file into the database file, e.g. before a file copy of the database"""
+        if db_support_wal:
+            with self.write_lock():
+                try:
+                    self.connection().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                except sqlite3.Error as e:
+                    logger.debug(f'Failed to checkpoint {self.db_src}: {ex(e)}')
+
+    @staticmethod
+    def _close_connection(connection):
+        # type: (sqlite3.Connection) -> None
+        try:
+            connection.close()
+        except (BaseException, Exception):
+            pass
+
+    def write_lock(self):
+        # type: (...) -> _TimedLock
+        """
+        :return: context manager that holds the write lock of this database file
+        """
+        return _TimedLock(self)
+
+
+class _TimedLock(object):
+    """hold the write lock of a pool, and account the time spent waiting for it"""
+    __slots__ = ['pool']
+
+    def __init__(self, pool):
+        # type: (DBPool) -> None
+        self.pool = pool
+
+    def __enter__(self):
+        pool = self.pool
+        if not pool.lock.acquire(False):
+            started = time.perf_counter()
+            pool.lock.acquire()
+            pool.lock_wait += time.perf_counter() - started
+        pool.lock_count += 1
+        return self
+
+    def __exit__(self, *args):
+        self.pool.lock.release()
+
+
 class DBConnection(object):
     def __init__(self, filename='sickbeard.db', row_type=None, **kwargs):
         # type: (AnyStr, Optional[AnyStr], Dict) -> None
@@ -107,22 +287,29 @@ class DBConnection(object):
         from . import helpers
         self.new_db = False
         db_src = db_filename(filename)
+        self.pool = DBPool.get(db_src)
         if not os.path.isfile(db_src):
+            # any pooled connection was opened to a file that no longer exists
+            self.pool.close()
             db_alt = db_filename('sickrage.db')
             if os.path.isfile(db_alt):
                 helpers.copy_file(db_alt, db_src)
+        else:
+            self.pool.validate()
 
         self.filename = filename
-        self.connection = sqlite3.connect(db_src, timeout=20)
-        # enable legacy double quote support
-        if db_supports_setconfig_dqs:
-            self.connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DDL, True)
-            self.connection.setconfig(sqlite3.SQLITE_DBCONFIG_DQS_DML, True)
+        self.row_factory = (sqlite3.Row, self._dict_factory)['dict' == row_type]
 
-        if 'dict' == row_type:
-            self.connection.row_factory = self._dict_factory
-        else:
-            self.connection.row_factory = sqlite3.Row
+    @property
+    def connection(self):
+        # type: (...) -> sqlite3.Connection
+        return self.pool.connection()
+
+    def _cursor(self):
+        # type: (...) -> sqlite3.Cursor
+        cursor = self.pool.connection().cursor()
+        cursor.row_factory = self.row_factory
+        return cursor
 
     def backup_db(self, target, backup_filename=None):
         # type: (AnyStr, AnyStr) -> Tuple[bool, AnyStr]
@@ -159,7 +346,7 @@ class DBConnection(object):
             # copy into this DB
             backup_con = sqlite3.connect(target_db, timeout=20)
             with backup_con:
-                with db_lock:
+                with self.pool.write_lock():
                     self.connection.backup(backup_con, progress=progress)
             logger.debug('%s backup successful' % self.filename)
         except sqlite3.Error as error:
@@ -203,7 +390,7 @@ class DBConnection(object):
         # type: (List[Union[List[AnyStr], Tuple[AnyStr, List], Tuple[AnyStr]]], bool) -> Optional[List, sqlite3.Cursor]
 
         from . import helpers
-        with db_lock:
+        with self.pool.write_lock():
 
             if None is queries:
                 return
@@ -217,17 +404,18 @@ class DBConnection(object):
             affected = 0
             while 5 > attempt:
                 try:
-                    cursor = self.connection.cursor()
-                    if not log_transaction:
-                        for cur_query in queries:
-                            sql_result.append(cursor.execute(*tuple(cur_query)).fetchall())
-                            affected += abs(cursor.rowcount)
-                    else:
-                        for cur_query in queries:
-                            logger.log(cur_query[0] if 1 == len(cur_query)
-                                       else '%s with args %s' % tuple(cur_query), logger.DB)
-                            sql_result.append(cursor.execute(*tuple(cur_query)).fetchall())
-                            affected += abs(cursor.rowcount)
+                    cursor = self._cursor()
+                    for cur_batch in self._batches(queries):
+                        if log_transaction:
+                            for cur_query in cur_batch:
+                                logger.log(cur_query[0] if 1 == len(cur_query)
+                                           else '%s with args %s' % tuple(cur_query), logger.DB)
+                        if 1 == len(cur_batch):
+                            sql_result.append(cursor.execute(*tuple(cur_batch[0])).fetchall())
+                        else:
+                            cursor.executemany(cur_batch[0][0], [cur_query[1] for cur_query in cur_batch])
+                            sql_result.extend([[] for _ in cur_batch])
+                        affected += abs(cursor.rowcount)
 
                     self.connection.commit()
                     if 0 < affected:
@@ -249,6 +437,26 @@ class DBConnection(object):
 
             return sql_result
 
+    @staticmethod
+    def _batches(queries):
+        # type: (List[Union[List[AnyStr], Tuple[AnyStr, List], Tuple[AnyStr]]]) -> Iterator[List]
+        """
+        group consecutive writes of one statement with args, e.g. the upsert of each episode of a show, so that
+        a group is run with executemany, other queries are a group of one
+
+        :param queries: queries of a transaction
+        :return: groups of queries in order
+        """
+        batch = []
+        for cur_query in queries:
+            if batch and not (2 == len(cur_query) == len(batch[0]) and cur_query[0] == batch[0][0]
+                              and not is_read_query(cur_query[0])):
+                yield batch
+                batch = []
+            batch.append(cur_query)
+        if batch:
+            yield batch
+
     @staticmethod
     def action_error(e):
 
@@ -261,34 +469,43 @@ class DBConnection(object):
     def action(self, query, args=None):
         # type: (AnyStr, Optional[List, Tuple]) -> Optional[Union[List, sqlite3.Cursor]]
 
-        with db_lock:
+        if None is query:
+            return
 
-            if None is query:
-                return
+        if is_read_query(query):
+            # WAL journaling allows reads to run concurrently with a write
+            return self._action(query, args)
 
-            sql_result = None
-            attempt = 0
+        with self.pool.write_lock():
+            return self._action(query, args)
 
-            while 5 > attempt:
-                try:
-                    if None is args:
-                        logger.log('%s: %s' % (self.filename, query), logger.DB)
-                        sql_result = self.connection.execute(query)
-                    else:
-                        logger.log('%s: %s with args %s' % (self.filename, query, str(args)), logger.DB)
-                        sql_result = self.connection.execute(query, args)
-                    self.connection.commit()
-                    # get out of the connection attempt loop since we were successful
-                    break
-                except sqlite3.OperationalError as e:
-                    if not self.action_error(e):
-                        raise
-                    attempt += 1
-                except sqlite3.DatabaseError as e:
-                    logger.error(f'Fatal error executing query: {ex(e)}')
+    def _action(self, query, args=None):
+        # type: (AnyStr, Optional[List, Tuple]) -> Optional[sqlite3.Cursor]
+
+        sql_result = None
+        attempt = 0
+
+        while 5 > attempt:
+            try:
+                cursor = self._cursor()
+                if None is args:
+                    logger.log('%s: %s' % (self.filename, query), logger.DB)
+                    sql_result = cursor.execute(query)
+                else:
+                    logger.log('%s: %s with args %s' % (self.filename, query, str(args)), logger.DB)
+                    sql_result = cursor.execute(query, args)
+                self.connection.commit()
+                # get out of the connection attempt loop since we were successful
+                break
+            except sqlite3.OperationalError as e:
+                if not self.action_error(e):
                     raise
+                attempt += 1
+            except sqlite3.DatabaseError as e:
+                logger.error(f'Fatal error executing query: {ex(e)}')
+                raise
 
-            return sql_result
+        return sql_result
 
     def select(self, query, args=None):
         # type: (AnyStr, Optional[List, Tuple]) -> List
@@ -303,6 +520,12 @@ class DBConnection(object):
     def upsert(self, table_name, value_dict, key_dict):
         # type: (AnyStr, Dict, Dict) -> None
 
+        with self.pool.write_lock():
+            self._upsert(table_name, value_dict, key_dict)
+
+    def _upsert(self, table_name, value_dict, key_dict):
+        # type: (AnyStr, Dict, Dict) -> None
+
         changes_before = self.connection.total_changes
 
         gen_params = (lambda my_dict: [x + ' = ?' for x in iterkeys(my_dict)])
@@ -406,10 +629,12 @@ class DBConnection(object):
         return (self.add_flag, self.remove_flag)[not bool(state)](flag_name)
 
     def close(self):
-        """Close database connection"""
-        if None is not getattr(self, 'connection', None):
-            self.connection.close()
-        self.connection = None
+        """Close the database connection of the current thread"""
+        self.pool.release()
+
+    def checkpoint(self):
+        """Write any WAL content into the database file"""
+        self.pool.checkpoint()
 
     def upgrade_log(self, to_log, log_level=logger.MESSAGE):
         # type: (AnyStr, int) -> None
@@ -444,6 +669,8 @@ def _pretty_name(class_name):
 
 def _restore_database(filename, version):
     logger.log('Restoring database before trying upgrade again')
+    # release all file handles, a WAL left behind must not be applied to the restored file
+    DBPool.get(db_filename(filename)).close()
     if not sickgear.helpers.restore_versioned_file(db_filename(filename=filename, suffix='v%s' % version), version):
         logger.log_error_and_exit('Database restore failed, abort upgrading database')
         return False
@@ -710,6 +937,11 @@ def migration_code(my_db):
         20013: sickgear.mainDB.AddHistoryHideColumn,
         20014: sickgear.mainDB.ChangeShowData,
         20015: sickgear.mainDB.ChangeTmdbID,
+        20016: sickgear.mainDB.AddShowStatsChanges,
+        20017: sickgear.mainDB.AddHistoryDateIndex,
+        20018: sickgear.mainDB.AddProcessedReleases,
+        20019: sickgear.mainDB.AddEpisodeFileNameIndex,
+        20020: sickgear.mainDB.ChangeShowStatsTriggers,
         # 20002: sickgear.mainDB.AddCoolSickGearFeature3,
     }
 
@@ -771,6 +1003,7 @@ def backup_database(db_connection, filename, version):
         return
 
     logger.log('Backing up database before upgrade')
+    db_connection.checkpoint()
     if not sickgear.helpers.backup_versioned_file(db_filename(filename), version):
         logger.log_error_and_exit('Database backup failed, abort upgrading database')
     else:
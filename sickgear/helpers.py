@@ -99,6 +99,16 @@ def is_parsable_date(text):
     return result
 
 
+_rc_non_release_groups_anime = [re.compile(r'(?i)' + v) for v in [
+    r'([\s\.\-_\[\{\(]*(no-rar|nzbgeek|ripsalot|siklopentan)[\s\.\-_\]\}\)]*)$',
+    r'([\s\.\-_\[\{\(]rp[\s\.\-_\]\}\)]*)$',
+    r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*(www\.\w+.\w+)[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
+    r'(?<=\w)([\s\.\-_]*[\[\{\(]\s*(rar(bg|tv)|((e[tz]|v)tv))[\s\.\-_]*[\]\}\)][\s\.\-_]*)$']]
+_rc_non_release_groups = _rc_non_release_groups_anime + [re.compile(r'(?i)' + v) for v in [
+    r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
+    r'^([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)(?=\w)']]
+
+
 def remove_non_release_groups(name, is_anime=False):
     """
     Remove non release groups from name
@@ -112,13 +122,7 @@ def remove_non_release_groups(name, is_anime=False):
     """
 
     if name:
-        rc = [re.compile(r'(?i)' + v) for v in [
-              r'([\s\.\-_\[\{\(]*(no-rar|nzbgeek|ripsalot|siklopentan)[\s\.\-_\]\}\)]*)$',
-              r'([\s\.\-_\[\{\(]rp[\s\.\-_\]\}\)]*)$',
-              r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*(www\.\w+.\w+)[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
-              r'(?<=\w)([\s\.\-_]*[\[\{\(]\s*(rar(bg|tv)|((e[tz]|v)tv))[\s\.\-_]*[\]\}\)][\s\.\-_]*)$'] +
-              ([r'(?<=\w)([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)$',
-                r'^([\s\.\-_]*[\[\{\(][\s\.\-_]*[\w\s\.\-\_]+[\s\.\-_]*[\]\}\)][\s\.\-_]*)(?=\w)'], [])[is_anime]]
+        rc = (_rc_non_release_groups, _rc_non_release_groups_anime)[bool(is_anime)]
         rename = name = remove_extension(name)
         while rename:
             for regex in rc:
@@ -245,6 +249,12 @@ def find_show_by_id(
                                      if sickgear.showDict.get(_show_sid_id)), None)
                     results = [sickgear.showDict.get(_show_sid_id) for _show_sid_id in sid_int_list
                                if sickgear.showDict.get(_show_sid_id)]
+                elif show_list is sickgear.showList:
+                    # confirm the current id and list membership of each show object found in the mapped id index
+                    results = [_show_obj for k, v in iteritems(show_id) if k and v and 0 < v
+                               for _show_obj in sickgear.indexermapper.mapped_ids.get(k, v)
+                               if v == _show_obj.internal_ids.get(k, {'id': 0})['id']
+                               and _show_obj is sickgear.showDict.get(_show_obj.sid_int)]
                 else:
                     results = [_show_obj for k, v in iteritems(show_id) if k and v and 0 < v
                                for _show_obj in show_list if v == _show_obj.internal_ids.get(k, {'id': 0})['id']]
@@ -1278,8 +1288,9 @@ def clear_unused_providers():
 
     if providers:
         my_db = db.DBConnection('cache.db')
-        my_db.action('DELETE FROM provider_cache WHERE provider NOT IN (%s)' % ','.join(['?'] * len(providers)),
-                     providers)
+        my_db.mass_action([
+            ['DELETE FROM %s WHERE provider NOT IN (%s)' % (cur_table, ','.join(['?'] * len(providers))), providers]
+            for cur_table in ('provider_cache', 'provider_cache_episodes')])
 
 
 def make_search_segment_html_string(segment, max_eps=5):
@@ -16,6 +16,7 @@
 
 from . import db
 import datetime
+import re
 
 from . import helpers, logger
 from .common import FAILED, SNATCHED, SNATCHED_PROPER, SUBTITLED, Quality
@@ -104,6 +105,75 @@ def log_download(ep_obj, filename, new_ep_quality, release_group=None, version=-
     _log_history_item(action, ep_obj.show_obj.tvid, ep_obj.show_obj.prodid,
                       ep_obj.season, ep_obj.episode, quality, filename, provider, version)
 
+    log_processed_release(ep_obj, filename)
+
+
+def resource_basename(resource):
+    # type: (AnyStr) -> AnyStr
+    """
+    :param resource: history resource, a file path of any os
+    :return: file name of resource
+    """
+    return re.split(r'[\\/]', resource or '')[-1]
+
+
+def log_processed_release(ep_obj, filename):
+    # type: (sickgear.tv.TVEpisode, AnyStr) -> None
+    """
+    add the file name and release name of a processed episode and its related episodes to the processed releases index
+
+    :param ep_obj: episode object
+    :param filename: processed file
+    """
+    basename = resource_basename(filename)
+    db.DBConnection().mass_action([
+        ['INSERT OR IGNORE INTO processed_releases (indexer, showid, season, episode, basename, release_name)'
+         ' VALUES (?,?,?,?,?,?)',
+         [cur_ep_obj.show_obj.tvid, cur_ep_obj.show_obj.prodid, cur_ep_obj.season, cur_ep_obj.episode,
+          basename, cur_ep_obj.release_name or '']]
+        for cur_ep_obj in [ep_obj] + ep_obj.related_ep_obj])
+
+
+def is_processed_release(release_name):
+    # type: (AnyStr) -> bool
+    """
+    :param release_name: release name of a dir or of a video file without extension
+    :return: True if an episode is processed with release name
+    """
+    if not release_name:
+        return False
+    # noinspection SqlResolve
+    return bool(db.DBConnection().select(
+        'SELECT 1 FROM processed_releases AS pr'
+        ' INNER JOIN tv_episodes AS t'
+        ' ON pr.indexer = t.indexer AND pr.showid = t.showid AND pr.season = t.season AND pr.episode = t.episode'
+        ' WHERE pr.release_name = ? AND t.release_name = pr.release_name'
+        ' LIMIT 1', [release_name]))
+
+
+def is_processed_file(videofile, tvid=None, prodid=None, season=None, episode=None):
+    # type: (AnyStr, int, int, int, int) -> bool
+    """
+    :param videofile: video file name
+    :param tvid: tvid to limit to an episode
+    :param prodid: prodid to limit to an episode
+    :param season: season number to limit to an episode
+    :param episode: episode number to limit to an episode
+    :return: True if a downloaded episode is processed from a file of this name
+    """
+    ep_detail_sql, params = '', [resource_basename(videofile)]
+    if None is not episode:
+        ep_detail_sql = ' AND t.indexer = ? AND t.showid = ? AND t.season = ? AND t.episode = ?'
+        params += [tvid, prodid, season, episode]
+    # noinspection SqlResolve
+    return bool(db.DBConnection().select(
+        'SELECT 1 FROM processed_releases AS pr'
+        ' INNER JOIN tv_episodes AS t'
+        ' ON pr.indexer = t.indexer AND pr.showid = t.showid AND pr.season = t.season AND pr.episode = t.episode'
+        ' WHERE pr.basename = ?%s' % ep_detail_sql +
+        ' AND t.status IN (%s)' % ','.join([str(x) for x in Quality.DOWNLOADED]) +
+        ' LIMIT 1', params))
+
 
 def log_subtitle(tvid, prodid, season, episode, status, subtitle_result):
     # type: (int, int, int, int, int, Any ) -> None
@@ -182,6 +252,10 @@ def reset_status(tvid, prodid, season, episode):
                                        history['tv_id'], history['prod_id'],
                                        history['season'], history['episode']])
 
+            show_obj = helpers.find_show_by_id({int(history['tv_id']): int(history['prod_id'])})
+            if show_obj:
+                show_obj.ep_status_index.set(history['season'], history['episode'], history['action'])
+
 
 def history_snatched_proper_fix():
     my_db = db.DBConnection()
@@ -16,6 +16,7 @@
 
 import datetime
 import re
+import threading
 import traceback
 
 from . import classes, db, logger
@@ -26,13 +27,12 @@ import sickgear
 
 from lib.dateutil.parser import parse
 
-from six import iteritems, moves, string_types
+from six import integer_types, iteritems, moves, string_types
 
 # noinspection PyUnreachableCode
 if False:
     # noinspection PyUnresolvedReferences
-    from typing import Any, AnyStr, Dict, List, Optional, Tuple, Union
-    from six import integer_types
+    from typing import Any, AnyStr, Dict, List, Optional, Set, Tuple, Union
     from sickgear.tv import TVShow
 
 tv_maze_retry_wait = 10
@@ -40,6 +40,62 @@ defunct_indexer = []
 indexer_list = []
 
 
+class MappedIds(object):
+    def __init__(self):
+        """
+        reverse index of (tvid, id) to the show objects that have the id, for any mapped or source tvid
+        """
+        self.lock = threading.Lock()
+        self._shows = {}  # type: Dict[Tuple[int, int], List[TVShow]]
+        self._keys = {}  # type: Dict[int, Set[Tuple[int, int]]]
+
+    def update(self, show_obj):
+        # type: (TVShow) -> None
+        """
+        index the current ids of show object, replacing any previously indexed ids of the object
+
+        :param show_obj: show object
+        """
+        self._index(show_obj, {(cur_tvid, cur_map['id']) for cur_tvid, cur_map in iteritems(show_obj.internal_ids)
+                               if isinstance(cur_map, dict) and isinstance(cur_map.get('id'), integer_types)
+                               and 0 < cur_map['id']})
+
+    def remove(self, show_obj):
+        # type: (TVShow) -> None
+        """
+        :param show_obj: show object
+        """
+        self._index(show_obj, set())
+
+    def _index(self, show_obj, keys):
+        # type: (TVShow, Set[Tuple[int, int]]) -> None
+        with self.lock:
+            old_keys = self._keys.pop(id(show_obj), set())
+            for cur_key in old_keys - keys:
+                show_objs = [cur_show_obj for cur_show_obj in self._shows.get(cur_key, [])
+                             if cur_show_obj is not show_obj]
+                if show_objs:
+                    self._shows[cur_key] = show_objs
+                else:
+                    self._shows.pop(cur_key, None)
+            for cur_key in keys - old_keys:
+                self._shows[cur_key] = self._shows.get(cur_key, []) + [show_obj]
+            if keys:
+                self._keys[id(show_obj)] = keys
+
+    def get(self, tvid, mapped_id):
+        # type: (int, int) -> List[TVShow]
+        """
+        :param tvid: tvid
+        :param mapped_id: id at tvid
+        :return: show objects indexed with id, callers must confirm the current id of an object
+        """
+        return self._shows.get((tvid, mapped_id), [])
+
+
+mapped_ids = MappedIds()
+
+
 class NewIdDict(dict):
     def __init__(self, *args, **kwargs):
         tv_src = kwargs.pop('tv_src')
@@ -203,15 +259,13 @@ def combine_new_ids(cur_ids, new_ids, src_id):
             if v and (k == src_id or not cur_ids.get(k) or v == cur_ids.get(k, ''))}
 
 
-def map_indexers_to_show(show_obj, update=False, force=False, recheck=False, im_sql_result=None):
-    # type: (sickgear.tv.TVShow, Optional[bool], Optional[bool], Optional[bool], Optional[list]) -> dict
+def mapped_from_rows(show_obj, sql_result):
+    # type: (sickgear.tv.TVShow, Optional[list]) -> dict
     """
+    mapped ids of show from indexer_mapping rows without any lookup of missing ids
 
     :param show_obj: TVShow Object
-    :param update: add missing + previously not found ids
-    :param force: search for and replace all mapped/missing ids (excluding NO_AUTOMATIC_CHANGE flagged)
-    :param recheck: load all ids, don't remove existing
-    :param im_sql_result:
+    :param sql_result: indexer_mapping rows of show
     :return: mapped ids
     """
     mapped = {}
@@ -222,6 +276,26 @@ def map_indexers_to_show(show_obj, update=False, force=False, recheck=False, im_
                         'status': (MapStatus.NONE, MapStatus.SOURCE)[int(tvid) == int(show_obj.tvid)],
                         'date': datetime.date.fromordinal(1)}
 
+    # for each mapped entry
+    for cur_row in sql_result or []:
+        date = try_int(cur_row['date'])
+        mapped[int(cur_row['mindexer'])] = {'status': int(cur_row['status']),
+                                            'id': int(cur_row['mindexer_id']),
+                                            'date': datetime.date.fromordinal(date if 0 < date else 1)}
+    return mapped
+
+
+def map_indexers_to_show(show_obj, update=False, force=False, recheck=False, im_sql_result=None):
+    # type: (sickgear.tv.TVShow, Optional[bool], Optional[bool], Optional[bool], Optional[list]) -> dict
+    """
+
+    :param show_obj: TVShow Object
+    :param update: add missing + previously not found ids
+    :param force: search for and replace all mapped/missing ids (excluding NO_AUTOMATIC_CHANGE flagged)
+    :param recheck: load all ids, don't remove existing
+    :param im_sql_result:
+    :return: mapped ids
+    """
     sql_result = []
     for cur_row in im_sql_result or []:
         if show_obj.prodid == cur_row['indexer_id'] and show_obj.tvid == cur_row['indexer']:
@@ -232,12 +306,7 @@ def map_indexers_to_show(show_obj, update=False, force=False, recheck=False, im_
         sql_result = my_db.select(
             'SELECT * FROM indexer_mapping WHERE indexer = ? AND indexer_id = ?', [show_obj.tvid, show_obj.prodid])
 
-    # for each mapped entry
-    for cur_row in sql_result or []:
-        date = try_int(cur_row['date'])
-        mapped[int(cur_row['mindexer'])] = {'status': int(cur_row['status']),
-                                            'id': int(cur_row['mindexer_id']),
-                                            'date': datetime.date.fromordinal(date if 0 < date else 1)}
+    mapped = mapped_from_rows(show_obj, sql_result)
 
     # get list of needed ids
     mis_map = [k for k, v in iteritems(mapped) if (v['status'] not in [
@@ -345,6 +414,7 @@ def save_mapping(show_obj, save_map=None):
                 'DELETE FROM indexer_mapping WHERE indexer = ? AND indexer_id = ? AND mindexer = ?',
                 [show_obj.tvid, show_obj.prodid, tvid]])
 
+    mapped_ids.update(show_obj)
     if 0 < len(sql_l):
         logger.debug('Saving TV info mapping to DB for show: %s' % show_obj.unique_name)
         my_db = db.DBConnection()
@@ -361,6 +431,9 @@ def del_mapping(tvid, prodid):
     """
     my_db = db.DBConnection()
     my_db.action('DELETE FROM indexer_mapping WHERE indexer = ? AND indexer_id = ?', [tvid, prodid])
+    show_obj = sickgear.showDict.get(sickgear.tv.TVShow.create_sid(tvid, prodid))
+    if show_obj:
+        mapped_ids.update(show_obj)
 
 
 def should_recheck_update_ids(show_obj):
@@ -520,7 +520,7 @@ def remove_default_attr(*args, **kwargs):
                             pass
 
                         # episodes
-                        episodes = cur_show_obj.get_all_episodes(has_location=True)
+                        episodes = cur_show_obj.iter_all_episodes(has_location=True)
                         for cur_ep_obj in episodes:
                             try:
                                 changed = False
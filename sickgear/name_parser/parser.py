@@ -38,12 +38,12 @@ from ..classes import OrderedDefaultdict
 
 from .._legacy_classes import LegacyParseResult
 from _23 import decode_str, list_range
-from six import iteritems, iterkeys, itervalues, string_types, text_type
+from six import iterkeys, itervalues, string_types, text_type
 
 # noinspection PyUnreachableCode
 if False:
     # noinspection PyUnresolvedReferences
-    from typing import Any, AnyStr, Dict, List, Optional
+    from typing import Any, AnyStr, Dict, List, Optional, Set, Tuple, Union
     from ..tv import TVShow
 
 
@@ -98,11 +98,25 @@ class NameParser(object):
                 except re.error as errormsg:
                     logger.log(f'WARNING: Invalid episode_pattern, {errormsg}. {cur_pattern}')
                 else:
-                    cls.compiled_regexes[index].append([cur_pattern_num, cur_pattern_name, cur_regex])
+                    cls.compiled_regexes[index].append([cur_pattern_num, cur_pattern_name, cur_regex,
+                                                        cls.compile_prefilter(cur_pattern_name)])
             index += 1
 
         return cls.compiled_regexes
 
+    @staticmethod
+    def compile_prefilter(regex_name):
+        # type: (AnyStr) -> Optional[Any]
+        """
+        :param regex_name: name of pattern
+        :return: compiled prefilter of pattern, shared between patterns with the same prefilter, or None
+        """
+        prefilter = regexes.regex_prefilters.get(regex_name)
+        if prefilter:
+            if prefilter not in compiled_prefilters:
+                compiled_prefilters[prefilter] = re.compile(prefilter, re.IGNORECASE)
+            return compiled_prefilters[prefilter]
+
     @staticmethod
     def clean_series_name(series_name):
         # type: (AnyStr) -> AnyStr
@@ -149,9 +163,23 @@ class NameParser(object):
 
         matches = []
         initial_best_result = None
+        # normalise once for each of non-anime and anime, and only test prefilters that are found once for each name
+        new_names = {}
+        prefilter_found = {}
         for reg_ex in self.compiled_regexes:
-            for (cur_regex_num, cur_regex_name, cur_regex) in self.compiled_regexes[reg_ex]:
-                new_name = helpers.remove_non_release_groups(name, 'anime' in cur_regex_name)
+            for (cur_regex_num, cur_regex_name, cur_regex, cur_prefilter) in self.compiled_regexes[reg_ex]:
+                is_anime = 'anime' in cur_regex_name
+                new_name = new_names.get(is_anime)
+                if None is new_name:
+                    new_name = new_names[is_anime] = helpers.remove_non_release_groups(name, is_anime)
+
+                if None is not cur_prefilter:
+                    found = prefilter_found.get((is_anime, cur_prefilter))
+                    if None is found:
+                        found = prefilter_found[(is_anime, cur_prefilter)] = bool(cur_prefilter.search(new_name))
+                    if not found:
+                        continue
+
                 match = cur_regex.match(new_name)
 
                 if not match:
@@ -325,7 +353,8 @@ class NameParser(object):
                     return best_result
 
                 # get quality
-                new_name = helpers.remove_non_release_groups(name, show_obj.is_anime)
+                new_name = new_names.get(bool(show_obj.is_anime)) \
+                    or helpers.remove_non_release_groups(name, show_obj.is_anime)
                 best_result.quality = common.Quality.name_quality(new_name, show_obj.is_anime)
 
                 new_episode_numbers = []
@@ -650,6 +679,7 @@ class NameParser(object):
         return final_result
 
 
+compiled_prefilters = {}  # type: Dict[AnyStr, Any]
 compiled_regexes = {NameParser.NORMAL_REGEX: NameParser.compile_regexes(NameParser.NORMAL_REGEX),
                     NameParser.ANIME_REGEX: NameParser.compile_regexes(NameParser.ANIME_REGEX),
                     NameParser.ALL_REGEX: NameParser.compile_regexes(NameParser.ALL_REGEX)}
@@ -809,8 +839,8 @@ class ParseResult(LegacyParseResult):
                 ep_obj = self.show_obj.get_episode(self.season_number, e)
                 if ep_obj and isinstance(getattr(ep_obj, 'name', None), string_types) and ep_obj.name.strip():
                     extra_info_no_name = self._replace_ep_name_helper(extra_info_no_name, ep_obj.name)
-            if hasattr(self.show_obj, 'get_all_episodes'):
-                for e in [ep_obj.name for ep_obj in self.show_obj.get_all_episodes(check_related_eps=False)
+            if hasattr(self.show_obj, 'iter_all_episodes'):
+                for e in [ep_obj.name for ep_obj in self.show_obj.iter_all_episodes(check_related_eps=False)
                           if getattr(ep_obj, 'name', None) and re.search(r'real|proper|repack', ep_obj.name, re.I)]:
                     extra_info_no_name = self._replace_ep_name_helper(extra_info_no_name, e)
 
@@ -838,12 +868,51 @@ class ParseResult(LegacyParseResult):
 
 
 class NameParserCache(object):
-    def __init__(self):
+    def __init__(self, cache_size=1000, ttl=0):
+        # type: (int, int) -> None
+        """
+        least recently used cache of parse results, with an index of cached names for each show
+
+        :param cache_size: maximum number of cached parse results
+        :param ttl: seconds a parse result is usable, 0 for no expiry
+        """
         super(NameParserCache, self).__init__()
-        self._previous_parsed = OrderedDefaultdict()  # type: Dict[AnyStr, ParseResult]
-        self._cache_size = 1000
+        self._previous_parsed = OrderedDefaultdict()  # type: Dict[AnyStr, Tuple[ParseResult, float]]
+        self._show_names = {}  # type: Dict[TVShow, Set[AnyStr]]
+        self._cache_size = cache_size
+        self._ttl = ttl
+        self.hits = self.misses = self.evictions = self.expired = 0
         self.lock = threading.Lock()
 
+    def configure(self, cache_size=None, ttl=None):
+        # type: (Optional[int], Optional[int]) -> None
+        """
+        change cache limits, evicting the least recently used entries when the cache is reduced
+
+        :param cache_size: maximum number of cached parse results
+        :param ttl: seconds a parse result is usable, 0 for no expiry
+        """
+        with self.lock:
+            if None is not cache_size:
+                self._cache_size = max(1, cache_size)
+            if None is not ttl:
+                self._ttl = max(0, ttl)
+            self._evict()
+
+    def _remove(self, name):
+        # type: (AnyStr) -> None
+        parse_result, _ = self._previous_parsed.pop(name)
+        names = self._show_names.get(parse_result.show_obj)
+        if None is not names:
+            names.discard(name)
+            if not names:
+                del self._show_names[parse_result.show_obj]
+
+    def _evict(self):
+        while len(self._previous_parsed) > self._cache_size:
+            self._remove(self._previous_parsed.first_key())
+            self.evictions += 1
+
     def add(self, name, parse_result):
         # type: (AnyStr, ParseResult) -> None
         """
@@ -854,19 +923,15 @@ class NameParserCache(object):
         :type parse_result: ParseResult
         """
         with self.lock:
-            self._previous_parsed[name] = parse_result
-            _current_cache_size = len(self._previous_parsed)
-            if _current_cache_size > self._cache_size:
-                key = None
-                for i in range(_current_cache_size - self._cache_size):
-                    try:
-                        key = self._previous_parsed.first_key()
-                        del self._previous_parsed[key]
-                    except KeyError:
-                        logger.debug('Could not remove old NameParserCache entry: %s' % key)
+            if name in self._previous_parsed:
+                self._remove(name)
+            self._previous_parsed[name] = (parse_result, time.time())
+            if None is not parse_result.show_obj:
+                self._show_names.setdefault(parse_result.show_obj, set()).add(name)
+            self._evict()
 
     def get(self, name):
-        # type: (AnyStr) -> ParseResult
+        # type: (AnyStr) -> Optional[ParseResult]
         """
 
         :param name:
@@ -875,10 +940,17 @@ class NameParserCache(object):
         :rtype: ParseResult
         """
         with self.lock:
-            if name in self._previous_parsed:
-                logger.debug('Using cached parse result for: ' + name)
-                self._previous_parsed.move_to_end(name)
-                return self._previous_parsed[name]
+            cached = self._previous_parsed.get(name)
+            if None is not cached and self._ttl and self._ttl < time.time() - cached[1]:
+                self._remove(name)
+                self.expired += 1
+                cached = None
+            if None is cached:
+                self.misses += 1
+                return
+            self.hits += 1
+            self._previous_parsed.move_to_end(name)
+            return cached[0]
 
     def flush(self, show_obj):
         # type: (TVShow) -> None
@@ -888,8 +960,19 @@ class NameParserCache(object):
         :param show_obj: TVShow object
         """
         with self.lock:
-            self._previous_parsed = OrderedDefaultdict(None, [(k, v) for k, v in iteritems(self._previous_parsed)
-                                                       if v.show_obj != show_obj])
+            for cur_name in self._show_names.pop(show_obj, set()):
+                del self._previous_parsed[cur_name]
+
+    def stats(self):
+        # type: (...) -> Dict[AnyStr, Union[int, float]]
+        """
+        :return: size, limits, and hit, miss, eviction and expiry counts of cache
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return dict(size=len(self._previous_parsed), cache_size=self._cache_size, ttl=self._ttl,
+                        hits=self.hits, misses=self.misses, evictions=self.evictions, expired=self.expired,
+                        hit_rate=(lookups and round(100.0 * self.hits / lookups, 2) or 0.0))
 
 
 name_parser_cache = NameParserCache()
@@ -487,3 +487,43 @@ anime_regexes = [
      '''
      ),
 ]
+
+# A prefilter is a cheap search for text that a release name must contain for a pattern to match at all. Each search is
+# made from tokens that are consecutive in its pattern, so skipping a pattern when its prefilter has no match cannot
+# change a parse result. Patterns without a prefilter are always tried.
+_sxe = r's\d+[. _-]*e\d'
+_nxn = r'\dx\d'
+_n_x = r'\d[. _-]*x\d'
+_ep = r'(?:e(?:p(?:isode)?)?|part|pt)[. _-]?[\divx]'
+_bare3 = r'[. _-]\d{3}'
+
+regex_prefilters = {
+    'standard_repeat': _sxe,
+    'fov_repeat': _nxn,
+    'non_standard_multi_ep': _sxe,
+    'standard': _sxe,
+    'fov_non_standard_multi_ep': _nxn,
+    'fov': _nxn,
+    'scene_date_format': r'\d{4}[. _-]+\d{2}[. _-]+\d{2}',
+    'uk_date_format': r'\d{2}[. _-]+(?:\d{2}|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*)[. _-]+\d{2}',
+    'stupid': r'-.*\d{3}$',
+    'verbose': r'season[. _-]+\d+[. _-]+episode[. _-]+\d',
+    'season_only': r's(?:eason[. _-])?\d',
+    'no_season_multi_ep': _ep,
+    'no_season_general': _ep,
+    'bare': _bare3,
+    'anime_ultimate': r'^\[',
+    'anime_standard': r'[ ._-]\[\d{3}',
+    'anime_standard_round': r'[ ._-]\((?:CX[ ._-]?)?\d{3}',
+    'anime_ep_quality': r'[ ._-][sh]d',
+    'anime_quality_ep': r'[sh]d',
+    'anime_slash': r'[ ._-]\[\d{3,4}p',
+    'anime_standard_codec': r'\[',
+    'anime_and_normal': _sxe,
+    'anime_and_normal_x': _n_x,
+    'anime_and_normal_reverse': _sxe,
+    'anime_and_normal_front': _sxe,
+    'anime_ep_name': r'^\[',
+    'anime_bare_ep': r'[ ._-]{3}\d',
+    'anime_bare': _bare3,
+}
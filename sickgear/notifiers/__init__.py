@@ -24,6 +24,7 @@ from . import emby, kodi, plex, xbmc, \
     discord, emailnotify, gitter, libnotify, growl, prowl, slack, telegram, trakt
 
 import sickgear
+from ..notify_dispatcher import NOTIFY_DISPATCHER
 
 
 class NotifierFactory(object):
@@ -113,23 +114,23 @@ class NotifierFactory(object):
 
 def notify_snatch(ep_obj):
     for n in NotifierFactory().get_enabled('onsnatch'):
-        n.notify_snatch(ep_obj)
+        NOTIFY_DISPATCHER.put(n, 'notify_snatch', ep_obj)
 
 
 def notify_download(ep_obj):
     for n in NotifierFactory().get_enabled('ondownload'):
-        n.notify_download(ep_obj)
+        NOTIFY_DISPATCHER.put(n, 'notify_download', ep_obj)
 
 
 def notify_subtitle_download(ep_obj, lang):
     for n in NotifierFactory().get_enabled('onsubtitledownload'):
-        n.notify_subtitle_download(ep_obj, lang)
+        NOTIFY_DISPATCHER.put(n, 'notify_subtitle_download', ep_obj, lang)
 
 
 def notify_git_update(new_version=''):
     if sickgear.NOTIFY_ON_UPDATE:
         for n in NotifierFactory().get_enabled():
-            n.notify_git_update(new_version)
+            NOTIFY_DISPATCHER.put(n, 'notify_git_update', new_version)
 
 
 def notify_update_library(ep_obj, flush_q=False, include_online=True):
@@ -142,6 +143,8 @@ def notify_update_library(ep_obj, flush_q=False, include_online=True):
                 if not flush_q:
                     sickgear.QUEUE_UPDATE_LIBRARY += [(ep_obj.show_obj.name, ep_obj.location)]
                 else:
+                    # one update per show name with kodi or per root dir with plex, that also covers an update
+                    # that is still queued from a previous flush
                     shows = set()
                     locations = set()
                     for show_name, location in sickgear.QUEUE_UPDATE_LIBRARY:
@@ -149,19 +152,25 @@ def notify_update_library(ep_obj, flush_q=False, include_online=True):
                             if show_name in shows:
                                 continue
                             shows.add(show_name)
+                            coalesce_key = show_name
                         else:
                             parent_dir = re.sub(r'[/\\]+%s.*' % show_name, '', os.path.dirname(location))
                             parent_dir = re.sub(r'^(.{,2})[/\\]', '', parent_dir)
                             if parent_dir in locations:
                                 continue
                             locations.add(parent_dir)
+                            coalesce_key = parent_dir
 
-                        n.update_library(show_name=show_name, location=location)
+                        NOTIFY_DISPATCHER.put(n, 'update_library', show_name=show_name, location=location,
+                                              coalesce_key=coalesce_key, retry_false=True)
 
             elif not flush_q:
 
-                n.update_library(show_obj=ep_obj.show_obj, show_name=ep_obj.show_obj.name, ep_obj=ep_obj,
-                                 include_online=include_online)
+                # emby updates a show
+                NOTIFY_DISPATCHER.put(n, 'update_library', show_obj=ep_obj.show_obj, show_name=ep_obj.show_obj.name,
+                                      ep_obj=ep_obj, include_online=include_online,
+                                      coalesce_key=isinstance(n, emby.EmbyNotifier) and ep_obj.show_obj.tvid_prodid
+                                      or None, retry_false=True)
 
         if flush_q:
             sickgear.QUEUE_UPDATE_LIBRARY = []
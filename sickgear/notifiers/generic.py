@@ -31,6 +31,9 @@ notify_strings = dict(
 
 class BaseNotifier(object):
 
+    # number of worker threads that send queued notifications of a notifier at the same time
+    concurrency = 1
+
     def __init__(self):
         self.sg_logo_file = 'apple-touch-icon-precomposed.png'
         self._testing = False
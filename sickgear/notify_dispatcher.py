@@ -0,0 +1,216 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+
+from exceptions_helper import ex
+
+from . import logger
+
+from six import itervalues
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import Any, AnyStr, Dict, Hashable, List, Optional
+    from .notifiers.generic import BaseNotifier
+
+
+class NotifyJob(object):
+    __slots__ = ('notifier', 'method', 'args', 'kwargs', 'key', 'retry_false', 'attempt', 'due')
+
+    def __init__(self, notifier, method, args, kwargs, key=None, retry_false=False):
+        # type: (BaseNotifier, AnyStr, tuple, Dict, Optional[Hashable], bool) -> None
+        self.notifier = notifier
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.retry_false = retry_false
+        self.attempt = 0  # type: int
+        self.due = 0.0  # type: float
+
+
+class NotifyDispatcher(object):
+    """
+    A background queue of notifications and library updates, so that snatch and post-processing do not wait on the
+    hosts of notifiers
+
+    Each notifier has its own queue of jobs served by up to BaseNotifier.concurrency worker threads that start on
+    demand and exit once the queue is empty, so a slow host only delays its own notifications. A job that raises, or
+    a library update that returns False, is tried again after a backoff that doubles on each attempt. A job with a
+    coalesce key, e.g. a library update of a show or a root dir, is dropped while a job of the notifier with the same
+    key is still queued, since the queued job covers it. The backlog is bounded, a job put to a full backlog is
+    dropped, and each outcome is counted in stats().
+    """
+    def __init__(self, max_backlog=500, retries=3, backoff=30):
+        # type: (int, int, int) -> None
+        """
+        :param max_backlog: limit of jobs queued across all notifiers
+        :param retries: number of times a failed job is tried again
+        :param backoff: seconds to wait before the first retry of a failed job
+        """
+        self.max_backlog = max_backlog  # type: int
+        self.retries = retries  # type: int
+        self.backoff = backoff  # type: int
+        self._cond = threading.Condition()
+        self._queues = {}  # type: Dict[AnyStr, List[NotifyJob]]
+        self._workers = {}  # type: Dict[AnyStr, int]
+        self._stopping = False
+        self._metrics = dict(queued=0, sent=0, failed=0, retried=0, coalesced=0, dropped=0)
+
+    def put(self, notifier, method, *args, **kwargs):
+        # type: (BaseNotifier, AnyStr, Any, Any) -> bool
+        """
+        queue a call of a notifier method
+
+        :param notifier: notifier instance
+        :param method: name of notifier method to call
+        :param args: args for method
+        :param kwargs: kwargs for method, coalesce_key and retry_false are used here and not passed through
+        :return: True if queued, False if coalesced with a queued job or dropped
+        """
+        job = NotifyJob(notifier, method, args, kwargs,
+                        kwargs.pop('coalesce_key', None), kwargs.pop('retry_false', False))
+        nid = notifier.id()
+        with self._cond:
+            queue = self._queues.setdefault(nid, [])
+            if None is not job.key and any([job.key == cur_job.key for cur_job in queue]):
+                self._metrics['coalesced'] += 1
+                return False
+            if self.max_backlog <= self._backlog():
+                self._metrics['dropped'] += 1
+                logger.warning(f'Notification backlog is full, dropped {notifier.name} {method}')
+                return False
+            queue.append(job)
+            self._metrics['queued'] += 1
+            self._start_worker(nid, notifier.concurrency)
+            self._cond.notify_all()
+        return True
+
+    def _backlog(self):
+        # type: (...) -> int
+        return sum([len(cur_queue) for cur_queue in itervalues(self._queues)])
+
+    def _start_worker(self, nid, concurrency):
+        # type: (AnyStr, int) -> None
+        workers = self._workers.get(nid, 0)
+        if workers < concurrency and workers < len(self._queues[nid]):
+            self._workers[nid] = 1 + workers
+            threading.Thread(target=self._work, args=(nid,), name='NOTIFY-%s' % nid, daemon=True).start()
+
+    def _take(self, nid):
+        # type: (AnyStr) -> Optional[NotifyJob]
+        """
+        wait for the next due job of a notifier
+
+        :return: job, or None once the queue of the notifier is empty
+        """
+        with self._cond:
+            while True:
+                queue = self._queues.get(nid)
+                if not queue:
+                    self._workers[nid] -= 1
+                    self._cond.notify_all()
+                    return
+                job = min(queue, key=lambda j: j.due)
+                wait = (job.due - time.time(), 0)[self._stopping]
+                if 0 >= wait:
+                    queue.remove(job)
+                    return job
+                self._cond.wait(wait)
+
+    def _work(self, nid):
+        # type: (AnyStr) -> None
+        while True:
+            job = self._take(nid)
+            if None is job:
+                return
+            try:
+                result = getattr(job.notifier, job.method)(*job.args, **job.kwargs)
+                error = (None, 'returned False')[job.retry_false and False is result]
+            except (BaseException, Exception) as e:
+                error = ex(e)
+            self._done(nid, job, error)
+
+    def _done(self, nid, job, error):
+        # type: (AnyStr, NotifyJob, Optional[AnyStr]) -> None
+        with self._cond:
+            if None is error:
+                self._metrics['sent'] += 1
+            elif job.attempt < self.retries and not self._stopping:
+                job.attempt += 1
+                job.due = time.time() + self.backoff * 2 ** (job.attempt - 1)
+                queue = self._queues.setdefault(nid, [])
+                if None is not job.key and any([job.key == cur_job.key for cur_job in queue]):
+                    self._metrics['coalesced'] += 1
+                else:
+                    logger.warning(f'{job.notifier.name} {job.method} failed, {error},'
+                                   f' retry {job.attempt} of {self.retries} in {job.due - time.time():.0f}s')
+                    queue.append(job)
+                    self._metrics['retried'] += 1
+            else:
+                self._metrics['failed'] += 1
+                logger.warning(f'{job.notifier.name} {job.method} failed, {error}, giving up')
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        # type: (Optional[float]) -> bool
+        """
+        wait until no job is queued or running
+
+        :param timeout: seconds to wait at most
+        :return: True if all jobs are done
+        """
+        end_time = None if None is timeout else time.time() + timeout
+        with self._cond:
+            while self._backlog() or any(itervalues(self._workers)):
+                if None is not end_time and time.time() >= end_time:
+                    return False
+                self._cond.wait(None if None is end_time else end_time - time.time())
+        return True
+
+    def stats(self):
+        # type: (...) -> Dict[AnyStr, Any]
+        """
+        :return: counts of jobs that are queued, sent, failed, retried, coalesced, or dropped since start, and of jobs
+        that are queued now in backlog and per notifier in pending
+        """
+        with self._cond:
+            return dict(self._metrics, backlog=self._backlog(),
+                        pending=dict([(nid, len(queue)) for nid, queue in self._queues.items() if queue]))
+
+    def shutdown(self, timeout=10):
+        # type: (float) -> None
+        """
+        send queued jobs without waiting out a retry backoff, and drop those that are not done within timeout
+
+        :param timeout: seconds to wait for queued jobs
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.wait(timeout)
+        with self._cond:
+            dropped = self._backlog()
+            if dropped:
+                self._metrics['dropped'] += dropped
+                logger.warning(f'Dropped {dropped} queued notifications on shutdown')
+            self._queues, self._stopping = {}, False
+            logger.debug('Notification stats: %s' % self.stats())
+
+
+NOTIFY_DISPATCHER = NotifyDispatcher()
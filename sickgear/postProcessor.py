@@ -990,6 +990,7 @@ class PostProcessor(object):
 
     def _change_ep_objs(self, show_obj, season_number, episode_numbers, quality):
         sql_l = []
+        saved_l = []
         ep_obj = self._get_ep_obj(show_obj, season_number, episode_numbers)
         # if we're processing an episode of type anime, get the anime version
         anime_version = (-1, self.anime_version)[ep_obj.show_obj.is_anime and None is not self.anime_version]
@@ -1029,10 +1030,13 @@ class PostProcessor(object):
                 sql = cur_ep_obj.get_sql()
                 if None is not sql:
                     sql_l.append(sql)
+                    saved_l.append(cur_ep_obj)
 
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
 
     def process_minimal(self):
         self._log('Processing without any files...')
@@ -1211,6 +1215,7 @@ class PostProcessor(object):
 
         # put the new location in the database
         sql_l = []
+        saved_l = []
         for cur_ep_obj in [ep_obj] + ep_obj.related_ep_obj:
             with cur_ep_obj.lock:
                 cur_ep_obj.location = os.path.join(dest_path, new_file_name)
@@ -1222,10 +1227,13 @@ class PostProcessor(object):
                 sql = cur_ep_obj.get_sql()
                 if None is not sql:
                     sql_l.append(sql)
+                    saved_l.append(cur_ep_obj)
 
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
 
         # generate nfo/tbn
         ep_obj.create_meta_files()
@@ -27,9 +27,9 @@ from exceptions_helper import ex, MultipleShowObjectsException
 from json_helper import json_dumps, json_loads
 
 import sickgear
-from . import common, db, failedProcessor, helpers, logger, notifiers, postProcessor
+from . import db, failedProcessor, helpers, logger, notifiers, postProcessor
 from .common import SNATCHED_ANY
-from .history import reset_status
+from .history import is_processed_file, is_processed_release, reset_status
 from .name_parser.parser import InvalidNameException, InvalidShowException, NameParser
 from .sgdatetime import SGDatetime
 
@@ -940,62 +940,35 @@ class ProcessTVShow(object):
             sickgear.WEB_ROOT, parse_result.show_obj.tvid_prodid, parse_result.show_obj.name),
             parse_result.show_obj.name)[self.any_vid_processed]
 
-        ep_detail_sql = ''
+        ep_detail = ()
         if parse_result.show_obj.prodid and parse_result.show_obj.tvid and 0 < len(parse_result.episode_numbers) \
                 and parse_result.season_number:
-            ep_detail_sql = " AND tv_episodes.showid='%s' AND tv_episodes.indexer='%s'" \
-                            " AND tv_episodes.season='%s' AND tv_episodes.episode='%s'" % \
-                            (parse_result.show_obj.prodid, parse_result.show_obj.tvid,
-                             parse_result.season_number, parse_result.episode_numbers[0])
+            ep_detail = (parse_result.show_obj.tvid, parse_result.show_obj.prodid,
+                         parse_result.season_number, parse_result.episode_numbers[0])
 
         # Avoid processing the same directory again if we use a process method <> move
-        my_db = db.DBConnection()
-        sql_result = my_db.select('SELECT * FROM tv_episodes WHERE release_name = ?', [dir_name])
-        if sql_result:
+        if is_processed_release(dir_name):
             self._log_helper(f'Found a release directory {showlink} that has already been processed,<br>'
                              f'.. skipping: {dir_name}')
-            if ep_detail_sql:
-                reset_status(parse_result.show_obj.tvid,
-                             parse_result.show_obj.prodid,
-                             parse_result.season_number,
-                             parse_result.episode_numbers[0])
+            if ep_detail:
+                reset_status(*ep_detail)
             return True
 
-        else:
-            # This is needed for video whose name differ from dir_name
-
-            sql_result = my_db.select(
-                'SELECT * FROM tv_episodes WHERE release_name = ?', [videofile.rpartition('.')[0]])
-            if sql_result:
-                self._log_helper(f'Found a video, but that release {showlink} was already processed,<br>'
-                                 f'.. skipping: {videofile}')
-                if ep_detail_sql:
-                    reset_status(parse_result.show_obj.tvid,
-                                 parse_result.show_obj.prodid,
-                                 parse_result.season_number,
-                                 parse_result.episode_numbers[0])
-                return True
+        # This is needed for video whose name differ from dir_name
+        if is_processed_release(videofile.rpartition('.')[0]):
+            self._log_helper(f'Found a video, but that release {showlink} was already processed,<br>'
+                             f'.. skipping: {videofile}')
+            if ep_detail:
+                reset_status(*ep_detail)
+            return True
 
-            # Needed if we have downloaded the same episode @ different quality
-            # noinspection SqlResolve
-            search_sql = 'SELECT tv_episodes.indexerid, history.resource' \
-                         ' FROM tv_episodes INNER JOIN history'\
-                         + ' ON history.showid=tv_episodes.showid AND history.indexer=tv_episodes.indexer'\
-                         + ' WHERE history.season=tv_episodes.season and history.episode=tv_episodes.episode'\
-                         + ep_detail_sql\
-                         + ' and tv_episodes.status IN (%s)' % ','.join([str(x) for x in common.Quality.DOWNLOADED])\
-                         + ' and history.resource LIKE ?'
-
-            sql_result = my_db.select(search_sql, [f'%{videofile}'])
-            if sql_result:
-                self._log_helper(f'Found a video, but the episode {showlink} is already processed,<br>'
-                                 f'.. skipping: {videofile}')
-                if ep_detail_sql:
-                    reset_status(parse_result.show_obj.tvid,
-                                 parse_result.show_obj.prodid,
-                                 parse_result.season_number,
-                                 parse_result.episode_numbers[0])
-                return True
+        # Needed if we have downloaded the same episode @ different quality
+        if is_processed_file(videofile, *ep_detail):
+            self._log_helper(f'Found a video, but the episode {showlink} is already processed,<br>'
+                             f'.. skipping: {videofile}')
+            if ep_detail:
+                reset_status(*ep_detail)
+            return True
 
         return False
 
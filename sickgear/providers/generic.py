@@ -49,7 +49,7 @@ import requests.cookies
 
 from _23 import decode_bytes, make_btih, quote, quote_plus, urlparse
 from six import iteritems, iterkeys, itervalues, string_types
-from sg_helpers import try_int
+from sg_helpers import FAILURE_LEDGER, try_int
 
 # noinspection PyUnreachableCode
 if False:
@@ -166,27 +166,24 @@ class ProviderFailList(object):
                 self._fails.append(fail)
                 logger.debug('Adding fail.%s for %s' % (ProviderFailTypes.names.get(
                     fail.fail_type, ProviderFailTypes.names[ProviderFailTypes.other]), self.provider_name()))
-            self.save_list()
+            if isinstance(fail.fail_time, datetime.datetime):
+                value = SGDatetime.timestamp_near(fail.fail_time)
+            else:
+                value = SGDatetime.timestamp_far(fail.fail_time)
+            FAILURE_LEDGER.add_fail('provider_fails', 'prov_name', self.provider_name(), fail.fail_type, fail.code,
+                                    value)
 
     def save_list(self):
+        """
+        write pending failures now instead of on the next ledger flush
+        """
         if self.dirty:
-            self.clear_old()
-            with self.lock:
-                my_db = db.DBConnection('cache.db')
-                cl = []
-                for f in self._fails:
-                    if isinstance(f.fail_time, datetime.datetime):
-                        value = SGDatetime.timestamp_near(f.fail_time)
-                    else:
-                        value = SGDatetime.timestamp_far(f.fail_time)
-                    cl.append(['INSERT OR IGNORE INTO provider_fails (prov_name, fail_type, fail_code, fail_time) '
-                               'VALUES (?,?,?,?)', [self.provider_name(), f.fail_type, f.code, value]])
-                self.dirty = False
-                if cl:
-                    my_db.mass_action(cl)
+            FAILURE_LEDGER.flush()
+            self.dirty = False
             self.last_save = datetime.datetime.now()
 
     def load_list(self):
+        FAILURE_LEDGER.flush()
         with self.lock:
             try:
                 my_db = db.DBConnection('cache.db')
@@ -290,6 +287,7 @@ class GenericProvider(object):
 
     def _load_fail_values(self):
         if hasattr(sickgear, 'DATA_DIR'):
+            FAILURE_LEDGER.flush()
             my_db = db.DBConnection('cache.db')
             if my_db.has_table('provider_fails_count'):
                 r = my_db.select('SELECT * FROM provider_fails_count WHERE prov_name = ?', [self.get_id()])
@@ -311,13 +309,7 @@ class GenericProvider(object):
                 self._last_fail_type = self.last_fail
 
     def _save_fail_value(self, field, value):
-        my_db = db.DBConnection('cache.db')
-        if my_db.has_table('provider_fails_count'):
-            r = my_db.action('UPDATE provider_fails_count SET %s = ? WHERE prov_name = ?' % field,
-                             [value, self.get_id()])
-            if 0 == r.rowcount:
-                my_db.action('REPLACE INTO provider_fails_count (prov_name, %s) VALUES (?,?)' % field,
-                             [self.get_id(), value])
+        FAILURE_LEDGER.set_value('provider_fails_count', 'prov_name', self.get_id(), field, value)
 
     @property
     def last_fail(self):
@@ -626,7 +618,6 @@ class GenericProvider(object):
             log_failure_url = True and use_failure_counter
             use_failure_counter and self.inc_failure_count(ProviderFail(fail_type=ProviderFailTypes.other))
 
-        self.fails.save_list()
         if log_failure_url:
             self.log_failure_url(url, post_data, post_json)
         return data
@@ -1284,7 +1275,7 @@ class GenericProvider(object):
                 logger.debug(f'Adding item from search to cache: {title}')
                 ci = self.cache.add_cache_entry(title, url, parse_result=parse_result)
                 if None is not ci:
-                    cl.append(ci)
+                    cl.extend(ci)
                 continue
 
             # make sure we want the episode
@@ -1213,18 +1213,8 @@ class NewznabCache(tvcache.TVCache):
                 items = None
 
             if items:
-                self.clear_cache()
-
-                # parse data
-                cl = []
-                for item in items:
-                    ci = self.parse_item(n_spaces, item)
-                    if None is not ci:
-                        cl.append(ci)
-
-                if 0 < len(cl):
-                    my_db = self.get_db()
-                    my_db.mass_action(cl)
+                self.refresh_items([(self._title_and_url(item)[1], item) for item in items],
+                                   lambda i: self.parse_item(n_spaces, i))
 
             # set updated as time the attempt to fetch data is
             self.set_last_update()
@@ -1251,7 +1241,7 @@ class NewznabCache(tvcache.TVCache):
     def parse_item(self,
                    ns,  # type: Dict
                    item  # type: etree.Element
-                   ):  # type: (...) -> Union[List[AnyStr, List[Any]], None]
+                   ):  # type: (...) -> Union[List[List[AnyStr, List[Any]]], None]
         """
 
         :param ns:
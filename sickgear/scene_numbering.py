@@ -19,6 +19,7 @@
 # @copyright: Dermot Buckley
 #
 
+import threading
 import traceback
 from sqlite3 import Row
 
@@ -33,6 +34,157 @@ from .sgdatetime import SGDatetime
 if False:
     from typing import Dict, List, Optional, Tuple, Union
     from six import integer_types
+    from .tv import TVShow
+
+
+class NumberingMap(object):
+    """
+    Scene and xem numbering of a show in both directions, built with one pass each of scene_numbering and tv_episodes
+
+    Each lookup returns the same as the per episode select it replaces, or None where there is no numbering.
+    """
+    def __init__(self, scene_result, xem_result):
+        # type: (List[Row], List[Row]) -> None
+        self._scene = {}  # type: Dict[Tuple[int, int], Tuple[int, int]]
+        self._scene_abs = {}  # type: Dict[Tuple[int, int], int]
+        self._scene_abs_by_abs = {}  # type: Dict[int, int]
+        self._indexer = {}  # type: Dict[Tuple[int, int], List[Tuple[Optional[int], Optional[int]]]]
+        self._indexer_abs = {}  # type: Dict[int, List[Tuple[Optional[int], Optional[int]]]]
+        self._xem = {}  # type: Dict[Tuple[int, int], Tuple[int, int]]
+        self._xem_abs = {}  # type: Dict[Tuple[int, int], int]
+        self._xem_indexer = {}  # type: Dict[Tuple[int, int], List[Tuple[Optional[int], Optional[int]]]]
+        self._xem_indexer_abs = {}  # type: Dict[int, List[Tuple[Optional[int], Optional[int]]]]
+
+        for cur_row in scene_result:
+            self._add(cur_row, self._scene, self._scene_abs, self._indexer, self._indexer_abs)
+            if None is not cur_row['absolute_number'] and cur_row['scene_absolute_number']:
+                self._scene_abs_by_abs.setdefault(
+                    cur_row['absolute_number'], try_int(cur_row['scene_absolute_number'], None))
+        for cur_row in xem_result:
+            self._add(cur_row, self._xem, self._xem_abs, self._xem_indexer, self._xem_indexer_abs)
+
+    @staticmethod
+    def _add(row, sxe, sxe_abs, indexer, indexer_abs):
+        sxe_key, scene_key = (row['season'], row['episode']), (row['scene_season'], row['scene_episode'])
+        has_sxe = None is not sxe_key[0] and None is not sxe_key[1]
+        if has_sxe and (row['scene_season'] or row['scene_episode']):
+            s_s, s_e = try_int(row['scene_season'], None), try_int(row['scene_episode'], None)
+            if None is not s_s and None is not s_e:
+                sxe.setdefault(sxe_key, (s_s, s_e))
+        if None is not scene_key[0] and None is not scene_key[1]:
+            indexer.setdefault(scene_key, []).append(
+                (try_int(row['season'], None), try_int(row['episode'], None)))
+        if row['scene_absolute_number']:
+            if has_sxe:
+                sxe_abs.setdefault(sxe_key, try_int(row['scene_absolute_number'], None))
+            indexer_abs.setdefault(row['scene_absolute_number'], []).append(
+                (row['scene_season'], try_int(row['absolute_number'], None)))
+
+    def scene(self, season, episode):
+        # type: (int, int) -> Optional[Tuple[int, int]]
+        return self._scene.get((season, episode))
+
+    def scene_absolute(self, absolute_number, season=None, episode=None):
+        # type: (Optional[int], Optional[int], Optional[int]) -> Optional[int]
+        if None is not season and None is not episode:
+            return self._scene_abs.get((season, episode))
+        return self._scene_abs_by_abs.get(absolute_number)
+
+    def xem(self, season, episode):
+        # type: (int, int) -> Optional[Tuple[int, int]]
+        return self._xem.get((season, episode))
+
+    def xem_absolute(self, season, episode):
+        # type: (int, int) -> Optional[int]
+        return self._xem_abs.get((season, episode))
+
+    def indexer(self, scene_season, scene_episode, xem=False):
+        # type: (int, int, bool) -> List[Tuple[Optional[int], Optional[int]]]
+        return (self._indexer, self._xem_indexer)[xem].get((scene_season, scene_episode), [])
+
+    def indexer_absolute(self, scene_absolute_number, scene_season=None, xem=False):
+        # type: (int, Optional[int], bool) -> List[Optional[int]]
+        return [cur_abs for cur_season, cur_abs
+                in (self._indexer_abs, self._xem_indexer_abs)[xem].get(scene_absolute_number, [])
+                if None is scene_season or cur_season == scene_season]
+
+
+class NumberingMaps(object):
+    """
+    In memory scene and xem numbering maps of shows keyed by (tvid, prodid), and the last xem refresh time of shows
+
+    A map is built on first use and is discarded by invalidate() when numbering of the show is changed by
+    set_scene_numbering, xem_refresh, fix_xem_numbering, or a delete or id switch of the show.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._generation = 0  # type: int
+        self._maps = {}  # type: Dict[Tuple[int, int], NumberingMap]
+        self._xem_refreshed = {}  # type: Dict[Tuple[int, int], int]
+
+    def get(self, tvid, prodid):
+        # type: (int, int) -> NumberingMap
+        """
+        :param tvid: tvid
+        :param prodid: prodid
+        :return: numbering map of show
+        """
+        show_key = (tvid, prodid)
+        with self.lock:
+            num_map, generation = self._maps.get(show_key), self._generation
+        if None is num_map:
+            my_db = db.DBConnection()
+            num_map = NumberingMap(
+                my_db.select(
+                    """
+                    SELECT season, episode, absolute_number, scene_season, scene_episode, scene_absolute_number
+                    FROM scene_numbering
+                    WHERE indexer = ? AND indexer_id = ?
+                    """, [tvid, prodid]),
+                my_db.select(
+                    """
+                    SELECT season, episode, absolute_number, scene_season, scene_episode, scene_absolute_number
+                    FROM tv_episodes
+                    WHERE indexer = ? AND showid = ? AND (scene_season OR scene_episode OR scene_absolute_number) != 0
+                    """, [tvid, prodid]))
+            with self.lock:
+                # a map selected before a change is not kept
+                if generation == self._generation:
+                    self._maps[show_key] = num_map
+        return num_map
+
+    def invalidate(self, tvid=None, prodid=None):
+        # type: (Optional[int], Optional[int]) -> None
+        """
+        discard numbering map and last xem refresh time of a show, or of all shows if no show is given
+
+        :param tvid: tvid
+        :param prodid: prodid
+        """
+        with self.lock:
+            self._generation += 1
+            if None is prodid:
+                self._maps, self._xem_refreshed = {}, {}
+            else:
+                self._maps.pop((int(tvid), int(prodid)), None)
+                self._xem_refreshed.pop((int(tvid), int(prodid)), None)
+
+    def xem_refreshed(self, tvid, prodid, last_refreshed=None):
+        # type: (int, int, Optional[int]) -> Optional[int]
+        """
+        :param tvid: tvid
+        :param prodid: prodid
+        :param last_refreshed: timestamp to set as last xem refresh of show
+        :return: timestamp of last xem refresh of show, or None if not known
+        """
+        key = (int(tvid), int(prodid))
+        with self.lock:
+            if None is not last_refreshed:
+                self._xem_refreshed[key] = last_refreshed
+            return self._xem_refreshed.get(key)
+
+
+NUMBERING_MAPS = NumberingMaps()
 
 
 def get_scene_numbering(tvid, prodid, season, episode, fallback_to_xem=True, show_obj=None, **kwargs):
@@ -101,21 +253,15 @@ def find_scene_numbering(tvid, prodid, season, episode, scene_result=None):
 
     tvid, prodid = int(tvid), int(prodid)
 
+    if None is scene_result:
+        return NUMBERING_MAPS.get(tvid, prodid).scene(season, episode)
+
     sql_result = None
-    if None is not scene_result:
-        for cur_row in scene_result:
-            if cur_row['season'] == season and cur_row['episode'] == episode:
-                if cur_row['scene_season'] or cur_row['scene_episode']:
-                    sql_result = [cur_row]
-                break
-    else:
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            """
-            SELECT scene_season, scene_episode
-            FROM scene_numbering
-            WHERE indexer = ? AND indexer_id = ? AND season = ? AND episode = ? AND (scene_season OR scene_episode) != 0
-            """, [tvid, prodid, season, episode])
+    for cur_row in scene_result:
+        if cur_row['season'] == season and cur_row['episode'] == episode:
+            if cur_row['scene_season'] or cur_row['scene_episode']:
+                sql_result = [cur_row]
+            break
 
     if sql_result:
         s_s, s_e = try_int(sql_result[0]['scene_season'], None), try_int(sql_result[0]['scene_episode'], None)
@@ -201,23 +347,15 @@ def find_scene_absolute_numbering(tvid, prodid, absolute_number, season=None, ep
 
     tvid, prodid = int(tvid), int(prodid)
 
+    if None is scene_result:
+        return NUMBERING_MAPS.get(tvid, prodid).scene_absolute(absolute_number, season, episode)
+
     sql_result = None
-    if None is not scene_result:
-        for cur_row in scene_result:
-            if cur_row['season'] == season and cur_row['episode'] == episode:
-                if cur_row['scene_absolute_number']:
-                    sql_result = [cur_row]
-                break
-    else:
-        my_db = db.DBConnection()
-        sql_vars, cond = (([absolute_number], 'absolute_number = ?'),
-                          ([season, episode], 'season = ? AND episode = ?'))[has_sxe]
-        sql_result = my_db.select(
-            """
-            SELECT scene_absolute_number
-            FROM scene_numbering
-            WHERE indexer = ? AND indexer_id = ? AND %s AND scene_absolute_number != 0
-            """ % cond, [tvid, prodid] + sql_vars)
+    for cur_row in scene_result:
+        if cur_row['season'] == season and cur_row['episode'] == episode:
+            if cur_row['scene_absolute_number']:
+                sql_result = [cur_row]
+            break
 
     if sql_result:
         return try_int(sql_result[0]['scene_absolute_number'], None)
@@ -247,18 +385,12 @@ def get_indexer_numbering(tvid, prodid, scene_season, scene_episode, fallback_to
 
     tvid, prodid = int(tvid), int(prodid)
 
-    my_db = db.DBConnection()
-    sql_result = my_db.select(
-        """
-        SELECT season, episode
-        FROM scene_numbering
-        WHERE indexer = ? AND indexer_id = ? AND scene_season = ? AND scene_episode = ?
-        """, [tvid, prodid, scene_season, scene_episode])
+    ep_nums = NUMBERING_MAPS.get(tvid, prodid).indexer(scene_season, scene_episode)
 
-    if sql_result:
-        if return_multiple and 1 < len(sql_result):
-            return [(try_int(_s['season'], None), try_int(_s['episode'], None)) for _s in sql_result]
-        ss, se = try_int(sql_result[0]['season'], None), try_int(sql_result[0]['episode'], None)
+    if ep_nums:
+        if return_multiple and 1 < len(ep_nums):
+            return list(ep_nums)
+        ss, se = ep_nums[0]
         if None is not ss and None is not se:
             return ss, se
     if fallback_to_xem:
@@ -288,20 +420,7 @@ def get_indexer_absolute_numbering(tvid, prodid, scene_absolute_number, fallback
 
     tvid, prodid = int(tvid), int(prodid)
 
-    my_db = db.DBConnection()
-
-    sql = """
-    SELECT absolute_number
-    FROM scene_numbering
-    WHERE indexer = ? AND indexer_id = ? AND scene_absolute_number = ?
-    """
-    params = [tvid, prodid, scene_absolute_number]
-    if None is not scene_season:
-        sql += ' AND scene_season = ?'
-        params += [scene_season]
-
-    for cur_row in (my_db.select(sql, params) or []):
-        an = try_int(cur_row['absolute_number'], None)
+    for an in NUMBERING_MAPS.get(tvid, prodid).indexer_absolute(scene_absolute_number, scene_season):
         if None is not an:
             return an
     if fallback_to_xem:
@@ -309,6 +428,76 @@ def get_indexer_absolute_numbering(tvid, prodid, scene_absolute_number, fallback
     return scene_absolute_number
 
 
+def get_scene_numbering_list(tvid, prodid, episodes, fallback_to_xem=True, show_obj=None):
+    # type: (int, integer_types, List[Tuple[int, int]], bool, Optional[TVShow]) -> List[Tuple[int, int]]
+    """
+    get_scene_numbering of each episode in a list of episodes of a show, with the numbering map of the show
+
+    :param tvid: tvid
+    :param prodid: prodid
+    :param episodes: (season, episode) of each episode
+    :param fallback_to_xem: If set (the default), check xem for matches if there is no local scene numbering
+    :param show_obj: show object
+    :return: (scene_season, scene_episode) of each episode in the order of episodes
+    """
+    if None is not prodid and None is show_obj:
+        show_obj = sickgear.helpers.find_show_by_id({int(tvid): int(prodid)})
+    return [get_scene_numbering(tvid, prodid, cur_season, cur_episode, fallback_to_xem, show_obj=show_obj)
+            for cur_season, cur_episode in episodes]
+
+
+def get_scene_absolute_numbering_list(tvid, prodid, episodes, fallback_to_xem=True, show_obj=None):
+    # type: (int, integer_types, List[Tuple[Optional[int], Optional[int], Optional[int]]], bool, Optional[TVShow]) -> List[Optional[int]]
+    """
+    get_scene_absolute_numbering of each episode in a list of episodes of a show, with the numbering map of the show
+
+    :param tvid: tvid
+    :param prodid: prodid
+    :param episodes: (absolute_number, season, episode) of each episode
+    :param fallback_to_xem: If set (the default), check xem for matches if there is no local scene numbering
+    :param show_obj: show object
+    :return: scene absolute number of each episode in the order of episodes
+    """
+    if None is not prodid and None is show_obj:
+        show_obj = sickgear.helpers.find_show_by_id({int(tvid): int(prodid)})
+    return [get_scene_absolute_numbering(tvid, prodid, cur_absolute, cur_season, cur_episode, fallback_to_xem,
+                                         show_obj=show_obj)
+            for cur_absolute, cur_season, cur_episode in episodes]
+
+
+def get_indexer_numbering_list(tvid, prodid, scene_episodes, fallback_to_xem=True, return_multiple=False):
+    # type: (int, integer_types, List[Tuple[int, int]], bool, bool) -> List[Union[Tuple[Optional[int], Optional[int]], List[Tuple[Optional[int], Optional[int]]]]]
+    """
+    get_indexer_numbering of each episode in a list of scene episodes of a show, with the numbering map of the show
+
+    :param tvid: tvid
+    :param prodid: prodid
+    :param scene_episodes: (scene_season, scene_episode) of each episode
+    :param fallback_to_xem: If set (the default), check xem for matches if there is no local scene numbering
+    :param return_multiple: a list of (season, episode) for a scene episode of more than one episode
+    :return: (season, episode) of each scene episode in the order of scene_episodes
+    """
+    return [get_indexer_numbering(tvid, prodid, cur_season, cur_episode, fallback_to_xem, return_multiple)
+            for cur_season, cur_episode in scene_episodes]
+
+
+def get_indexer_absolute_numbering_list(tvid, prodid, scene_absolute_numbers, fallback_to_xem=True,
+                                        scene_season=None):
+    # type: (int, integer_types, List[int], bool, Optional[int]) -> List[int]
+    """
+    get_indexer_absolute_numbering of each scene absolute number in a list of a show, with the numbering map of the show
+
+    :param tvid: tvid
+    :param prodid: prodid
+    :param scene_absolute_numbers: scene absolute numbers
+    :param fallback_to_xem: If set (the default), check xem for matches if there is no local scene numbering
+    :param scene_season: scene season
+    :return: absolute number of each scene absolute number in the order of scene_absolute_numbers
+    """
+    return [get_indexer_absolute_numbering(tvid, prodid, cur_absolute, fallback_to_xem, scene_season)
+            for cur_absolute in scene_absolute_numbers]
+
+
 def set_scene_numbering(tvid=None, prodid=None, season=None, episode=None, absolute_number=None,
                         scene_season=None, scene_episode=None, scene_absolute=None, anime=False):
     """
@@ -396,6 +585,8 @@ def set_scene_numbering(tvid=None, prodid=None, season=None, episode=None, absol
             WHERE indexer = ? AND indexer_id = ? AND absolute_number = ?
             """, [scene_absolute, tvid, prodid, absolute_number])
 
+    NUMBERING_MAPS.invalidate(tvid, prodid)
+
 
 def find_xem_numbering(tvid, prodid, season, episode, show_result=None):
     """
@@ -422,19 +613,13 @@ def find_xem_numbering(tvid, prodid, season, episode, show_result=None):
 
     xem_refresh(tvid, prodid)
 
+    if None is show_result:
+        return NUMBERING_MAPS.get(tvid, prodid).xem(season, episode)
+
     sql_result = None
-    if None is not show_result:
-        if isinstance(show_result, Row) and (season, episode) == (show_result['season'], show_result['episode']) \
-                and (show_result['scene_season'] or show_result['scene_episode']):
-            sql_result = [show_result]
-    else:
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            """
-            SELECT scene_season, scene_episode
-            FROM tv_episodes
-            WHERE indexer = ? AND showid = ? AND season = ? AND episode = ? AND (scene_season OR scene_episode) != 0
-            """, [tvid, prodid, season, episode])
+    if isinstance(show_result, Row) and (season, episode) == (show_result['season'], show_result['episode']) \
+            and (show_result['scene_season'] or show_result['scene_episode']):
+        sql_result = [show_result]
 
     if sql_result:
         s_s, s_e = try_int(sql_result[0]['scene_season'], None), try_int(sql_result[0]['scene_episode'], None)
@@ -469,19 +654,13 @@ def find_xem_absolute_numbering(tvid, prodid, absolute_number, season, episode,
 
     xem_refresh(tvid, prodid)
 
+    if None is show_result:
+        return NUMBERING_MAPS.get(tvid, prodid).xem_absolute(season, episode)
+
     sql_result = None
-    if None is not show_result:
-        if isinstance(show_result, Row) and (season, episode) == (show_result['season'], show_result['episode']) \
-                and show_result['scene_absolute_number']:
-            sql_result = [show_result]
-    else:
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            """
-            SELECT scene_absolute_number
-            FROM tv_episodes
-            WHERE indexer = ? AND showid = ? AND season = ? AND episode = ? AND scene_absolute_number != 0
-            """, [tvid, prodid, season, episode])
+    if isinstance(show_result, Row) and (season, episode) == (show_result['season'], show_result['episode']) \
+            and show_result['scene_absolute_number']:
+        sql_result = [show_result]
 
     if sql_result:
         return try_int(sql_result[0]['scene_absolute_number'], None)
@@ -511,19 +690,12 @@ def get_indexer_numbering_for_xem(tvid, prodid, scene_season, scene_episode, ret
 
     xem_refresh(tvid, prodid)
 
-    my_db = db.DBConnection()
-    sql_result = my_db.select(
-        """
-        SELECT season, episode
-        FROM tv_episodes
-        WHERE indexer = ? AND showid = ? AND scene_season = ? AND scene_episode = ?
-        """, [tvid, prodid, scene_season, scene_episode])
+    ep_nums = NUMBERING_MAPS.get(tvid, prodid).indexer(scene_season, scene_episode, xem=True)
 
-    if return_multiple and 1 < len(sql_result or []):
-        return [(try_int(_s['season'], None), try_int(_s['episode'], None)) for _s in sql_result]
+    if return_multiple and 1 < len(ep_nums):
+        return list(ep_nums)
 
-    for cur_row in (sql_result or []):
-        ss, se = try_int(cur_row['season'], None), try_int(cur_row['episode'], None)
+    for ss, se in ep_nums:
         if None is not ss and None is not se:
             return ss, se
         break
@@ -553,19 +725,7 @@ def get_indexer_absolute_numbering_for_xem(tvid, prodid, scene_absolute_number,
 
     xem_refresh(tvid, prodid)
 
-    my_db = db.DBConnection()
-    sql = """
-    SELECT absolute_number
-    FROM tv_episodes
-    WHERE indexer = ? AND showid = ? AND scene_absolute_number = ?
-    """
-    params = [tvid, prodid, scene_absolute_number]
-    if None is not scene_season:
-        sql += ' AND scene_season = ?'
-        params += [scene_season]
-
-    for cur_row in (my_db.select(sql, params) or []):
-        an = try_int(cur_row['absolute_number'], None)
+    for an in NUMBERING_MAPS.get(tvid, prodid).indexer_absolute(scene_absolute_number, scene_season, xem=True):
         if None is not an:
             return an
         break
@@ -784,25 +944,26 @@ def xem_refresh(tvid, prodid, force=False):
     max_refresh_age_secs = 86400  # 1 day
 
     my_db = db.DBConnection()
-    sql_result = my_db.select(
-        """
-        SELECT last_refreshed
-        FROM xem_refresh
-        WHERE indexer = ? AND indexer_id = ?
-        """, [tvid, prodid])
-    if sql_result:
-        last_refresh = int(sql_result[0]['last_refreshed'])
-        refresh = SGDatetime.timestamp_near() > last_refresh + max_refresh_age_secs
-    else:
-        refresh = True
+    last_refresh = NUMBERING_MAPS.xem_refreshed(tvid, prodid)
+    if None is last_refresh:
+        sql_result = my_db.select(
+            """
+            SELECT last_refreshed
+            FROM xem_refresh
+            WHERE indexer = ? AND indexer_id = ?
+            """, [tvid, prodid])
+        if sql_result:
+            last_refresh = NUMBERING_MAPS.xem_refreshed(tvid, prodid, int(sql_result[0]['last_refreshed']))
 
-    if refresh or force:
+    if None is last_refresh or force or SGDatetime.timestamp_near() > last_refresh + max_refresh_age_secs:
         logger.debug(f'Looking up XEM scene mapping for show {prodid} on {tvinfo.name}')
 
         # mark refreshed
+        last_refresh = SGDatetime.timestamp_near()
         my_db.upsert('xem_refresh',
-                     dict(last_refreshed=SGDatetime.timestamp_near()),
+                     dict(last_refreshed=last_refresh),
                      dict(indexer=tvid, indexer_id=prodid))
+        NUMBERING_MAPS.xem_refreshed(tvid, prodid, last_refresh)
 
         try:
             parsed_json = sickgear.helpers.get_url(url, parse_json=True, timeout=90)
@@ -825,6 +986,8 @@ def xem_refresh(tvid, prodid, force=False):
                 if 0 < len(cl):
                     my_db = db.DBConnection()
                     my_db.mass_action(cl)
+                    NUMBERING_MAPS.invalidate(tvid, prodid)
+                    NUMBERING_MAPS.xem_refreshed(tvid, prodid, last_refresh)
             else:
                 logger.debug(f'Empty lookup result - no XEM data for show {prodid} on {tvinfo.name}')
         except (BaseException, Exception) as e:
@@ -956,6 +1119,7 @@ def fix_xem_numbering(tvid, prodid):
     if 0 < len(cl):
         my_db = db.DBConnection()
         my_db.mass_action(cl)
+        NUMBERING_MAPS.invalidate(tvid, prodid)
 
 
 def set_scene_numbering_helper(tvid, prodid, for_season=None, for_episode=None, for_absolute=None,
@@ -29,6 +29,7 @@ from . import clients, common, db, failed_history, helpers, history, logger, \
     notifiers, nzbget, nzbSplitter, show_name_helpers, sab, ui
 from .common import DOWNLOADED, SNATCHED, SNATCHED_BEST, SNATCHED_PROPER, MULTI_EP_RESULT, SEASON_RESULT, Quality
 from .providers.generic import GenericProvider
+from .search_executor import PROVIDER_EXECUTOR
 from .tv import TVEpisode, TVShow
 
 from six import iteritems, itervalues, string_types
@@ -160,6 +161,7 @@ def snatch_episode(result, end_status=SNATCHED):
 
     # don't notify when we re-download an episode
     sql_l = []
+    saved_l = []
     update_imdb_data = True
     for cur_ep_obj in result.ep_obj_list:
         with cur_ep_obj.lock:
@@ -171,6 +173,7 @@ def snatch_episode(result, end_status=SNATCHED):
             item = cur_ep_obj.get_sql()
             if None is not item:
                 sql_l.append(item)
+                saved_l.append(cur_ep_obj)
 
         if cur_ep_obj.status not in Quality.DOWNLOADED:
             notifiers.notify_snatch(cur_ep_obj)
@@ -180,6 +183,8 @@ def snatch_episode(result, end_status=SNATCHED):
     if 0 < len(sql_l):
         my_db = db.DBConnection()
         my_db.mass_action(sql_l)
+        for cur_ep_obj in saved_l:
+            cur_ep_obj.mark_saved()
 
     return True
 
@@ -529,16 +534,17 @@ def wanted_episodes(show_obj,  # type: TVShow
     total_wanted = total_replacing = total_unaired = 0
 
     if 0 < len(sql_result) and 2 < len(sql_result) - len(show_obj.sxe_ep_obj):
-        my_db = db.DBConnection()
-        ep_sql_result = my_db.select(
-            'SELECT * FROM tv_episodes'
-            ' WHERE indexer = ? AND showid = ?',
-            [show_obj.tvid, show_obj.prodid])
+        ep_rows, scene_rows = show_obj.select_episode_rows()
     else:
-        ep_sql_result = None
+        ep_rows = scene_rows = None
 
     for result in sql_result:
-        ep_obj = show_obj.get_episode(int(result['season']), int(result['episode']), ep_result=ep_sql_result)
+        ep_key = (int(result['season']), int(result['episode']))
+        if None is ep_rows:
+            ep_obj = show_obj.get_episode(*ep_key)
+        else:
+            ep_obj = show_obj.get_episode(*ep_key, ep_result=ep_rows.get(ep_key, []),
+                                          scene_result=scene_rows.get(ep_key, []))
         cur_status, cur_quality = common.Quality.split_composite_status(ep_obj.status)
         ep_obj.wanted_quality = get_wanted_qualities(ep_obj, cur_status, cur_quality, unaired=unaired)
         if not ep_obj.wanted_quality:
@@ -571,68 +577,118 @@ def wanted_episodes(show_obj,  # type: TVShow
     return wanted
 
 
-def search_for_needed_episodes(ep_obj_list):
-    # type: (List[TVEpisode]) -> List[search_result_type]
+def _match_provider_rss(provider, ep_obj_list, orig_thread_name):
+    # type: (GenericProvider, List[TVEpisode], AnyStr) -> List[Tuple[TVEpisode, search_result_type]]
     """
-    search for episodes in list
+    match the cache of a provider to episodes and pick a single result for each episode
 
+    :param provider: provider
     :param ep_obj_list: list of episode objects
-    :return: list of found search results
+    :param orig_thread_name: name of the thread that started the search, used to filter releases
+    :return: list of episode object and best result of the provider for the episode, in provider cache order
     """
-    found_results = {}
+    matches = []
+    ep_obj_search_result_list = provider.search_rss(ep_obj_list)
 
-    search_done = False
+    for cur_ep_obj in ep_obj_search_result_list:
 
-    orig_thread_name = threading.current_thread().name
+        if cur_ep_obj.show_obj.paused:
+            logger.debug(f'Show {cur_ep_obj.show_obj.unique_name} is paused,'
+                         f' ignoring all RSS items for {cur_ep_obj.pretty_name()}')
+            continue
 
-    providers = list(filter(lambda x: x.is_active() and x.enable_recentsearch, sickgear.providers.sorted_sources()))
+        # find the best result for the current episode
+        best_result = pick_best_result(ep_obj_search_result_list[cur_ep_obj], cur_ep_obj.show_obj,
+                                       filter_rls=orig_thread_name)
 
-    for cur_provider in providers:
-        threading.current_thread().name = '%s :: [%s]' % (orig_thread_name, cur_provider.name)
+        # if all results were rejected move on to the next episode
+        if not best_result:
+            logger.debug(f'All found results for {cur_ep_obj.pretty_name()} were rejected.')
+            continue
 
-        ep_obj_search_result_list = cur_provider.search_rss(ep_obj_list)
+        matches.append((cur_ep_obj, best_result))
 
-        search_done = True
+    return matches
 
-        # pick a single result for each episode, respecting existing results
-        for cur_ep_obj in ep_obj_search_result_list:
 
-            if cur_ep_obj.show_obj.paused:
-                logger.debug(f'Show {cur_ep_obj.show_obj.unique_name} is paused,'
-                             f' ignoring all RSS items for {cur_ep_obj.pretty_name()}')
-                continue
+def _prevalidate_torrent(search_result):
+    # type: (search_result_type) -> bool
+    """
+    fetch the torrent of a result to filter out possible bad torrents from providers
 
-            # find the best result for the current episode
-            best_result = pick_best_result(ep_obj_search_result_list[cur_ep_obj], cur_ep_obj.show_obj,
-                                           filter_rls=orig_thread_name)
+    :param search_result: search result
+    :return: True if the result can be snatched
+    """
+    if 'torrent' == search_result.resultType and 'blackhole' != sickgear.TORRENT_METHOD:
+        search_result.content = None
+        if not search_result.url.startswith('magnet'):
+            search_result.content = search_result.provider.get_url(search_result.url, as_binary=True)
+            if not search_result.content:
+                return False
+    return True
 
-            # if all results were rejected move on to the next episode
-            if not best_result:
-                logger.debug(f'All found results for {cur_ep_obj.pretty_name()} were rejected.')
-                continue
 
-            # if it's already in the list (from another provider) and the newly found quality is no better, then skip it
-            if cur_ep_obj in found_results and best_result.quality <= found_results[cur_ep_obj].quality:
-                continue
+def search_for_needed_episodes(ep_obj_list, concurrent=True):
+    # type: (List[TVEpisode], bool) -> List[search_result_type]
+    """
+    search for episodes in list
 
-            # filter out possible bad torrents from providers
-            if 'torrent' == best_result.resultType and 'blackhole' != sickgear.TORRENT_METHOD:
-                best_result.content = None
-                if not best_result.url.startswith('magnet'):
-                    best_result.content = best_result.provider.get_url(best_result.url, as_binary=True)
-                    if best_result.provider.should_skip():
-                        break
-                    if not best_result.content:
-                        continue
+    the best result for an episode is the highest quality result that passes torrent prevalidation, and for an equal
+    quality the result of the provider with the highest priority, regardless of the order providers finish in
+
+    :param ep_obj_list: list of episode objects
+    :param concurrent: match provider caches and prevalidate torrents in the shared provider pool, otherwise one
+    provider after another in this thread
+    :return: list of found search results
+    """
+    orig_thread_name = threading.current_thread().name
 
-            found_results[cur_ep_obj] = best_result
+    providers = list(filter(lambda x: x.is_active() and x.enable_recentsearch, sickgear.providers.sorted_sources()))
 
+    if concurrent:
+        futures = [PROVIDER_EXECUTOR.submit(cur_provider, _match_provider_rss, cur_provider, ep_obj_list,
+                                            orig_thread_name) for cur_provider in providers]
+        provider_matches = [matches for _, matches in PROVIDER_EXECUTOR.results(futures, PROVIDER_EXECUTOR.deadline)]
+    else:
+        provider_matches = []
+        for cur_provider in providers:
+            threading.current_thread().name = '%s :: [%s]' % (orig_thread_name, cur_provider.name)
             try:
-                cur_provider.fails.save_list()
-            except (BaseException, Exception):
-                pass
+                provider_matches.append(_match_provider_rss(cur_provider, ep_obj_list, orig_thread_name))
+            except (BaseException, Exception) as e:
+                logger.error(f'Error while matching {cur_provider.name}, skipping: {ex(e)}')
+                provider_matches.append(None)
+        threading.current_thread().name = orig_thread_name
+
+    search_done = any(None is not cur_matches for cur_matches in provider_matches)
+
+    # order the candidates of each episode by quality, then provider priority, then provider cache order
+    candidates = {}  # type: Dict[TVEpisode, List[search_result_type]]
+    for cur_matches in filter(None, provider_matches):
+        for cur_ep_obj, cur_result in cur_matches:
+            candidates.setdefault(cur_ep_obj, []).append(cur_result)
+    for cur_ep_obj in candidates:
+        candidates[cur_ep_obj].sort(key=lambda r: -r.quality)
+    ep_obj_order = list(candidates)
+
+    # prevalidate the leading candidate of every episode at once, and the next candidate where one is rejected
+    found_results = {}
+    while candidates:
+        leading = [(cur_ep_obj, cur_results.pop(0)) for cur_ep_obj, cur_results in iteritems(candidates)]
+        if concurrent:
+            futures = [PROVIDER_EXECUTOR.submit(cur_result.provider, _prevalidate_torrent, cur_result)
+                       for _, cur_result in leading]
+            passed = [bool(cur_passed) for _, cur_passed in
+                      PROVIDER_EXECUTOR.results(futures, PROVIDER_EXECUTOR.deadline)]
+        else:
+            passed = [_prevalidate_torrent(cur_result) for _, cur_result in leading]
 
-    threading.current_thread().name = orig_thread_name
+        for (cur_ep_obj, cur_result), cur_passed in zip(leading, passed):
+            if cur_passed:
+                found_results[cur_ep_obj] = cur_result
+                del candidates[cur_ep_obj]
+            elif not candidates[cur_ep_obj]:
+                del candidates[cur_ep_obj]
 
     if not len(providers):
         logger.warning('No NZB/Torrent providers in Media Providers/Options are enabled to match recent episodes')
@@ -640,7 +696,7 @@ def search_for_needed_episodes(ep_obj_list):
         logger.error(f'Failed recent search of {len(providers)} enabled provider{helpers.maybe_plural(providers)}.'
                      f' More info in debug log.')
 
-    return list(found_results.values())
+    return [found_results[cur_ep_obj] for cur_ep_obj in ep_obj_order if cur_ep_obj in found_results]
 
 
 def can_reject(release_name):
@@ -865,7 +921,7 @@ def search_providers(
     final_results = []  # type: List[search_result_type]
 
     search_done = False
-    search_threads = []
+    search_futures = []
 
     orig_thread_name = threading.current_thread().name
 
@@ -874,7 +930,8 @@ def search_providers(
                      (not torrent_only or GenericProvider.TORRENT == x.providerType) and
                      (not scheduled or getattr(x, 'enable_scheduled_backlog', None))]
 
-    # create a thread for each provider to search
+    # queue a fetch for each provider to search through the shared bounded provider pool
+    search_list = []
     for cur_provider in provider_list:
         if cur_provider.anime_only and not show_obj.is_anime:
             logger.debug(f'{show_obj.unique_name} is not an anime, skipping')
@@ -883,32 +940,26 @@ def search_providers(
         provider_id = cur_provider.get_id()
 
         found_results[provider_id] = {}
-        search_threads.append(threading.Thread(target=_search_provider_thread,
-                                               kwargs=dict(provider=cur_provider,
-                                                           provider_results=found_results[provider_id],
-                                                           show_obj=show_obj, ep_obj_list=ep_obj_list,
-                                                           manual_search=manual_search,
-                                                           try_other_searches=try_other_searches),
-                                               name='%s :: [%s]' % (orig_thread_name, cur_provider.name)))
-
-        # start the provider search thread
-        search_threads[-1].start()
+        search_list.append(cur_provider)
+        search_futures.append(PROVIDER_EXECUTOR.submit(
+            cur_provider, _search_provider_thread,
+            provider=cur_provider, provider_results=found_results[provider_id], show_obj=show_obj,
+            ep_obj_list=ep_obj_list, manual_search=manual_search, try_other_searches=try_other_searches,
+            thread_name='%s :: [%s]' % (orig_thread_name, cur_provider.name)))
         search_done = True
 
-    # wait for all searches to finish
-    for s_t in search_threads:
-        s_t.join()
-
     any_qualities, best_qualities = Quality.split_quality(show_obj.quality)
     params = dict(show_obj=show_obj, old_status=old_status, best_qualities=best_qualities,
                   orig_thread_name=orig_thread_name)
 
-    # now look in all the results
-    for cur_provider in provider_list:
+    # now look in the results of each provider in priority order as soon as the provider is done
+    for cur_index, _ in PROVIDER_EXECUTOR.results(search_futures, PROVIDER_EXECUTOR.deadline):
+        cur_provider = search_list[cur_index]
         provider_id = cur_provider.get_id()
 
-        # skip to next provider if we have no results to process
-        if provider_id not in found_results or not len(found_results[provider_id]):
+        # skip to next provider if we have no results to process, results of a timed out search are discarded
+        if not search_futures[cur_index].done() or provider_id not in found_results \
+                or not len(found_results[provider_id]):
             continue
 
         # pick the best season NZB
@@ -942,13 +993,10 @@ def search_providers(
             logger.log(f'Executed query: [{sql}]')
             logger.debug(f'Episode list: {ep_nums}')
 
-            all_wanted = True
-            any_wanted = False
-            for ep_num in ep_nums:
-                if not show_obj.want_episode(ep_num[0], ep_num[1], season_qual):
-                    all_wanted = False
-                else:
-                    any_wanted = True
+            wanted = show_obj.want_episodes([(cur_season, cur_episode, season_qual)
+                                             for cur_season, cur_episode in ep_nums])
+            all_wanted = all(wanted)
+            any_wanted = any(wanted)
 
             # if we need every ep in the season and there's nothing better,
             # then download this and be done with it (unless single episodes are preferred)
@@ -1103,6 +1151,7 @@ def search_providers(
 
         # make sure we search every provider for results unless we found everything we wanted
         if len(ep_obj_list) == wanted_ep_count:
+            PROVIDER_EXECUTOR.cancel(search_futures)
             break
 
     if not len(provider_list):
@@ -0,0 +1,194 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import datetime
+import threading
+import time
+
+from exceptions_helper import ex
+
+from . import logger
+
+from six import itervalues
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import Any, AnyStr, Callable, Dict, Iterator, List, Optional, Tuple
+    from .providers.generic import GenericProvider
+
+
+class ProviderSearchExecutor(object):
+    """
+    A bounded pool of worker threads shared by every provider fetch of active searches and cache updates
+
+    Fetches queue per provider and a pool worker is only taken once a provider has a free slot, so a busy provider
+    does not hold workers that other providers could use. A fetch waits for a short request limit (tmr_limit_*) the
+    provider is under to lapse, provided that happens before the search deadline.
+    """
+    def __init__(self, max_workers=10, provider_concurrency=2, deadline=900, max_limit_wait=60):
+        # type: (int, int, int, int) -> None
+        """
+        :param max_workers: global limit of concurrent provider fetches
+        :param provider_concurrency: limit of concurrent fetches per provider
+        :param deadline: default number of seconds a search waits for provider results
+        :param max_limit_wait: longest request limit in seconds to wait out, the provider skips itself when longer
+        """
+        self.max_workers = max_workers  # type: int
+        self.provider_concurrency = provider_concurrency  # type: int
+        self.deadline = deadline  # type: int
+        self.max_limit_wait = max_limit_wait  # type: int
+        self._lock = threading.Lock()
+        self._pool = None  # type: Optional[ThreadPoolExecutor]
+        self._active = {}  # type: Dict[AnyStr, int]
+        self._pending = {}  # type: Dict[AnyStr, deque]
+
+    def _get_pool(self):
+        # type: (...) -> ThreadPoolExecutor
+        if None is self._pool:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='PROVIDER')
+        return self._pool
+
+    @staticmethod
+    def limit_wait(provider):
+        # type: (GenericProvider) -> float
+        """
+        :param provider: provider
+        :return: seconds until a request limit reached at provider lapses, 0 if it is not under a request limit
+        """
+        if not provider.valid_tmr_time():
+            return 0
+        return max(0.0, (provider.tmr_limit_time + provider.tmr_limit_wait - datetime.datetime.now()).total_seconds())
+
+    def _run(self, job):
+        # type: (Tuple) -> None
+        future, provider, func, thread_name, end_time, args, kwargs = job
+        cur_thread = threading.current_thread()
+        pool_name, cur_thread.name = cur_thread.name, thread_name
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self._fetch(provider, func, end_time, args, kwargs))
+                except (BaseException, Exception) as e:
+                    future.set_exception(e)
+        finally:
+            cur_thread.name = pool_name
+            self._next(provider.get_id())
+
+    def _fetch(self, provider, func, end_time, args, kwargs):
+        # type: (GenericProvider, Callable, float, Tuple, Dict) -> Any
+        if time.time() >= end_time:
+            logger.log('Search deadline reached before [%s] was free to fetch' % provider.name)
+            return
+        wait = self.limit_wait(provider)
+        if wait:
+            if time.time() + wait >= end_time:
+                logger.log('Request limit at [%s] lapses after the search deadline, skipping' % provider.name)
+                return
+            if wait <= self.max_limit_wait:
+                logger.log('Waiting %ds for request limit at [%s] to lapse' % (wait, provider.name))
+                time.sleep(wait)
+        return func(*args, **kwargs)
+
+    def _next(self, provider_id):
+        # type: (AnyStr) -> None
+        """
+        hand the provider slot of a finished fetch to the next fetch queued for the provider
+        """
+        with self._lock:
+            pending = self._pending.get(provider_id)
+            while pending:
+                job = pending.popleft()
+                if not job[0].cancelled():
+                    if None is not self._pool:
+                        self._pool.submit(self._run, job)
+                        return
+                    job[0].cancel()
+            self._active[provider_id] -= 1
+
+    def submit(self, provider, func, *args, **kwargs):
+        # type: (GenericProvider, Callable, Any, Any) -> Future
+        """
+        queue a provider fetch
+
+        :param provider: provider that func fetches from
+        :param func: callable to run
+        :param args: args for func
+        :param kwargs: kwargs for func, thread_name and deadline (seconds) are used here and not passed through
+        :return: future of the result of func, or None if the deadline passed or the provider is over a request limit
+        """
+        thread_name = kwargs.pop('thread_name', None) or \
+            '%s :: [%s]' % (threading.current_thread().name, provider.name)
+        end_time = time.time() + (kwargs.pop('deadline', None) or self.deadline)
+        future = Future()
+        job = (future, provider, func, thread_name, end_time, args, kwargs)
+        provider_id = provider.get_id()
+        with self._lock:
+            if self.provider_concurrency > self._active.get(provider_id, 0):
+                self._active[provider_id] = 1 + self._active.get(provider_id, 0)
+                self._get_pool().submit(self._run, job)
+            else:
+                self._pending.setdefault(provider_id, deque()).append(job)
+        return future
+
+    @staticmethod
+    def results(futures, deadline):
+        # type: (List[Future], float) -> Iterator[Tuple[int, Any]]
+        """
+        yield (index, result) of futures in the order given as soon as each completes, a pending future that is
+        still queued when the deadline passes is cancelled and yields None
+
+        :param futures: futures
+        :param deadline: seconds from now to wait for all futures
+        """
+        end_time = time.time() + deadline
+        for cur_index, cur_future in enumerate(futures):
+            try:
+                result = cur_future.result(timeout=max(0.0, end_time - time.time()))
+            except FutureTimeoutError:
+                cur_future.cancel()
+                logger.log('Search deadline reached waiting for provider results')
+                result = None
+            except CancelledError:
+                result = None
+            except (BaseException, Exception) as e:
+                logger.error('Provider fetch failed: %s' % ex(e))
+                result = None
+            yield cur_index, result
+
+    @staticmethod
+    def cancel(futures):
+        # type: (List[Future]) -> None
+        """
+        cancel queued futures that are no longer needed
+        """
+        for cur_future in futures:
+            cur_future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            for cur_pending in itervalues(self._pending):
+                for cur_job in cur_pending:
+                    cur_job[0].cancel()
+                cur_pending.clear()
+        if pool:
+            # fetches already handed to the pool still resolve their futures
+            pool.shutdown(wait=False)
+
+
+PROVIDER_EXECUTOR = ProviderSearchExecutor()
@@ -28,6 +28,7 @@ from . import common, db, failed_history, generic_queue, helpers, \
     history, logger, network_timezones, properFinder, search, ui
 from .classes import Proper, SimpleNamespace
 from .search import wanted_episodes, get_aired_in_season, set_wanted_aired
+from .search_executor import PROVIDER_EXECUTOR
 from .tv import TVEpisode
 
 # noinspection PyUnreachableCode
@@ -454,6 +455,7 @@ class RecentSearchQueueItem(generic_queue.QueueItem):
             ' ORDER BY indexer, showid', [common.UNAIRED, cur_date])
 
         sql_l = []
+        saved_l = []
         show_obj = None
         wanted = False
 
@@ -493,6 +495,7 @@ class RecentSearchQueueItem(generic_queue.QueueItem):
                 result = ep_obj.get_sql()
                 if None is not result:
                     sql_l.append(result)
+                    saved_l.append(ep_obj)
                     wanted |= (False, True)[common.WANTED == ep_obj.status]
 
         if not wanted:
@@ -501,6 +504,8 @@ class RecentSearchQueueItem(generic_queue.QueueItem):
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
             if wanted:
                 logger.log('Found new episodes marked wanted')
 
@@ -513,7 +518,7 @@ class RecentSearchQueueItem(generic_queue.QueueItem):
         :type needed: common.NeededQualities
         """
         orig_thread_name = threading.current_thread().name
-        threads = []
+        futures = []
 
         providers = list(filter(lambda x: x.is_active() and x.enable_recentsearch,
                                 sickgear.providers.sorted_sources()))
@@ -521,23 +526,21 @@ class RecentSearchQueueItem(generic_queue.QueueItem):
             if not cur_provider.cache.should_update():
                 continue
 
-            if not threads:
+            if not futures:
                 logger.log('Updating provider caches with recent upload data')
 
-            # spawn a thread for each provider to save time waiting for slow response providers
-            threads.append(threading.Thread(target=cur_provider.cache.update_cache,
-                                            kwargs={'needed': needed},
-                                            name='%s :: [%s]' % (orig_thread_name, cur_provider.name)))
-            # start the thread we just created
-            threads[-1].start()
+            # queue an update for each provider in the shared provider pool to save time waiting for slow providers
+            futures.append(PROVIDER_EXECUTOR.submit(
+                cur_provider, cur_provider.cache.update_cache, needed=needed,
+                thread_name='%s :: [%s]' % (orig_thread_name, cur_provider.name)))
 
         if not len(providers):
             logger.warning('No NZB/Torrent providers in Media Providers/Options are enabled to match recent episodes')
 
-        if threads:
-            # wait for all threads to finish
-            for t in threads:
-                t.join()
+        if futures:
+            # wait for all updates to finish
+            for _ in PROVIDER_EXECUTOR.results(futures, PROVIDER_EXECUTOR.deadline):
+                pass
 
             logger.log('Finished updating provider caches')
 
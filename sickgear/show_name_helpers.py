@@ -29,11 +29,11 @@ from .scene_exceptions import ReleaseMap
 from sg_helpers import scantree
 
 from _23 import quote_plus
-from six import iterkeys, itervalues
+from six import iterkeys, itervalues, string_types
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import AnyStr, List, Optional, Set, Union
+    from typing import AnyStr, Dict, List, Optional, Set, Union
     from .tv import TVShow
     # noinspection PyUnresolvedReferences
     from re import Pattern
@@ -153,9 +153,12 @@ def contains_any(subject,  # type: AnyStr
              then True for first pattern that does not match, or False
     :rtype: Union(NoneType, bool)
     """
-    compiled_words = compile_word_list(lookup_words, rx=rx, **kwargs)
-    if subject and compiled_words:
-        for rc_filter in compiled_words:
+    word_filter = get_word_filter(lookup_words, rx=rx, **kwargs)
+    if subject and word_filter.patterns:
+        # one search of all patterns rules out any match, else find the pattern that matched to log
+        if not invert and word_filter.combined and not word_filter.search_any(subject):
+            return False
+        for rc_filter in word_filter.patterns:
             match = rc_filter.search(subject)
             if (match and not invert) or (not match and invert):
                 msg = match and not invert and 'Found match' or ''
@@ -199,6 +202,105 @@ def compile_word_list(lookup_words,  # type: Union[AnyStr, Set[AnyStr]]
     return result
 
 
+class WordFilter(object):
+    __slots__ = ('patterns', 'combined', 'uncombined')
+
+    def __init__(self, patterns, re_prefix='', re_suffix=''):
+        # type: (List[Pattern[AnyStr]], AnyStr, AnyStr) -> None
+        """
+        compiled lookup words, and when possible, patterns combined into one alternation to search for any match
+
+        :param patterns: compiled lookup words
+        :param re_prefix: string inserted to all lookup words, to match once before the alternation
+        :param re_suffix: string appended to all lookup words, to match once after the alternation
+        """
+        self.patterns = patterns
+        self.combined = None  # type: Optional[Pattern[AnyStr]]
+        self.uncombined = patterns
+
+        start, end = len('(?i)%s' % re_prefix), len(re_suffix)
+        words, uncombined = [], []
+        for cur_rc in patterns:
+            word = cur_rc.pattern[start:len(cur_rc.pattern) - end]
+            # an alternation or backreference would change meaning within one alternation of all words
+            if is_uncombinable(word):
+                uncombined.append(cur_rc)
+            else:
+                words.append(word)
+        if 1 < len(words):
+            try:
+                self.combined = re.compile('(?i)%s(?:%s)%s' % (
+                    re_prefix, '|'.join(['(?:%s)' % cur_word for cur_word in words]), re_suffix))
+                self.uncombined = uncombined
+            except (re.error, OverflowError, RecursionError):
+                pass
+
+    def search_any(self, subject):
+        # type: (AnyStr) -> bool
+        """
+        :param subject: text to search
+        :return: True if any pattern is found in subject
+        """
+        return bool(self.combined and self.combined.search(subject)) \
+            or any([cur_rc.search(subject) for cur_rc in self.uncombined])
+
+
+def is_uncombinable(word):
+    # type: (AnyStr) -> bool
+    """
+    :param word: lookup word regex
+    :return: True if word has a backreference or an alternation outside of a group
+    """
+    if rc_backref(word):
+        return True
+    depth, in_class, escaped = 0, False, False
+    for cur_char in word:
+        if escaped:
+            escaped = False
+        elif '\\' == cur_char:
+            escaped = True
+        elif in_class:
+            in_class = ']' != cur_char
+        elif '[' == cur_char:
+            in_class = True
+        elif '(' == cur_char:
+            depth += 1
+        elif ')' == cur_char:
+            depth -= 1
+        elif '|' == cur_char and not depth:
+            return True
+    return False
+
+
+rc_backref = re.compile(r'\\[1-9]|\(\?P=').search
+word_filters = {}  # type: Dict[tuple, WordFilter]
+
+
+def get_word_filter(lookup_words,  # type: Union[AnyStr, Set[AnyStr], List[AnyStr]]
+                    re_prefix=r'(^|[\W_])',  # type: AnyStr
+                    re_suffix=r'($|[\W_])',  # type: AnyStr
+                    rx=None
+                    ):  # type: (...) -> WordFilter
+    """
+    get lookup words compiled once for each distinct set of words, so a change of config or show words is a new key
+
+    :param lookup_words: List or comma separated string of words to search
+    :param re_prefix: insert string to all lookup words
+    :param re_suffix: append string to all lookup words
+    :param rx: lookup_words are regex
+    :return: compiled words
+    """
+    key = (isinstance(lookup_words, string_types) and lookup_words
+           or (isinstance(lookup_words, list), frozenset(lookup_words or [])), re_prefix, re_suffix, rx)
+    word_filter = word_filters.get(key)
+    if None is word_filter:
+        if 500 < len(word_filters):
+            word_filters.clear()
+        word_filter = word_filters[key] = WordFilter(
+            compile_word_list(lookup_words, re_prefix, re_suffix, rx), re_prefix, re_suffix)
+    return word_filter
+
+
 def url_encode(show_names, spacer='.'):
     # type: (List[AnyStr], AnyStr) -> List[AnyStr]
     """
@@ -259,7 +361,7 @@ def make_scene_season_search_string(show_obj,  # type: sickgear.tv.TVShow
         season_strings = [str(ep_obj.airdate).split('-')[0]]
     elif show_obj.is_anime:
         numseasons = 0
-        ep_obj_list = show_obj.get_all_episodes(ep_obj.season)
+        ep_obj_list = show_obj.iter_all_episodes(ep_obj.season)
 
         # get show qualities
         any_qualities, best_qualities = common.Quality.split_quality(show_obj.quality)
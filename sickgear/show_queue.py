@@ -939,6 +939,7 @@ class QueueItemAdd(ShowQueueItem):
                 update = 'UPDATE [tv_episodes] SET status = ? WHERE indexer = ? AND indexerid IN (%s)' % \
                          ','.join(['?'] * len(selected_ids))
                 db_obj.action(update, [WANTED, self.show_obj.tvid] + selected_ids)
+                self.show_obj.ep_status_index.reset()
 
                 # noinspection SqlResolve
                 sql_result = db_obj.select('SELECT changes() as last FROM [tv_episodes]')
@@ -1110,6 +1111,7 @@ class QueueItemAdd(ShowQueueItem):
                 SET status = ?
                 WHERE status = ? AND indexer = ? AND showid = ? AND season != 0
                 """, [self.default_status, SKIPPED, self.show_obj.tvid, self.show_obj.prodid])
+            self.show_obj.ep_status_index.reset()
 
         items_wanted = self._get_wanted(my_db, self.default_wanted_begin, latest=False)
         items_wanted += self._get_wanted(my_db, self.default_wanted_latest, latest=True)
@@ -1289,7 +1291,7 @@ class QueueItemRename(ShowQueueItem):
 
         ep_obj_rename_list = []
 
-        ep_obj_list = self.show_obj.get_all_episodes(has_location=True)
+        ep_obj_list = self.show_obj.iter_all_episodes(has_location=True)
         for cur_ep_obj in ep_obj_list:
             # Only want to rename if we have a location
             if cur_ep_obj.location:
@@ -0,0 +1,143 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import threading
+
+from . import db, logger
+from .common import FAILED, IGNORED, SKIPPED, UNAIRED, WANTED, Quality
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import Any, Dict, Optional, Tuple
+
+STAT_NAMES = ('ep_snatched', 'ep_downloaded', 'ep_total', 'ep_airs_next', 'ep_next_aired',
+              'ep_downloaded_aired', 'ep_total_aired')
+AIRDATE_NAMES = ('ep_airs_next', 'ep_next_aired')
+
+
+class ShowStats(object):
+    """
+    In memory per show episode stats aggregated from tv_episodes
+
+    Stats of all shows are aggregated with one grouped pass of tv_episodes on first use and at the start of each day,
+    because some stats depend on the date. Triggers on tv_episodes record each show whose episodes are inserted, deleted,
+    or have a changed status or airdate in table show_stats_changes with an increasing sequence number, and only those
+    shows are aggregated again when stats are next read. This covers TVEpisode.save_to_db, mass_action of
+    TVEpisode.get_sql, and direct sql alike.
+
+    Stats per show:
+    ep_snatched, ep_downloaded: count of aired regular episodes that are snatched, or downloaded or archived
+    ep_total: count of aired regular episodes that are snatched, downloaded, archived, or skipped, wanted, failed
+    ep_airs_next: airdate of the next unaired or wanted episode
+    ep_next_aired: airdate of the next unaired, wanted, or failed episode
+    ep_downloaded_aired, ep_total_aired: api counts of downloaded and not ignored episodes that aired up to today
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._stats = None  # type: Optional[Dict[Tuple[int, int], Dict[str, Any]]]
+        self._day = None  # type: Optional[int]
+        self._seq = 0  # type: int
+
+    @staticmethod
+    def _aggregate(today, tvid=None, prodid=None):
+        # type: (int, Optional[int], Optional[int]) -> Dict[Tuple[int, int], Dict[str, Any]]
+        status_snatched = ','.join(['%s' % x for x in Quality.SNATCHED_ANY])
+        status_download = ','.join(['%s' % x for x in Quality.DOWNLOADED + Quality.ARCHIVED])
+        regular = 'season > 0 AND episode > 0 AND airdate > 1'
+        where, params = '', []
+        if None is not tvid:
+            where, params = ' WHERE indexer = ? AND showid = ?', [tvid, prodid]
+        # noinspection SqlResolve
+        sql_result = db.DBConnection().select(
+            'SELECT indexer AS tvid, showid AS prodid,'
+            ' SUM(%(regular)s AND status IN (%(snatched)s)) AS ep_snatched,'
+            ' SUM(%(regular)s AND status IN (%(download)s)) AS ep_downloaded,'
+            ' SUM(%(regular)s AND ((airdate <= %(today)s AND status IN (%(skipped)s, %(wanted)s, %(failed)s))'
+            ' OR status IN (%(snatched)s) OR status IN (%(download)s))) AS ep_total,'
+            ' MIN(CASE WHEN airdate >= %(today)s AND status IN (%(unaired)s, %(wanted)s)'
+            ' THEN airdate END) AS ep_airs_next,'
+            ' MIN(CASE WHEN airdate >= %(today)s AND status IN (%(unaired)s, %(wanted)s, %(failed)s)'
+            ' THEN airdate END) AS ep_next_aired,'
+            ' SUM(season != 0 AND episode != 0 AND airdate <= %(today)s'
+            ' AND status IN (%(download)s)) AS ep_downloaded_aired,'
+            ' SUM(season != 0 AND episode != 0 AND airdate <= %(today)s AND status != %(ignored)s'
+            ' AND (airdate != 1 OR status IN (%(snatched)s, %(download)s))) AS ep_total_aired'
+            ' FROM tv_episodes%(where)s GROUP BY indexer, showid'
+            % dict(regular=regular, snatched=status_snatched, download=status_download, today=today,
+                   skipped=SKIPPED, wanted=WANTED, failed=FAILED, unaired=UNAIRED, ignored=IGNORED, where=where),
+            params)
+
+        stats = {}
+        for cur_result in sql_result:
+            show_key = (int(cur_result['tvid']), int(cur_result['prodid']))
+            stats[show_key] = dict(tvid=show_key[0], prodid=show_key[1])
+            for cur_name in STAT_NAMES:
+                # an airdate is None where there is no such episode
+                stats[show_key][cur_name] = cur_result[cur_name] or (0, None)[cur_name in AIRDATE_NAMES]
+        return stats
+
+    def _refresh(self):
+        today = datetime.date.today().toordinal()
+        my_db = db.DBConnection()
+        # noinspection SqlResolve
+        changes = my_db.select('SELECT seq, indexer, showid FROM show_stats_changes WHERE seq > ?', [self._seq])
+        if None is self._stats or today != self._day or len(changes) > max(10, len(self._stats) // 4):
+            # noinspection SqlResolve
+            sql_result = my_db.select('SELECT MAX(seq) AS seq FROM show_stats_changes')
+            self._seq = sql_result and sql_result[0]['seq'] or 0
+            self._stats, self._day = self._aggregate(today), today
+            logger.debug('Aggregated episode stats of %s shows' % len(self._stats))
+            return
+
+        for cur_change in changes:
+            show_key = (int(cur_change['indexer']), int(cur_change['showid']))
+            show_stats = self._aggregate(today, *show_key)
+            if show_key in show_stats:
+                self._stats[show_key] = show_stats[show_key]
+            else:
+                self._stats.pop(show_key, None)
+            self._seq = max(self._seq, cur_change['seq'])
+
+    def get_all(self):
+        # type: (...) -> Dict[Tuple[int, int], Dict[str, Any]]
+        """
+        :return: stats of every show with episodes keyed by (tvid, prodid)
+        """
+        with self.lock:
+            self._refresh()
+            return dict(self._stats)
+
+    def get(self, tvid, prodid):
+        # type: (int, int) -> Optional[Dict[str, Any]]
+        """
+        :param tvid: tvid
+        :param prodid: prodid
+        :return: stats of show, or None if show has no episodes
+        """
+        with self.lock:
+            self._refresh()
+            return self._stats.get((int(tvid), int(prodid)))
+
+    def reset(self):
+        """
+        discard stats so that all shows are aggregated on next use
+        """
+        with self.lock:
+            self._stats = None
+
+
+SHOW_STATS = ShowStats()
@@ -0,0 +1,198 @@
+#
+# This file is part of SickGear.
+#
+# SickGear is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SickGear is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+
+try:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        import brotli
+except ImportError:
+    brotli = None
+
+from _23 import scandir
+from sg_helpers import make_path, remove_file_perm
+
+import sickgear
+from . import logger
+
+# noinspection PyUnreachableCode
+if False:
+    from typing import AnyStr, Dict, Optional, Tuple
+
+HASH_LEN = 10
+ASSET_DIRS = ('css', 'images', 'js')
+COMPRESS_EXT = ('.css', '.js', '.json', '.map', '.svg', '.xml')
+MIN_COMPRESS_SIZE = 1024
+
+
+class AssetManifest(object):
+    """
+    Content hashes of the static assets under the gui data root
+
+    A fingerprinted url adds the hash of an asset to its filename, e.g. js/lib/jquery.min.0123456789.js, so that the
+    url changes with content and can be cached by browsers and reverse proxies for a year. Gzip and, when a brotli
+    module is installed, brotli variants of text assets are precompressed to the cache dir in the background.
+    """
+    def __init__(self):
+        self.data_root = None  # type: Optional[AnyStr]
+        self.compress_root = None  # type: Optional[AnyStr]
+        self._hashes = {}  # type: Dict[AnyStr, AnyStr]
+        self._urls = {}  # type: Dict[AnyStr, AnyStr]
+        self._compress_thread = None  # type: Optional[threading.Thread]
+
+    @staticmethod
+    def _hash_file(file_path):
+        # type: (AnyStr) -> AnyStr
+        file_hash = hashlib.md5()
+        with open(file_path, 'rb') as fh:
+            for cur_chunk in iter(lambda: fh.read(65536), b''):
+                file_hash.update(cur_chunk)
+        return file_hash.hexdigest()[0:HASH_LEN]
+
+    @staticmethod
+    def fingerprint(rel_path, file_hash):
+        # type: (AnyStr, AnyStr) -> AnyStr
+        """
+        :param rel_path: path of asset, e.g. js/lib/jquery.min.js
+        :param file_hash: hash of asset content
+        :return: path with hash added before the extension, e.g. js/lib/jquery.min.0123456789.js
+        """
+        base, ext = os.path.splitext(rel_path)
+        return '%s.%s%s' % (base, file_hash, ext)
+
+    def build(self, data_root, cache_dir=None):
+        # type: (AnyStr, Optional[AnyStr]) -> None
+        """
+        hash all assets under data_root and start precompressing text assets to cache_dir
+
+        :param data_root: gui data root, e.g. gui/slick
+        :param cache_dir: dir for precompressed variants, None to not precompress
+        """
+        data_root = os.path.abspath(data_root)
+        hashes, urls = {}, {}
+
+        def _walk(path):
+            for cur_entry in scandir(path):
+                if cur_entry.is_dir():
+                    _walk(cur_entry.path)
+                elif cur_entry.is_file():
+                    cur_path = os.path.normpath(cur_entry.path)
+                    try:
+                        hashes[cur_path] = self._hash_file(cur_path)
+                    except (BaseException, Exception):
+                        continue
+                    rel_path = os.path.relpath(cur_path, data_root).replace(os.sep, '/')
+                    urls[rel_path] = self.fingerprint(rel_path, hashes[cur_path])
+
+        for cur_dir in ASSET_DIRS:
+            if os.path.isdir(os.path.join(data_root, cur_dir)):
+                _walk(os.path.join(data_root, cur_dir))
+
+        self.data_root = data_root
+        self._hashes, self._urls = hashes, urls
+        logger.debug('Asset manifest of %s files' % len(hashes))
+
+        if cache_dir:
+            self.compress_root = os.path.join(cache_dir, 'assets')
+            self._compress_thread = threading.Thread(target=self.compress, name='ASSETS', daemon=True)
+            self._compress_thread.start()
+
+    def url(self, rel_path):
+        # type: (AnyStr) -> AnyStr
+        """
+        :param rel_path: path of asset relative to the gui data root, e.g. js/lib/jquery.min.js
+        :return: fingerprinted url of asset, or a url busted by process id if asset is not in the manifest
+        """
+        if rel_path in self._urls:
+            return '%s/%s' % (sickgear.WEB_ROOT or '', self._urls[rel_path])
+        return '%s/%s?v=%s' % (sickgear.WEB_ROOT or '', rel_path, sickgear.PID)
+
+    def resolve(self, abs_path):
+        # type: (AnyStr) -> Tuple[AnyStr, bool]
+        """
+        :param abs_path: requested absolute path that may be fingerprinted
+        :return: absolute path of asset, and True if the path was fingerprinted with the current hash of asset
+        """
+        matched = re.match(r'(?i)^(.*)\.([0-9a-f]{%s})(\.[^./\\]+)$' % HASH_LEN, abs_path)
+        if matched:
+            asset_path = os.path.normpath(matched.group(1) + matched.group(3))
+            if matched.group(2) == self._hashes.get(asset_path):
+                return asset_path, True
+        return abs_path, False
+
+    def _variant_path(self, abs_path, encoding_ext):
+        # type: (AnyStr, AnyStr) -> Optional[AnyStr]
+        file_hash = self._hashes.get(os.path.normpath(abs_path))
+        if not file_hash or not self.compress_root:
+            return
+        rel_path = os.path.relpath(abs_path, self.data_root)
+        return os.path.join(self.compress_root, self.fingerprint(rel_path, file_hash) + encoding_ext)
+
+    def variant(self, abs_path, accept_encoding):
+        # type: (AnyStr, AnyStr) -> Tuple[Optional[AnyStr], Optional[AnyStr]]
+        """
+        :param abs_path: absolute path of asset
+        :param accept_encoding: Accept-Encoding request header
+        :return: path of precompressed variant and content encoding, or None, None if there is no acceptable variant
+        """
+        accepted = [cur_enc.split(';')[0].strip() for cur_enc in (accept_encoding or '').lower().split(',')]
+        for cur_encoding, cur_ext in (('br', '.br'), ('gzip', '.gz')):
+            if cur_encoding in accepted:
+                variant_path = self._variant_path(abs_path, cur_ext)
+                if variant_path and os.path.isfile(variant_path):
+                    return variant_path, cur_encoding
+        return None, None
+
+    def compress(self):
+        """
+        write gzip and brotli variants of text assets that are not yet precompressed at their current hash
+        """
+        encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli:
+            encoders += [('.br', lambda data: brotli.compress(data))]
+        written = 0
+        for cur_path in list(self._hashes):
+            if not cur_path.lower().endswith(COMPRESS_EXT) or MIN_COMPRESS_SIZE > os.path.getsize(cur_path):
+                continue
+            data = None
+            for cur_ext, cur_encoder in encoders:
+                variant_path = self._variant_path(cur_path, cur_ext)
+                if os.path.isfile(variant_path):
+                    continue
+                try:
+                    if None is data:
+                        with open(cur_path, 'rb') as fh:
+                            data = fh.read()
+                    make_path(os.path.dirname(variant_path))
+                    tmp_path = '%s.tmp' % variant_path
+                    with open(tmp_path, 'wb') as fh:
+                        fh.write(cur_encoder(data))
+                    os.replace(tmp_path, variant_path)
+                    written += 1
+                except (BaseException, Exception) as e:
+                    logger.debug('Failed to precompress %s: %s' % (cur_path, e))
+                    remove_file_perm('%s.tmp' % variant_path)
+        if written:
+            logger.debug('Precompressed %s asset variants' % written)
+
+
+ASSETS = AssetManifest()
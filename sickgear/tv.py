@@ -16,6 +16,7 @@
 
 import random
 import weakref
+from array import array
 from collections import Counter, OrderedDict
 from functools import reduce
 from itertools import chain
@@ -45,12 +46,14 @@ from .classes import WeakList
 from .common import Quality, statusStrings, \
     ARCHIVED, DOWNLOADED, FAILED, IGNORED, SKIPPED, SNATCHED, SNATCHED_ANY, SNATCHED_PROPER, UNAIRED, UNKNOWN, WANTED, \
     NAMING_DUPLICATE, NAMING_EXTEND, NAMING_LIMITED_EXTEND, NAMING_LIMITED_EXTEND_E_PREFIXED, NAMING_SEPARATED_REPEAT
+from .daily_schedule import DAILY_SCHEDULE
 from .generic_queue import QueuePriorities
 from .helpers import try_float, try_int
 from .indexermapper import del_mapping, MapStatus, save_mapping
 from .indexers.indexer_config import TVINFO_IMDB, TVINFO_TMDB, TVINFO_TRAKT, TVINFO_TVDB, TVINFO_TVMAZE, TVINFO_TVRAGE
 from .name_parser.parser import InvalidNameException, InvalidShowException, NameParser
 from .sgdatetime import SGDatetime
+from .show_stats import SHOW_STATS
 from .tv_base import TVEpisodeBase, TVShowBase
 
 from lib import imdbpie, subliminal
@@ -69,7 +72,7 @@ from six import integer_types, iteritems, iterkeys, itervalues, moves, string_ty
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import Any, AnyStr, Dict, List, Optional, Set, Text, Tuple, Union
+    from typing import Any, AnyStr, Dict, Iterator, List, Optional, Set, Text, Tuple, Union
     from sqlite3 import Row
     from lib.tvinfo_base import CastList, TVInfoCharacter, TVInfoPerson, \
         TVInfoEpisode, TVInfoShow
@@ -118,6 +121,14 @@ tvswitch_ep_names = {
 concurrent_show_not_found_days = 7
 show_not_found_retry_days = 7
 
+# tv_shows columns of a show stub, heavy fields like overview and imdb info are loaded on first use
+SHOW_STUB_COLUMNS = (
+    'indexer', 'indexer_id', 'air_by_date', 'airs', 'airtime', 'anime', 'archive_firstmatch', 'classification',
+    'dvdorder', 'flatten_folders', 'genre', 'imdb_id', 'lang', 'last_update_indexer', 'location', 'network',
+    'network_country', 'network_country_code', 'network_id', 'network_is_stream', 'paused', 'prune', 'quality',
+    'rls_global_exclude_ignore', 'rls_global_exclude_require', 'rls_ignore_words', 'rls_require_words', 'runtime',
+    'scene', 'show_name', 'sports', 'src_update_timestamp', 'startyear', 'status', 'subtitles', 'tag', 'timezone')
+
 prodid_bitshift = 4
 tvid_bitmask = (1 << prodid_bitshift) - 1
 
@@ -1327,14 +1338,107 @@ class Character(Referential):
     __nonzero__ = __bool__
 
 
+class EpisodeStatusIndex(object):
+    """
+    Compact in memory index of the composite status of every episode of a show
+
+    Loaded with one query on first use, each season is an array of status indexed by episode number (-1 = no episode),
+    the index is kept current by TVEpisode.save_to_db and reset wherever episodes are changed by direct sql
+    """
+    def __init__(self, show_obj):
+        # type: (TVShow) -> None
+        self.show_obj = show_obj
+        self.lock = threading.Lock()
+        self._seasons = None  # type: Optional[Dict[int, array]]
+
+    def _load(self):
+        # type: (...) -> Dict[int, array]
+        seasons = {}
+        my_db = db.DBConnection()
+        for cur_result in my_db.select(
+                """
+                SELECT season, episode, status
+                FROM tv_episodes
+                WHERE indexer = ? AND showid = ?
+                """, [self.show_obj.tvid, self.show_obj.prodid]):
+            self._set(seasons, int(cur_result['season']), int(cur_result['episode']), int(cur_result['status']))
+        return seasons
+
+    @staticmethod
+    def _set(seasons, season, episode, status):
+        # type: (Dict[int, array], int, int, int) -> None
+        if 0 > episode:
+            return
+        statuses = seasons.get(season)
+        if None is statuses:
+            statuses = seasons[season] = array('l')
+        if len(statuses) <= episode:
+            statuses.extend([-1] * (1 + episode - len(statuses)))
+        statuses[episode] = status
+
+    @property
+    def loaded(self):
+        # type: (...) -> bool
+        return None is not self._seasons
+
+    def get(self, season, episode):
+        # type: (int, int) -> Optional[int]
+        """
+        :param season: season number
+        :param episode: episode number
+        :return: composite status of episode, or None if there is no such episode
+        """
+        with self.lock:
+            if None is self._seasons:
+                self._seasons = self._load()
+            statuses = self._seasons.get(season)
+        if None is statuses or not 0 <= episode < len(statuses) or 0 > statuses[episode]:
+            return None
+        return statuses[episode]
+
+    def set(self, season, episode, status):
+        # type: (int, int, int) -> None
+        """
+        set the composite status of an episode, a no-op until the index is loaded
+        """
+        with self.lock:
+            if None is not self._seasons:
+                self._set(self._seasons, int(season), int(episode), int(status))
+
+    def remove(self, season, episode):
+        # type: (int, int) -> None
+        self.set(season, episode, -1)
+
+    def reset(self):
+        """
+        discard index so that it is reloaded on next use
+        """
+        with self.lock:
+            self._seasons = None
+
+    def __getstate__(self):
+        return {'show_obj': self.show_obj}
+
+    def __setstate__(self, d):
+        self.__init__(d['show_obj'])
+
+
 class TVShow(TVShowBase):
     __slots__ = (
         'path',
         'unique_name',
     )
 
-    def __init__(self, tvid, prodid, lang='', show_result=None, imdb_info_result=None):
-        # type: (int, int, Text, Optional[Row], Optional[Union[Row, Dict]]) -> None
+    def __init__(self, tvid, prodid, lang='', show_result=None, imdb_info_result=None, lazy=False):
+        # type: (int, int, Text, Optional[Row], Optional[Union[Row, Dict]], bool) -> None
+        """
+        :param tvid: tvid
+        :param prodid: prodid
+        :param lang: language
+        :param show_result: tv_shows row, overview is loaded on first use if the row is of SHOW_STUB_COLUMNS
+        :param imdb_info_result: imdb_info row
+        :param lazy: load imdb info on first use instead of now, and do not log the loaded show
+        """
         super(TVShow, self).__init__(tvid, prodid, lang)
 
         self.unique_name = ''
@@ -1359,6 +1463,7 @@ class TVShow(TVShowBase):
 
         self.internal_ids = {}  # type: Dict
         self.internal_timezone = None  # type: Optional[AnyStr]
+        self._lazy_fields = set()  # type: Set[AnyStr]
         self.lock = threading.RLock()
         self.nextaired = ''  # type: AnyStr
         # noinspection added so that None _can_ be excluded from type annotation
@@ -1366,8 +1471,9 @@ class TVShow(TVShowBase):
         # noinspection PyTypeChecker
         self.release_groups = None  # type: AniGroupList
         self.sxe_ep_obj = {}  # type: Dict
+        self.ep_status_index = EpisodeStatusIndex(self)
 
-        self.load_from_db(show_result=show_result, imdb_info_result=imdb_info_result)
+        self.load_from_db(show_result=show_result, imdb_info_result=imdb_info_result, lazy=lazy)
 
     def _get_end_episode(self, last=False, exclude_specials=False):
         # type: (bool, bool) -> Optional[TVEpisode]
@@ -1632,6 +1738,49 @@ class TVShow(TVShowBase):
                         not isinstance(cur_value.get('date'), datetime.date):
                     return
             self.internal_ids = value
+            indexermapper.mapped_ids.update(self)
+
+    def _load_lazy(self, field):
+        # type: (AnyStr) -> None
+        """
+        load a field of a show stub from db on first use
+
+        :param field: name of field, overview or imdb_info
+        """
+        if field not in self._lazy_fields:
+            return
+        self._lazy_fields.discard(field)
+        if 'overview' == field:
+            my_db = db.DBConnection()
+            sql_result = my_db.select(
+                """
+                SELECT overview
+                FROM tv_shows
+                WHERE indexer = ? AND indexer_id = ?
+                """, [self.tvid, self.prodid])
+            self._overview = self._overview or (sql_result and sql_result[0]['overview']) or ''
+        elif 'imdb_info' == field:
+            self._load_imdb_info()
+
+    @property
+    def imdb_info(self):
+        self._load_lazy('imdb_info')
+        return self._imdb_info
+
+    @imdb_info.setter
+    def imdb_info(self, *arg):
+        self._lazy_fields.discard('imdb_info')
+        self.dirty_setter('_imdb_info')(self, *arg)
+
+    @property
+    def overview(self):
+        self._load_lazy('overview')
+        return self._overview
+
+    @overview.setter
+    def overview(self, *arg):
+        self._lazy_fields.discard('overview')
+        self.dirty_setter('_overview')(self, *arg)
 
     @property
     def is_anime(self):
@@ -1691,19 +1840,20 @@ class TVShow(TVShowBase):
         :param check_related_eps: get related episodes
         :return: List of TVEpisode objects
         """
-        sql_selection = 'SELECT *'
+        return list(self.iter_all_episodes(season, has_location, check_related_eps))
 
-        if check_related_eps:
-            # subselection to detect multi-episodes early, share_location > 0
-            sql_selection += """
-            , (SELECT COUNT (*)
-               FROM tv_episodes
-               WHERE showid = tve.showid AND indexer = tve.indexer AND season = tve.season AND location != ''
-               AND location = tve.location AND episode != tve.episode
-            ) AS share_location
-            """
+    def iter_all_episodes(self, season=None, has_location=False, check_related_eps=True):
+        # type: (Optional[integer_types], bool, bool) -> Iterator[TVEpisode]
+        """
+        yield episodes in season, episode order, episode objects are created one season at a time so that
+        the related episodes of a multi-episode file are set when any episode of its season is yielded
 
-        sql_selection += ' FROM tv_episodes tve WHERE indexer = ? AND showid = ?'
+        :param season: None or season number
+        :param has_location:  return only with location
+        :param check_related_eps: get related episodes
+        :return: TVEpisode objects
+        """
+        sql_selection = 'SELECT * FROM tv_episodes WHERE indexer = ? AND showid = ?'
         sql_parameter = [self.tvid, self.prodid]
 
         if None is not season:
@@ -1719,31 +1869,39 @@ class TVShow(TVShowBase):
         my_db = db.DBConnection()
         sql_result = my_db.select(sql_selection, sql_parameter)
 
-        ep_obj_list = []
+        season_rows = []
         for cur_row in sql_result:
+            if season_rows and season_rows[-1]['season'] != cur_row['season']:
+                for cur_ep_obj in self._season_episodes(season_rows, check_related_eps):
+                    yield cur_ep_obj
+                season_rows = []
+            season_rows.append(cur_row)
+        for cur_ep_obj in self._season_episodes(season_rows, check_related_eps):
+            yield cur_ep_obj
+
+    def _season_episodes(self, season_rows, check_related_eps=True):
+        # type: (List[Row], bool) -> List[TVEpisode]
+        """
+        :param season_rows: episode rows of one season in episode order
+        :param check_related_eps: set episodes that share a location as related episodes of each other
+        :return: List of TVEpisode objects
+        """
+        ep_obj_list = []
+        locations = {}
+        for cur_row in season_rows:
             ep_obj = self.get_episode(int(cur_row['season']), int(cur_row['episode']), ep_result=[cur_row])
             if ep_obj:
                 ep_obj.related_ep_obj = []
                 if check_related_eps and ep_obj.location:
-                    # if there is a location, check if it's a multi-episode (share_location > 0)
-                    # and put into related_ep_obj
-                    if 0 < cur_row['share_location']:
-                        # noinspection SqlRedundantOrderingDirection
-                        related_ep_sql_result = my_db.select(
-                            """
-                            SELECT * 
-                            FROM tv_episodes
-                            WHERE indexer = ? AND showid = ? AND season = ? AND location = ? AND episode != ? 
-                            ORDER BY episode ASC
-                            """, [self.tvid, self.prodid, ep_obj.season, ep_obj.location, ep_obj.episode])
-                        for cur_ep_row in related_ep_sql_result:
-                            related_ep_obj = self.get_episode(int(cur_ep_row['season']),
-                                                              int(cur_ep_row['episode']),
-                                                              ep_result=[cur_ep_row])
-                            if related_ep_obj not in ep_obj.related_ep_obj:
-                                ep_obj.related_ep_obj.append(related_ep_obj)
+                    locations.setdefault(ep_obj.location, []).append(ep_obj)
                 ep_obj_list.append(ep_obj)
 
+        # a location shared by episodes is a multi-episode, put the others of each into related_ep_obj
+        for cur_ep_obj_list in itervalues(locations):
+            if 1 < len(cur_ep_obj_list):
+                for cur_ep_obj in cur_ep_obj_list:
+                    cur_ep_obj.related_ep_obj = [_ep_obj for _ep_obj in cur_ep_obj_list if _ep_obj is not cur_ep_obj]
+
         return ep_obj_list
 
     def get_episode(self,
@@ -1753,7 +1911,8 @@ class TVShow(TVShowBase):
                     no_create=False,  # type: bool
                     absolute_number=None,  # type: Optional[int]
                     ep_result=None,  # type: Optional[List[Row]]
-                    existing_only=False  # type: bool
+                    existing_only=False,  # type: bool
+                    scene_result=None  # type: Optional[List[Row]]
                     ):  # type: (...) -> Optional[TVEpisode]
         """
         Initialise sxe_ep_obj with db fetched season keys, and then fill the TVShow episode property
@@ -1764,8 +1923,9 @@ class TVShow(TVShowBase):
         :param path: path to file episode
         :param no_create: return None instead of an instantiated TVEpisode object
         :param absolute_number: absolute number
-        :param ep_result:
+        :param ep_result: tv_episodes row of episode in a list, an empty list if episode is not in db
         :param existing_only: only return existing episodes
+        :param scene_result: scene_numbering row of episode in a list, an empty list if there is no row
         :return: TVEpisode object
         """
         # if we get an anime get the real season and episode
@@ -1802,9 +1962,10 @@ class TVShow(TVShowBase):
             #              (self.tvid_prodid, season, episode))
 
             if path and not existing_only:
-                ep_obj = TVEpisode(self, season, episode, path, show_result=ep_result)
+                ep_obj = TVEpisode(self, season, episode, path, show_result=ep_result, scene_result=scene_result)
             else:
-                ep_obj = TVEpisode(self, season, episode, show_result=ep_result, existing_only=existing_only)
+                ep_obj = TVEpisode(self, season, episode, show_result=ep_result, existing_only=existing_only,
+                                   scene_result=scene_result)
 
             if None is not ep_obj:
                 self.sxe_ep_obj[season][episode] = ep_obj
@@ -2172,6 +2333,7 @@ class TVShow(TVShowBase):
 
         # create TVEpisodes from each media file (if possible)
         sql_l = []
+        saved_l = []
         for cur_media_file in file_list:
             parse_result = None
             ep_obj = None
@@ -2202,6 +2364,7 @@ class TVShow(TVShowBase):
             if ep_file_name and parse_result and None is not parse_result.release_group and not ep_obj.release_name:
                 logger.debug(f'Name {ep_file_name} gave release group of {parse_result.release_group}, seems valid')
                 ep_obj.release_name = ep_file_name
+                history.log_processed_release(ep_obj, ep_obj.location)
 
             # store the reference in the show
             if None is not ep_obj:
@@ -2215,10 +2378,13 @@ class TVShow(TVShowBase):
                 result = ep_obj.get_sql()
                 if None is not result:
                     sql_l.append(result)
+                    saved_l.append(ep_obj)
 
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
 
     def load_episodes_from_db(self, update=False):
         # type: (bool) -> Dict[int, Dict[int, TVEpisode]]
@@ -2258,12 +2424,12 @@ class TVShow(TVShowBase):
         if None is cached_show:
             return scanned_eps
 
-        scene_sql_result = my_db.select(
+        scene_rows = {(int(cur_row['season']), int(cur_row['episode'])): [cur_row] for cur_row in my_db.select(
             """
             SELECT * 
             FROM scene_numbering 
             WHERE indexer == ? AND indexer_id = ?
-            """, [self.tvid, self.prodid])
+            """, [self.tvid, self.prodid])}
 
         cached_seasons = {}
         cl = []
@@ -2287,16 +2453,19 @@ class TVShow(TVShowBase):
 
             logger.debug('Loading episode %sx%s for [%s] from the DB' % (season, episode, self.name))
 
+            scene_result = scene_rows.get((season, episode), [])
             try:
-                ep_obj = self.get_episode(season, episode, ep_result=[cur_row])  # type: TVEpisode
+                ep_obj = self.get_episode(season, episode, ep_result=[cur_row],
+                                          scene_result=scene_result)  # type: TVEpisode
 
                 # if we found out that the ep is no longer on TVDB then delete it from our database too
                 if delete_ep and helpers.should_delete_episode(ep_obj.status):
                     cl.extend(ep_obj.delete_episode(return_sql=True))
                 else:
 
-                    ep_obj.load_from_db(season, episode, show_result=[cur_row], scene_result=scene_sql_result)
-                    ep_obj.load_from_tvinfo(tvapi=t, update=update, cached_show=cached_show)
+                    ep_obj.load_from_db(season, episode, show_result=[cur_row], scene_result=scene_result)
+                    ep_obj.load_from_tvinfo(tvapi=t, update=update, cached_show=cached_show,
+                                            ep_result=[cur_row], scene_result=scene_result)
                 scanned_eps[season][episode] = True
             except exceptions_helper.EpisodeDeletedException:
                 logger.debug(f'Tried loading an episode that should have been deleted from the DB [{self._name}],'
@@ -2317,6 +2486,19 @@ class TVShow(TVShowBase):
             VALUES (?,?,?,?,?,?,?)
             """, [old_tvid, old_prodid, self.tvid, self.prodid, season, episode, reason]]
 
+    def select_episode_rows(self):
+        # type: (...) -> Tuple[Dict[Tuple[int, int], List[Row]], Dict[Tuple[int, int], List[Row]]]
+        """
+        select the tv_episodes and scene_numbering rows of show in one pass each
+
+        :return: tv_episodes rows and scene_numbering rows, each row in a list keyed by (season, episode)
+        """
+        my_db = db.DBConnection()
+        return tuple({(int(cur_row['season']), int(cur_row['episode'])): [cur_row]
+                      for cur_row in my_db.select(cur_sql, [self.tvid, self.prodid])}
+                     for cur_sql in ('SELECT * FROM tv_episodes WHERE indexer = ? AND showid = ?',
+                                     'SELECT * FROM scene_numbering WHERE indexer = ? AND indexer_id = ?'))
+
     def load_episodes_from_tvinfo(self, cache=True, update=False, tvinfo_data=None, switch=False, old_tvid=None,
                                   old_prodid=None):
         # type: (bool, bool, TVInfoShow, bool, int, integer_types) -> Optional[Dict[int, Dict[int, TVEpisode]]]
@@ -2358,22 +2540,21 @@ class TVShow(TVShowBase):
 
         scanned_eps = {}
 
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            """
-            SELECT * 
-            FROM tv_episodes 
-            WHERE indexer = ? AND showid = ?
-            """, [self.tvid, self.prodid])
+        # refresh xem numbering before the episode rows with xem numbering are selected
+        sickgear.scene_numbering.xem_refresh(self.tvid, self.prodid)
+        ep_rows, scene_rows = self.select_episode_rows()
         sql_l = []
+        saved_l = []
         for cur_season in show_obj:
             scanned_eps[cur_season] = {}
             for cur_episode in show_obj[cur_season]:
                 # need some examples of wtf episode 0 means to decide if we want it or not
                 if 0 == cur_episode:
                     continue
+                rows = dict(ep_result=ep_rows.get((cur_season, cur_episode), []),
+                            scene_result=scene_rows.get((cur_season, cur_episode), []))
                 try:
-                    ep_obj = self.get_episode(cur_season, cur_episode, ep_result=sql_result)  # type: TVEpisode
+                    ep_obj = self.get_episode(cur_season, cur_episode, **rows)  # type: TVEpisode
                 except exceptions_helper.EpisodeNotFoundException:
                     logger.log('%s: %s object for %sx%s from [%s] is incomplete, skipping this episode' %
                                (self.tvid_prodid, sickgear.TVInfoAPI(
@@ -2382,7 +2563,7 @@ class TVShow(TVShowBase):
                 else:
                     try:
                         ep_obj.load_from_tvinfo(tvapi=t, update=update, cached_show=show_obj, switch=switch,
-                                                old_tvid=old_tvid, old_prodid=old_prodid, switch_list=sql_l)
+                                                old_tvid=old_tvid, old_prodid=old_prodid, switch_list=sql_l, **rows)
                     except exceptions_helper.EpisodeDeletedException:
                         logger.log('The episode from [%s] was deleted, skipping the rest of the load' % self._name)
                         continue
@@ -2392,17 +2573,20 @@ class TVShow(TVShowBase):
                                  f' for episode {cur_season}x{cur_episode} from [{self._name}]')
                     ep_obj.load_from_tvinfo(cur_season, cur_episode, tvapi=t, update=update, cached_show=show_obj,
                                             switch=switch, old_tvid=old_tvid, old_prodid=old_prodid,
-                                            switch_list=sql_l)
+                                            switch_list=sql_l, **rows)
 
                     result = ep_obj.get_sql()
                     if None is not result:
                         sql_l.append(result)
+                        saved_l.append(ep_obj)
 
                 scanned_eps[cur_season][cur_episode] = True
 
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
 
         # Done updating save last update date
         self.last_update_indexer = datetime.date.today().toordinal()
@@ -2491,6 +2675,7 @@ class TVShow(TVShowBase):
         root_ep_obj = None
 
         sql_l = []
+        saved_l = []
         for cur_ep_num in episode_numbers:
             cur_ep_num = int(cur_ep_num)
 
@@ -2603,10 +2788,13 @@ class TVShow(TVShowBase):
                 result = ep_obj.get_sql()
                 if None is not result:
                     sql_l.append(result)
+                    saved_l.append(ep_obj)
 
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
 
         # creating metafiles on the root should be good enough
         if sickgear.USE_FAILED_DOWNLOADS and None is not root_ep_obj:
@@ -2615,10 +2803,13 @@ class TVShow(TVShowBase):
 
         return root_ep_obj
 
-    def load_from_db(self, show_result=None, imdb_info_result=None):
-        # type: (Optional[Row], Optional[Union[Row, Dict]]) -> Optional[bool]
+    def load_from_db(self, show_result=None, imdb_info_result=None, lazy=False):
+        # type: (Optional[Row], Optional[Union[Row, Dict]], bool) -> Optional[bool]
         """
 
+        :param show_result: tv_shows row, overview is loaded on first use if the row is of SHOW_STUB_COLUMNS
+        :param imdb_info_result: imdb_info row
+        :param lazy: load imdb info on first use instead of now, and do not log the loaded show
         :return:
         """
         if not show_result or self.tvid != show_result['indexer'] or self.prodid != show_result['indexer_id']:
@@ -2664,7 +2855,11 @@ class TVShow(TVShowBase):
         self._network_country_code = show_result['network_country_code']
         self._network_id = show_result['network_id']
         self._network_is_stream = bool(show_result['network_is_stream'])
-        self._overview = self._overview or show_result['overview'] or ''
+        if 'overview' in show_result.keys():
+            self._overview = self._overview or show_result['overview'] or ''
+            self._lazy_fields.discard('overview')
+        else:
+            self._lazy_fields.add('overview')
         self._paused = int(show_result['paused'])
         self._prune = show_result['prune'] or 0
         self._quality = int(show_result['quality'])
@@ -2708,9 +2903,25 @@ class TVShow(TVShowBase):
 
         self.release_groups = self._anime and AniGroupList(self.tvid, self.prodid, self.tvid_prodid) or None
 
-        logger.log('Loaded.. {: <9} {: <8} {}'.format(
-            sickgear.TVInfoAPI(self.tvid).config.get('name') + ',', '%s,' % self.prodid, self.name))
+        if not lazy:
+            logger.log('Loaded.. {: <9} {: <8} {}'.format(
+                sickgear.TVInfoAPI(self.tvid).config.get('name') + ',', '%s,' % self.prodid, self.name))
+
+        if lazy and not imdb_info_result:
+            self._lazy_fields.add('imdb_info')
+        elif not self._load_imdb_info(imdb_info_result):
+            return
+
+        self.dirty = False
+        return True
 
+    def _load_imdb_info(self, imdb_info_result=None):
+        # type: (Optional[Union[Row, Dict]]) -> bool
+        """
+        :param imdb_info_result: imdb_info row
+        :return: False if there is no imdb info to load for show and imdb info is used
+        """
+        self._lazy_fields.discard('imdb_info')
         # Get IMDb_info from database
         if not imdb_info_result or \
                 self.tvid != imdb_info_result['indexer'] or self.prodid != imdb_info_result['indexer_id']:
@@ -2734,9 +2945,7 @@ class TVShow(TVShowBase):
                 self._imdb_info['is_mini_series'] = bool(self._imdb_info['is_mini_series'])
         elif sickgear.USE_IMDB_INFO:
             logger.debug(f'{self.tvid_prodid}: The next show update will attempt to find IMDb info for [{self.name}]')
-            return
-
-        self.dirty = False
+            return False
         return True
 
     def _get_tz_info(self):
@@ -3239,23 +3448,13 @@ class TVShow(TVShowBase):
 
         cur_date = datetime.date.today().toordinal()
         if not self.nextaired or self.nextaired and cur_date > self.nextaired:
-            my_db = db.DBConnection()
-            # noinspection SqlRedundantOrderingDirection
-            sql_result = my_db.select(
-                """
-                SELECT airdate, season, episode 
-                FROM tv_episodes
-                WHERE indexer = ? AND showid = ? AND airdate >= ? AND status in (?,?,?)
-                ORDER BY airdate ASC
-                LIMIT 1
-                """, [self.tvid, self.prodid, datetime.date.today().toordinal(), UNAIRED, WANTED, FAILED])
-
-            if None is sql_result or 0 == len(sql_result):
+            show_stats = SHOW_STATS.get(self.tvid, self.prodid)
+            if not show_stats or None is show_stats['ep_next_aired']:
                 logger.debug('%s: No episode found... need to implement a show status' % self.tvid_prodid)
                 self.nextaired = ''
             else:
-                logger.debug(f'{self.tvid_prodid}: Found episode {sql_result[0]["season"]}x{sql_result[0]["episode"]}')
-                self.nextaired = sql_result[0]['airdate']
+                logger.debug(f'{self.tvid_prodid}: Found episode airing {show_stats["ep_next_aired"]}')
+                self.nextaired = show_stats['ep_next_aired']
 
         return self.nextaired
 
@@ -3286,11 +3485,14 @@ class TVShow(TVShowBase):
                  ['DELETE FROM blocklist WHERE indexer = ? AND show_id = ?', [self.tvid, self.prodid]],
                  ['DELETE FROM indexer_mapping WHERE indexer = ? AND indexer_id = ?', [self.tvid, self.prodid]],
                  ['DELETE FROM tv_shows_not_found WHERE indexer = ? AND indexer_id = ?', [self.tvid, self.prodid]],
+                 ['DELETE FROM processed_releases WHERE indexer = ? AND showid = ?', [self.tvid, self.prodid]],
                  ['DELETE FROM castlist WHERE indexer = ? AND indexer_id = ?', [self.tvid, self.prodid]]
                  ] + self.orphaned_cast_sql()
 
         my_db = db.DBConnection()
         my_db.mass_action(sql_l)
+        self.ep_status_index.reset()
+        sickgear.scene_numbering.NUMBERING_MAPS.invalidate(self.tvid, self.prodid)
         self.remove_character_images()
 
         name_cache.remove_from_namecache(self.tvid, self.prodid)
@@ -3307,6 +3509,7 @@ class TVShow(TVShowBase):
             del sickgear.showDict[self.sid_int]
         except (BaseException, Exception):
             pass
+        indexermapper.mapped_ids.remove(self)
         sickgear.webserve.Home.make_showlist_unique_names()
         sickgear.MEMCACHE['history_tab'] = sickgear.webserve.History.menu_tab(sickgear.MEMCACHE['history_tab_limit'])
 
@@ -3394,6 +3597,7 @@ class TVShow(TVShowBase):
         deleted = 0
         attempted = []
         sql_l = []
+        saved_l = []
         for cur_row in sql_result:
             season = int(cur_row['season'])
             episode = int(cur_row['episode'])
@@ -3450,6 +3654,7 @@ class TVShow(TVShowBase):
                         result = ep_obj.get_sql()
                         if None is not result:
                             sql_l.append(result)
+                            saved_l.append(ep_obj)
             else:
                 # the file exists, set its modify file stamp
                 if sickgear.AIRDATE_EPISODES:
@@ -3463,6 +3668,8 @@ class TVShow(TVShowBase):
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
 
     def download_subtitles(self, force=False):
         # type: (bool) -> None
@@ -3534,6 +3741,8 @@ class TVShow(TVShowBase):
                  [self.tvid, self.prodid, old_tvid, old_prodid]],
                 ['UPDATE history SET indexer = ?, showid = ? WHERE indexer = ? AND showid = ?',
                  [self.tvid, self.prodid, old_tvid, old_prodid]],
+                ['UPDATE processed_releases SET indexer = ?, showid = ? WHERE indexer = ? AND showid = ?',
+                 [self.tvid, self.prodid, old_tvid, old_prodid]],
                 ['UPDATE imdb_info SET indexer = ?, indexer_id = ? WHERE indexer = ? AND indexer_id = ?',
                  [self.tvid, self.prodid, old_tvid, old_prodid]],
                 ['UPDATE scene_exceptions SET indexer = ?, indexer_id = ? WHERE indexer = ? AND indexer_id = ?',
@@ -3549,6 +3758,9 @@ class TVShow(TVShowBase):
                 ['UPDATE castlist SET indexer = ?, indexer_id = ? WHERE indexer = ? AND indexer_id = ?',
                  [self.tvid, self.prodid, old_tvid, old_prodid]]
             ])
+            self.ep_status_index.reset()
+            sickgear.scene_numbering.NUMBERING_MAPS.invalidate(old_tvid, old_prodid)
+            sickgear.scene_numbering.NUMBERING_MAPS.invalidate(self.tvid, self.prodid)
 
             my_failed_db = db.DBConnection('failed.db')
             my_failed_db.action('UPDATE history SET indexer = ?, showid = ? WHERE indexer = ? AND showid = ?',
@@ -3636,7 +3848,7 @@ class TVShow(TVShowBase):
             network_country_code=self._network_country_code,
             network_id=self._network_id,
             network_is_stream=self._network_is_stream,
-            overview=self._overview,
+            overview=self.overview,
             paused=self._paused,
             prune=self._prune,
             quality=self._quality,
@@ -3660,8 +3872,10 @@ class TVShow(TVShowBase):
         my_db = db.DBConnection()
         my_db.upsert('tv_shows', new_value_dict, control_value_dict)
         self.dirty = False
+        DAILY_SCHEDULE.invalidate()
 
-        if sickgear.USE_IMDB_INFO and len(self._imdb_info):
+        # imdb info that is still to be loaded is unchanged
+        if sickgear.USE_IMDB_INFO and 'imdb_info' not in self._lazy_fields and len(self._imdb_info):
             new_value_dict = self._imdb_info
 
             my_db = db.DBConnection()
@@ -3754,22 +3968,15 @@ class TVShow(TVShowBase):
                          ' ignoring found episode')
             return False
 
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            """
-            SELECT status
-            FROM tv_episodes
-            WHERE indexer = ? AND showid = ? AND season = ? AND episode = ?
-            """, [self.tvid, self.prodid, season, episode])
-
-        if not sql_result or not len(sql_result):
+        ep_status = self.ep_status_index.get(season, episode)
+        if None is ep_status:
             logger.debug('Unable to find a matching episode in database,'
                          ' ignoring found episode')
             return False
 
-        cur_status, cur_quality = Quality.split_composite_status(int(sql_result[0]['status']))
+        cur_status, cur_quality = Quality.split_composite_status(ep_status)
 
-        logger.debug(f'Existing episode status: {statusStrings[int(sql_result[0]["status"])]}')
+        logger.debug(f'Existing episode status: {statusStrings[ep_status]}')
 
         # if we know we don't want it then just say no
         if cur_status in [IGNORED, ARCHIVED] + ([SKIPPED], [])[multi_ep] and not manual_search:
@@ -3809,6 +4016,18 @@ class TVShow(TVShowBase):
         logger.debug('None of the conditions were met, ignoring found episode')
         return False
 
+    def want_episodes(self, candidates, manual_search=False):
+        # type: (List[Tuple[integer_types, integer_types, integer_types]], bool) -> List[bool]
+        """
+        evaluate many found episodes against the episode status index of this show
+
+        :param candidates: list of (season number, episode number, quality) tuples
+        :param manual_search: manual search
+        :return: list of wanted flags in the order of candidates
+        """
+        return [self.want_episode(cur_season, cur_episode, cur_quality, manual_search=manual_search)
+                for cur_season, cur_episode, cur_quality in candidates]
+
     def get_overview(self, ep_status, split_snatch=False):
         # type: (integer_types, bool) -> integer_types
         """
@@ -3834,10 +4053,96 @@ class TVShow(TVShowBase):
     __nonzero__ = __bool__
 
 
-class TVEpisode(TVEpisodeBase):
+def load_show_list(lazy=True):
+    # type: (bool) -> None
+    """
+    populate showList and showDict with shows from the database
 
-    def __init__(self, show_obj, season, episode, path='', existing_only=False, show_result=None):
-        # type: (TVShow, integer_types, integer_types, AnyStr, bool, List) -> None
+    :param lazy: build show stubs from SHOW_STUB_COLUMNS with ids of one indexer_mapping pass and load overview and
+    imdb info on first use, else load all show fields, imdb info, and ids with a lookup of any missing id per show
+    """
+    my_db = db.DBConnection(row_type='dict')
+    if lazy:
+        show_columns = ', '.join(['tv_shows.%s' % _c for _c in SHOW_STUB_COLUMNS])
+        imdb_columns = ''
+        imdb_join = ''
+    else:
+        show_columns = 'tv_shows.*'
+        imdb_columns = """
+             ii.akas AS ii_akas,
+             ii.certificates AS ii_certificates,
+             ii.countries AS ii_countries, ii.country_codes AS ii_country_codes,
+             ii.genres AS ii_genres, ii.imdb_id AS ii_imdb_id,
+             ii.indexer AS ii_indexer, ii.indexer_id AS ii_indexer_id,
+             ii.last_update AS ii_ii_last_update,
+             ii.rating AS ii_rating, ii.runtimes AS ii_runtimes,
+             ii.is_mini_series AS ii_is_mini_series, ii.episode_count AS ii_episode_count,
+             ii.title AS ii_title, ii.votes AS ii_votes, ii.year AS ii_year,"""
+        imdb_join = """
+            LEFT JOIN imdb_info ii
+             ON tv_shows.indexer = ii.indexer AND tv_shows.indexer_id = ii.indexer_id"""
+    sql_result = my_db.select(
+        """
+        SELECT tv_shows.indexer AS tv_id, tv_shows.indexer_id AS prod_id, %s,%s
+         tsnf.fail_count AS tsnf_fail_count, tsnf.indexer AS tsnf_indexer,
+         tsnf.indexer_id AS tsnf_indexer_id, tsnf.last_check AS tsnf_last_check,
+         tsnf.last_success AS tsnf_last_success
+        FROM tv_shows%s
+        LEFT JOIN tv_shows_not_found tsnf
+         ON tv_shows.indexer = tsnf.indexer AND tv_shows.indexer_id = tsnf.indexer_id
+        """ % (show_columns, imdb_columns, imdb_join))
+
+    mapping = {}
+    if lazy:
+        for cur_row in my_db.select('SELECT * FROM indexer_mapping'):
+            mapping.setdefault((cur_row['indexer'], cur_row['indexer_id']), []).append(cur_row)
+
+    sickgear.showList = []
+    sickgear.showDict = {}
+    for cur_result in sql_result:
+        try:
+            tv_id = int(cur_result['tv_id'])
+            prod_id = int(cur_result['prod_id'])
+            if not lazy and cur_result['ii_indexer_id']:
+                imdb_info_sql = {_fk.replace('ii_', ''): _fv for _fk, _fv in iteritems(cur_result)
+                                 if _fk.startswith('ii_')}
+            else:
+                imdb_info_sql = None
+            show_obj = TVShow(tv_id, prod_id, show_result=cur_result, imdb_info_result=imdb_info_sql, lazy=lazy)
+            if cur_result['tsnf_indexer_id']:
+                failed_result = {_fk.replace('tsnf_', ''): _fv for _fk, _fv in iteritems(cur_result)
+                                 if _fk.startswith('tsnf_')}
+                show_obj.helper_load_failed_db(sql_result=failed_result)
+            sickgear.showList.append(show_obj)
+            sickgear.showDict[show_obj.sid_int] = show_obj
+            if lazy:
+                # missing ids are looked up by the mapping task that runs after startup
+                show_obj.ids = indexermapper.mapped_from_rows(show_obj, mapping.get((tv_id, prod_id)))
+            else:
+                _ = show_obj.ids
+        except (BaseException, Exception) as err:
+            logger.error('There was an error creating the show in %s: %s' % (cur_result['location'], ex(err)))
+    if lazy:
+        logger.log('Loaded %s shows' % len(sickgear.showList))
+
+
+class TVEpisode(TVEpisodeBase):
+    _columns = ('indexerid', 'indexer', 'name', 'description',
+                'subtitles', 'subtitles_searchcount', 'subtitles_lastsearch',
+                'airdate', 'hasnfo', 'hastbn', 'status', 'location', 'file_size',
+                'release_name', 'is_proper', 'showid', 'season', 'episode', 'absolute_number',
+                'version', 'release_group',
+                'network', 'network_id', 'network_country', 'network_country_code', 'network_is_stream',
+                'airtime', 'runtime', 'timestamp', 'timezone')
+    # noinspection SqlResolve
+    _upsert_sql = 'INSERT INTO tv_episodes (%s) VALUES (%s) ON CONFLICT (indexer, showid, season, episode)' \
+                  ' DO UPDATE SET %s' % (
+                      ', '.join(_columns), ', '.join(['?'] * len(_columns)),
+                      ', '.join(['%s = excluded.%s' % (cur_col, cur_col) for cur_col in _columns
+                                 if cur_col not in ('indexer', 'showid', 'season', 'episode')]))
+
+    def __init__(self, show_obj, season, episode, path='', existing_only=False, show_result=None, scene_result=None):
+        # type: (TVShow, integer_types, integer_types, AnyStr, bool, List, Optional[List]) -> None
         super(TVEpisode, self).__init__(season, episode, int(show_obj.tvid))
 
         self._airtime = None  # type: Optional[datetime.time]
@@ -3860,7 +4165,8 @@ class TVEpisode(TVEpisodeBase):
         self.scene_absolute_number = 0  # type: int
         self.scene_episode = 0  # type: int
         self.scene_season = 0  # type: int
-        self.specify_episode(self._season, self._episode, existing_only=existing_only, show_result=show_result)
+        self.specify_episode(self._season, self._episode, existing_only=existing_only, show_result=show_result,
+                             **({} if None is scene_result else dict(scene_result=scene_result)))
         self.wanted_quality = []  # type: List
 
     @property
@@ -4154,10 +4460,15 @@ class TVEpisode(TVEpisodeBase):
 
         :param season: season number
         :param episode: episode number
-        :param show_result:
+        :param show_result: tv_episodes row of episode in a list, an empty list if episode is not in db
         """
         logger.debug(f'{self._show_obj.tvid_prodid}: Loading episode details from DB for episode {season}x{episode}')
 
+        if isinstance(show_result, list) and not show_result:
+            # a bulk select of show episodes found no row for episode
+            logger.debug(f'{self._show_obj.tvid_prodid}: Episode {season}x{episode} not found in the database')
+            return False
+
         show_result = show_result and next(iter(show_result), None)
         if not show_result or episode != show_result['episode'] or season != show_result['season']:
             my_db = db.DBConnection()
@@ -4276,7 +4587,9 @@ class TVEpisode(TVEpisodeBase):
             switch=False,  # type: bool
             old_tvid=None,  # type: int
             old_prodid=None,  # type: integer_types
-            switch_list=None  # type: List
+            switch_list=None,  # type: List
+            ep_result=None,  # type: Optional[List[Row]]
+            scene_result=None  # type: Optional[List[Row]]
     ):  # type: (...) -> Optional[bool]
         """
         :param season: season number
@@ -4290,6 +4603,8 @@ class TVEpisode(TVEpisodeBase):
         :param old_tvid:
         :param old_prodid:
         :param switch_list:
+        :param ep_result: tv_episodes row of episode in a list, an empty list if episode is not in db
+        :param scene_result: scene_numbering row of episode in a list, an empty list if there is no row
         """
         if None is season:
             season = self._season
@@ -4368,13 +4683,21 @@ class TVEpisode(TVEpisodeBase):
 
         sickgear.scene_numbering.xem_refresh(self._show_obj.tvid, self._show_obj.prodid)
 
+        # prefetched rows save a select of scene_numbering and tv_episodes for each lookup
+        scene_kwargs = {}
+        if None is not ep_result:
+            scene_kwargs['show_result'] = ep_result and ep_result[0]
+        if None is not scene_result:
+            scene_kwargs['scene_result'] = scene_result
+
         self.scene_absolute_number = sickgear.scene_numbering.get_scene_absolute_numbering(
             self._show_obj.tvid, self._show_obj.prodid,
             absolute_number=self._absolute_number,
-            season=self._season, episode=self._episode, show_obj=self._show_obj)
+            season=self._season, episode=self._episode, show_obj=self._show_obj, **scene_kwargs)
 
         self.scene_season, self.scene_episode = sickgear.scene_numbering.get_scene_numbering(
-            self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode, show_obj=self._show_obj)
+            self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode, show_obj=self._show_obj,
+            **scene_kwargs)
 
         self.description = self.dict_prevent_nonetype(ep_info, 'overview')
 
@@ -4735,6 +5058,8 @@ class TVEpisode(TVEpisodeBase):
 
         sql = [['DELETE FROM tv_episodes WHERE indexer = ? AND showid = ? AND season = ? AND episode = ?',
                [self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode]]]
+        self._show_obj.ep_status_index.remove(self._season, self._episode)
+        sickgear.scene_numbering.NUMBERING_MAPS.invalidate(self._show_obj.tvid, self._show_obj.prodid)
         if return_sql:
             return sql
 
@@ -4750,13 +5075,28 @@ class TVEpisode(TVEpisodeBase):
 
         :param force_save: If True it will create SQL queue even if no data has been changed since the last save
         (aka if the record is not dirty).
+        Call mark_saved once the SQL queue is committed.
         """
 
         if not self.dirty and not force_save:
             logger.debug('%s: Not creating SQL queue - record is not dirty' % self._show_obj.tvid_prodid)
             return
 
-        self.dirty = False
+        values = [self._epid, self._tvid,
+                  self._name, self._description,
+                  ','.join([_sub for _sub in self._subtitles]), self._subtitles_searchcount, self._subtitles_lastsearch,
+                  self._airdate.toordinal(), self._hasnfo, self._hastbn, self._status, self._location, self._file_size,
+                  self._release_name, self._is_proper,
+                  self._show_obj.prodid, self._season, self._episode, self._absolute_number,
+                  self._version, self._release_group,
+                  self._network, self._network_id,
+                  self._network_country, self._network_country_code, self._network_is_stream,
+                  time_to_int(self._airtime), self._runtime, self._timestamp, self._timezone]
+        if db.db_support_upsert:
+            # one statement for every episode, so that a list of episodes is written with executemany,
+            # and an update keeps the row id and scene numbers of the row and only fires triggers of changed values
+            return [TVEpisode._upsert_sql, values]
+
         return [
             """
             INSERT OR REPLACE INTO tv_episodes
@@ -4788,21 +5128,16 @@ class TVEpisode(TVEpisodeBase):
              WHERE indexer = ? AND showid = ? AND season = ? AND episode = ?),
             (SELECT scene_episode FROM tv_episodes
              WHERE indexer = ? AND showid = ? AND season = ? AND episode = ?));
-            """, [self._show_obj.tvid, self._show_obj.prodid,
-                  self._season, self._episode,
-                  self._epid, self._tvid,
-                  self._name, self._description,
-                  ','.join([_sub for _sub in self._subtitles]), self._subtitles_searchcount, self._subtitles_lastsearch,
-                  self._airdate.toordinal(), self._hasnfo, self._hastbn, self._status, self._location, self._file_size,
-                  self._release_name, self._is_proper,
-                  self._show_obj.prodid, self._season, self._episode, self._absolute_number,
-                  self._version, self._release_group,
-                  self._network, self._network_id,
-                  self._network_country, self._network_country_code, self._network_is_stream,
-                  time_to_int(self._airtime), self._runtime, self._timestamp, self._timezone,
-                  self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode,
-                  self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode,
-                  self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode]]
+            """, [self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode] + values
+                 + [self._show_obj.tvid, self._show_obj.prodid, self._season, self._episode] * 3]
+
+    def mark_saved(self):
+        """
+        Clear dirty and set the status of this episode in the status index of the show, once the SQL queue of get_sql
+        is committed, so that neither is changed by a write that fails.
+        """
+        self.dirty = False
+        self._show_obj.ep_status_index.set(self._season, self._episode, self._status)
 
     def save_to_db(self, force_save=False):
         """
@@ -4820,43 +5155,10 @@ class TVEpisode(TVEpisodeBase):
 
         logger.debug('STATUS IS %s' % statusStrings[self._status])
 
-        new_value_dict = dict(
-            absolute_number=self._absolute_number,
-            airdate=self._airdate.toordinal(),
-            airtime=time_to_int(self._airtime),
-            description=self._description,
-            file_size=self._file_size,
-            hasnfo=self._hasnfo,
-            hastbn=self._hastbn,
-            indexer=self._tvid,
-            indexerid=self._epid,
-            is_proper=self._is_proper,
-            location=self._location,
-            name=self._name,
-            network=self._network,
-            network_country=self._network_country,
-            network_country_code=self._network_country_code,
-            network_id=self._network_id,
-            network_is_stream=self._network_is_stream,
-            release_group=self._release_group,
-            release_name=self._release_name,
-            runtime=self._runtime,
-            status=self._status,
-            subtitles=','.join([_sub for _sub in self._subtitles]),
-            subtitles_lastsearch=self._subtitles_lastsearch,
-            subtitles_searchcount=self._subtitles_searchcount,
-            timestamp=self._timestamp,
-            timezone=self._timezone,
-            version=self._version,
-        )
-
-        control_value_dict = dict(
-            indexer=self.show_obj.tvid, showid=self.show_obj.prodid, season=self.season, episode=self.episode)
-
-        # use a custom update/insert method to get the data into the DB
         my_db = db.DBConnection()
-        my_db.upsert('tv_episodes', new_value_dict, control_value_dict)
-        self.dirty = False
+        my_db.mass_action([self.get_sql(force_save=True)])
+        self.mark_saved()
+        DAILY_SCHEDULE.invalidate()
 
     # # TODO: remove if unused
     # def full_location(self):
@@ -5325,15 +5627,19 @@ class TVEpisode(TVEpisodeBase):
 
                 # save any changes to the database
                 sql_l = []
+                saved_l = []
                 for cur_ep_obj in [self] + self.related_ep_obj:  # type: TVEpisode
                     cur_ep_obj.create_meta_files(force=True, save_ep=False)
                     ep_sql = cur_ep_obj.get_sql()
                     if None is not ep_sql:
                         sql_l.append(ep_sql)
+                        saved_l.append(cur_ep_obj)
 
                 if 0 < len(sql_l):
                     my_db = db.DBConnection()
                     my_db.mass_action(sql_l)
+                    for cur_ep_obj in saved_l:
+                        cur_ep_obj.mark_saved()
 
         return all_renamed
 
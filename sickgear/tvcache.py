@@ -15,7 +15,7 @@
 # along with SickGear.  If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
-import itertools
+import re
 import time
 
 from exceptions_helper import AuthException, ex, MultipleShowObjectsException
@@ -30,9 +30,11 @@ from .tv import TVEpisode
 
 # noinspection PyUnreachableCode
 if False:
-    from typing import Any, AnyStr, Dict, List, Tuple, Union
+    from typing import Any, AnyStr, Callable, Dict, List, Optional, Set, Tuple, Union
     from providers.generic import GenericProvider, NZBProvider, TorrentProvider
 
+is_proper_name = re.compile(r'(?i)\.(?:proper|repack|real)\.').search
+
 
 class CacheDBConnection(db.DBConnection):
     def __init__(self):
@@ -62,7 +64,8 @@ class TVCache(object):
     def clear_cache(self):
         if self.should_clear_cache():
             my_db = self.get_db()
-            my_db.action('DELETE FROM provider_cache WHERE provider = ?', [self.providerID])
+            my_db.mass_action([['DELETE FROM provider_cache WHERE provider = ?', [self.providerID]],
+                               ['DELETE FROM provider_cache_episodes WHERE provider = ?', [self.providerID]]])
 
     def _title_and_url(self, item):
         """
@@ -94,28 +97,76 @@ class TVCache(object):
         if self.should_update():
             data = self._cache_data(**kwargs)
 
-            # clear cache
             if data:
-                self.clear_cache()
-
-            # parse data
-            cl = []
-            for item in data or []:
-                title, url = self._title_and_url(item)
-                ci = self.parse_item(title, url)
-                if None is not ci:
-                    cl.append(ci)
-
-            if 0 < len(cl):
-                my_db = self.get_db()
+                items = []
+                for item in data:
+                    title, url = self._title_and_url(item)
+                    items.append((url and self._translate_link_url(url), (title, url)))
                 try:
-                    my_db.mass_action(cl)
+                    self.refresh_items(items, lambda i: self.parse_item(*i))
                 except (BaseException, Exception) as e:
-                    logger.log('Warning could not save cache value [%s], caught err: %s' % (cl, ex(e)))
+                    logger.log('Warning could not save cache values, caught err: %s' % ex(e))
 
             # set updated as time the attempt to fetch data is
             self.set_last_update()
 
+    def cached_urls(self, urls, max_params=500):
+        # type: (List[AnyStr], int) -> Set[AnyStr]
+        """
+
+        :param urls: urls to look up
+        :param max_params: maximum number of bound parameters per query
+        :return: the urls that are in the cache of this provider
+        """
+        my_db = self.get_db()
+        result = set()
+        urls = list(set(filter(None, urls)))
+        for cur_start in range(0, len(urls), max_params):
+            chunk = urls[cur_start:cur_start + max_params]
+            result.update([cur_result['url'] for cur_result in my_db.select(
+                'SELECT url FROM provider_cache WHERE provider = ? AND url IN (%s)' % ','.join(['?'] * len(chunk)),
+                [self.providerID] + chunk)])
+        return result
+
+    def refresh_items(self, items, parse_item, max_params=500):
+        # type: (List[Tuple[AnyStr, Any]], Callable[[Any], Optional[List]], int) -> None
+        """
+        incremental cache refresh keyed on item url
+
+        items already in the cache are only stamped as seen and are not parsed again, new items are parsed and added,
+        then if recent search has used the previous results, rows not seen by this refresh are pruned by age
+
+        :param items: list of item url and the item to pass to parse_item
+        :param parse_item: function that returns the cache queries of an item, or None
+        :param max_params: maximum number of bound parameters per query
+        """
+        refresh_time = SGDatetime.timestamp_near()
+        seen = self.cached_urls([url for url, _ in items])
+
+        cl = []
+        for url, item in items:
+            if url not in seen:
+                ci = parse_item(item)
+                if None is not ci:
+                    cl.extend(ci)
+
+        seen = list(seen)
+        for cur_start in range(0, len(seen), max_params):
+            chunk = seen[cur_start:cur_start + max_params]
+            cl.append(['UPDATE provider_cache SET time = ? WHERE provider = ? AND url IN (%s)'
+                       % ','.join(['?'] * len(chunk)), [refresh_time, self.providerID] + chunk])
+
+        if self.should_clear_cache():
+            cl += [['DELETE FROM provider_cache_episodes WHERE provider = ? AND url IN'
+                    ' (SELECT url FROM provider_cache WHERE provider = ? AND time < ?)',
+                    [self.providerID, self.providerID, refresh_time]],
+                   ['DELETE FROM provider_cache WHERE provider = ? AND time < ?', [self.providerID, refresh_time]]]
+
+        if seen or cl:
+            logger.debug(f'{self.provider.name} cache refresh, {len(items) - len(seen)} new'
+                         f' and {len(seen)} already cached item{helpers.maybe_plural(len(seen))}')
+        self.get_db().mass_action(cl)
+
     def get_rss(self, url, **kwargs):
         return RSSFeeds(self.provider).get_feed(url, **kwargs)
 
@@ -149,7 +200,7 @@ class TVCache(object):
         :param url: url
         :type url: AnyStr
         :return:
-        :rtype: None or List[AnyStr, List[Any]]
+        :rtype: None or List[List[AnyStr, List[Any]]]
         """
         if title and url:
             title = self._translate_title(title)
@@ -249,14 +300,14 @@ class TVCache(object):
                         url,  # type: AnyStr
                         parse_result=None,  # type: ParseResult
                         tvid_prodid=None  # type: Union[AnyStr, None]
-                        ):  # type: (...) -> Union[List[AnyStr, List[Any]], None]
+                        ):  # type: (...) -> Union[List[List[AnyStr, List[Any]]], None]
         """
 
         :param name: name
         :param url: url
         :param parse_result: parse result
         :param tvid_prodid: tvid_prodid
-        :return:
+        :return: queries to add the release and a lookup row for each of its episodes, use with cl.extend()
         """
         # check if we passed in a parsed result or should we try and create one
         if not parse_result:
@@ -311,17 +362,23 @@ class TVCache(object):
 
             logger.debug('Add to cache: [%s]' % name)
 
-            return [
+            tvid, prodid = parse_result.show_obj.tvid, parse_result.show_obj.prodid
+            return [[
                 'INSERT OR IGNORE INTO provider_cache'
                 ' (provider, name, season, episodes,'
                 ' indexerid,'
                 ' url, time, quality, release_group, version,'
-                ' indexer)'
-                ' VALUES (?,?,?,?,?,?,?,?,?,?,?)',
+                ' indexer, is_proper)'
+                ' VALUES (?,?,?,?,?,?,?,?,?,?,?,?)',
                 [self.providerID, name, season_number, episode_text,
-                 parse_result.show_obj.prodid,
+                 prodid,
                  url, cur_timestamp, quality, release_group, version,
-                 parse_result.show_obj.tvid]]
+                 tvid, int(bool(is_proper_name(name)))]]] + [[
+                'INSERT OR IGNORE INTO provider_cache_episodes'
+                ' (provider, indexer, indexerid, season, episode, url)'
+                ' VALUES (?,?,?,?,?,?)',
+                [self.providerID, tvid, prodid, season_number, cur_episode, url]]
+                for cur_episode in episode_numbers]
 
     def search_cache(self,
                      episode,  # type: TVEpisode
@@ -347,13 +404,40 @@ class TVCache(object):
         :rtype:
         """
         my_db = self.get_db()
-        sql = "SELECT * FROM provider_cache WHERE name LIKE '%.PROPER.%' OR name LIKE '%.REPACK.%' " \
-              "OR name LIKE '%.REAL.%' AND provider = ?"
+        sql = 'SELECT * FROM provider_cache WHERE provider = ? AND is_proper = 1'
+        params = [self.providerID]
 
         if date:
-            sql += ' AND time >= ' + str(int(time.mktime(date.timetuple())))
+            sql += ' AND time >= ?'
+            params += [int(time.mktime(date.timetuple()))]
 
-        return list(filter(lambda x: x['indexerid'] != 0, my_db.select(sql, [self.providerID])))
+        return list(filter(lambda x: x['indexerid'] != 0, my_db.select(sql, params)))
+
+    @staticmethod
+    def _episodes_where(ep_obj_list, max_params=900):
+        # type: (List[TVEpisode], int) -> List[Tuple[AnyStr, List]]
+        """
+        group episodes by show season into indexed lookups that each stay below the sqlite bound parameter limit
+
+        :param ep_obj_list: episode objects
+        :param max_params: maximum number of bound parameters per query
+        :return: list of sql where clause and its parameters
+        """
+        seasons = {}
+        for ep_obj in ep_obj_list:
+            seasons.setdefault((ep_obj.show_obj.tvid, ep_obj.show_obj.prodid, ep_obj.season), set()).add(ep_obj.episode)
+
+        result, where, params = [], [], []
+        for (cur_tvid, cur_prodid, cur_season), cur_episodes in seasons.items():
+            if where and max_params < len(params) + 3 + len(cur_episodes):
+                result.append((' OR '.join(where), params))
+                where, params = [], []
+            where.append('(e.indexer = ? AND e.indexerid = ? AND e.season = ? AND e.episode IN (%s))'
+                         % ','.join(['?'] * len(cur_episodes)))
+            params += [cur_tvid, cur_prodid, cur_season] + sorted(cur_episodes)
+        if where:
+            result.append((' OR '.join(where), params))
+        return result
 
     def find_needed_episodes(self, ep_obj_list, manual_search=False):
         # type: (Union[TVEpisode, List[TVEpisode]], bool) -> Dict[TVEpisode, SearchResult]
@@ -363,26 +447,32 @@ class TVCache(object):
         :param manual_search: manual search
         """
         needed_eps = {}
-        cl = []
 
         my_db = self.get_db()
         if type(ep_obj_list) != list:
             ep_obj_list = [ep_obj_list]
 
+        sql_result = []
+        for cur_where, cur_params in self._episodes_where(ep_obj_list):
+            sql_result += my_db.select(
+                'SELECT c.*, e.indexer AS ep_tvid, e.indexerid AS ep_prodid, e.season AS ep_season,'
+                ' e.episode AS ep_episode'
+                ' FROM provider_cache_episodes e'
+                ' INNER JOIN provider_cache c ON c.url = e.url AND c.provider = e.provider'
+                ' WHERE e.provider = ? AND (%s)' % cur_where, [self.providerID] + cur_params)
+
+        # keep the former query order, rows of each episode in turn, and only the episode qualities wanted
+        ep_results = {}
+        for cur_result in sql_result:
+            ep_results.setdefault((int(cur_result['ep_tvid']), int(cur_result['ep_prodid']),
+                                   int(cur_result['ep_season']), int(cur_result['ep_episode'])), []).append(cur_result)
+        sql_result, urls = [], set()
         for ep_obj in ep_obj_list:
-            cl.append([
-                'SELECT *'
-                + ' FROM provider_cache'
-                + ' WHERE provider = ?'
-                + ' AND indexer = ? AND indexerid = ?'
-                + ' AND season = ? AND episodes LIKE ?'
-                + ' AND quality IN (%s)' % ','.join([str(x) for x in ep_obj.wanted_quality]),
-                [self.providerID,
-                 ep_obj.show_obj.tvid, ep_obj.show_obj.prodid,
-                 ep_obj.season, '%|' + str(ep_obj.episode) + '|%']])
-        sql_result = my_db.mass_action(cl)
-        if sql_result:
-            sql_result = list(itertools.chain(*sql_result))
+            for cur_result in ep_results.get((ep_obj.show_obj.tvid, ep_obj.show_obj.prodid,
+                                              ep_obj.season, ep_obj.episode), []):
+                if cur_result['url'] not in urls and int(cur_result['quality']) in ep_obj.wanted_quality:
+                    urls.add(cur_result['url'])
+                    sql_result.append(cur_result)
 
         if not sql_result:
             self._set_last_search()
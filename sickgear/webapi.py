@@ -48,6 +48,7 @@ from lib.tvinfo_base.exceptions import *
 from .scene_numbering import set_scene_numbering_helper
 from .scheduler import Scheduler
 from .search_backlog import FORCED_BACKLOG
+from .show_stats import SHOW_STATS
 from .show_updater import clean_ignore_require_words
 from .sgdatetime import SGDatetime
 from .tv import TVEpisode, TVShow,  TVidProdid
@@ -1326,6 +1327,7 @@ class CMD_SickGearEpisodeSetStatus(ApiCall):
         segments = {}
 
         sql_l = []
+        saved_l = []
         for ep_obj in ep_obj_list:
             with ep_obj.lock:
                 if self.status == WANTED:
@@ -1359,6 +1361,7 @@ class CMD_SickGearEpisodeSetStatus(ApiCall):
                 result = ep_obj.get_sql()
                 if None is not result:
                     sql_l.append(result)
+                    saved_l.append(ep_obj)
 
                 if self.status == WANTED:
                     start_backlog = True
@@ -1367,6 +1370,8 @@ class CMD_SickGearEpisodeSetStatus(ApiCall):
         if 0 < len(sql_l):
             my_db = db.DBConnection()
             my_db.mass_action(sql_l)
+            for cur_ep_obj in saved_l:
+                cur_ep_obj.mark_saved()
 
         extra_msg = ""
         if start_backlog:
@@ -2220,6 +2225,20 @@ class CMD_SickGearSearchQueue(ApiCall):
         return _responds(RESULT_SUCCESS, sickgear.search_queue_scheduler.action.queue_length())
 
 
+class CMD_SickGearNameParserCache(ApiCall):
+    _help = {'desc': 'get the size, limits, and hit, miss, eviction and expiry counts of the name parser cache'}
+
+    def __init__(self, handler, args, kwargs):
+        # required
+        # optional
+        # super, missing, help
+        ApiCall.__init__(self, handler, args, kwargs)
+
+    def run(self):
+        """ get the size, limits, and hit, miss, eviction and expiry counts of the name parser cache """
+        return _responds(RESULT_SUCCESS, sickgear.name_parser.parser.name_parser_cache.stats())
+
+
 class CMD_SickGearGetDefaults(ApiCall):
     _help = {"desc": "get various sickgear default system values"}
 
@@ -4723,10 +4742,6 @@ class CMD_SickGearShowsStats(ApiCall):
         """ get the global shows and episode stats """
         stats = {}
 
-        indexer_limit = ('', ' AND indexer = %s' % TVINFO_TVDB)[self.sickbeard_call]
-        my_db = db.DBConnection()
-        today = str(datetime.date.today().toordinal())
-
         stats["shows_total"] = (len(sickgear.showList),
                                 len([cur_so for cur_so in sickgear.showList
                                      if TVINFO_TVDB == cur_so.tvid]))[self.sickbeard_call]
@@ -4737,15 +4752,10 @@ class CMD_SickGearShowsStats(ApiCall):
              and (not self.sickbeard_call
                   or TVINFO_TVDB == cur_so.tvid)])
 
-        stats["ep_downloaded"] = my_db.select("SELECT COUNT(*) FROM tv_episodes WHERE status IN (" + ",".join(
-            [str(status) for status in
-             Quality.DOWNLOADED + Quality.ARCHIVED]) + ") AND season != 0 and episode != 0 AND airdate <= " + today +
-                                             indexer_limit)[0][0]
-
-        stats["ep_total"] = my_db.select(
-            "SELECT COUNT(*) FROM tv_episodes WHERE season != 0 AND episode != 0 AND (airdate != 1 OR status IN (" +
-            ",".join([str(status) for status in Quality.SNATCHED_ANY + Quality.DOWNLOADED + Quality.ARCHIVED]) +
-            ")) AND airdate <= " + today + " AND status != " + str(IGNORED) + indexer_limit)[0][0]
+        show_stats = [cur_stats for (cur_tvid, _), cur_stats in iteritems(SHOW_STATS.get_all())
+                      if not self.sickbeard_call or TVINFO_TVDB == cur_tvid]
+        stats["ep_downloaded"] = sum([cur_stats['ep_downloaded_aired'] for cur_stats in show_stats])
+        stats["ep_total"] = sum([cur_stats['ep_total_aired'] for cur_stats in show_stats])
 
         return _responds(RESULT_SUCCESS, stats)
 
@@ -4807,6 +4817,7 @@ _functionMaper = {"help": CMD_Help,
                   "sb.forcesearch": CMD_SickBeardForceSearch,
                   "sg.forcesearch": CMD_SickGearForceSearch,
                   "sg.searchqueue": CMD_SickGearSearchQueue,
+                  "sg.nameparsercache": CMD_SickGearNameParserCache,
                   "sb.getdefaults": CMD_SickBeardGetDefaults,
                   "sg.getdefaults": CMD_SickGearGetDefaults,
                   "sb.getmessages": CMD_SickBeardGetMessages,
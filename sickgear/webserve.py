@@ -53,6 +53,7 @@ from . import classes, clients, config, db, helpers, history, image_cache, logge
     network_timezones, notifiers, nzbget, processTV, sab, scene_exceptions, search_queue, subtitles, ui
 from .anime import AniGroupList, pull_anidb_groups, short_group_names
 from .browser import folders_at_path
+from .daily_schedule import DAILY_SCHEDULE
 from .common import ARCHIVED, DOWNLOADED, FAILED, IGNORED, SKIPPED, SNATCHED, SNATCHED_ANY, UNAIRED, UNKNOWN, WANTED, \
     SD, HD720p, HD1080p, UHD2160p, Overview, Quality, qualityPresetStrings, statusStrings
 from .helpers import (get_media_stats, has_image_ext, is_sickgear_dir, real_path, remove_article, remove_file_perm,
@@ -68,6 +69,8 @@ from .scheduler import Scheduler
 from .search_backlog import FORCED_BACKLOG
 from .sgdatetime import SGDatetime
 from .show_name_helpers import abbr_showname
+from .show_stats import SHOW_STATS
+from .static_assets import ASSETS
 
 from .show_updater import clean_ignore_require_words
 from .trakt_helpers import build_config, trakt_collection_remove_account
@@ -91,7 +94,7 @@ from lib.requests.adapters import HTTPAdapter
 
 from lib import subliminal
 from lib.cfscrape import CloudflareScraper
-from lib.dateutil import tz, zoneinfo
+from lib.dateutil import zoneinfo
 from lib.dateutil.relativedelta import relativedelta
 try:
     from lib.thefuzz import fuzz
@@ -169,6 +172,7 @@ class PageTemplate(Template):
             self.log_num_not_found_shows_all = len([cur_so for cur_so in sickgear.showList
                                                     if 0 != cur_so.not_found_count])
         self.sbPID = str(sickgear.PID)
+        self.asset_url = ASSETS.url
         self.menu = [
             {'title': 'Home', 'key': 'home'},
             {'title': 'Episodes', 'key': 'daily-schedule'},
@@ -214,19 +218,50 @@ class BaseStaticFileHandler(StaticFileHandler):
             del kwargs['exc_info']
         return super(BaseStaticFileHandler, self).write_error(status_code, **kwargs)
 
+    def initialize(self, path, default_filename=None):
+        super(BaseStaticFileHandler, self).initialize(path, default_filename)
+        self.immutable = False  # type: bool
+        self.content_encoding = None  # type: Optional[AnyStr]
+        self.asset_path = None  # type: Optional[AnyStr]
+
     def validate_absolute_path(self, root, absolute_path):
+        # a fingerprinted url of the current asset content is served with long-lived caching
+        absolute_path, self.immutable = ASSETS.resolve(absolute_path)
         if '\\images\\flags\\' in absolute_path and not os.path.isfile(absolute_path):
             absolute_path = re.sub(r'\\[^\\]+\.png$', '\\\\unknown.png', absolute_path)
-        return super(BaseStaticFileHandler, self).validate_absolute_path(root, absolute_path)
+        absolute_path = super(BaseStaticFileHandler, self).validate_absolute_path(root, absolute_path)
+        if absolute_path:
+            self.asset_path = absolute_path
+            variant_path, self.content_encoding = ASSETS.variant(
+                absolute_path, self.request.headers.get('Accept-Encoding'))
+            if variant_path:
+                return variant_path
+        return absolute_path
+
+    def get_content_type(self):
+        if self.content_encoding:
+            # type of the asset, not of its precompressed variant
+            mime_type, encoding = MimeTypes().guess_type(self.asset_path)
+            return mime_type or 'application/octet-stream'
+        return super(BaseStaticFileHandler, self).get_content_type()
+
+    def get_cache_time(self, path, modified, mime_type):
+        return (super(BaseStaticFileHandler, self).get_cache_time(path, modified, mime_type),
+                365 * 24 * 60 * 60)[self.immutable]
 
     def data_received(self, *args):
         pass
 
     def set_extra_headers(self, path):
         self.set_header('X-Robots-Tag', 'noindex, nofollow, noarchive, nocache, noodp, noydir, noimageindex, nosnippet')
-        self.set_header('Cache-Control', 'no-cache, max-age=0')
-        self.set_header('Pragma', 'no-cache')
-        self.set_header('Expires', '0')
+        if self.immutable:
+            self.set_header('Cache-Control', 'public, max-age=%s, immutable' % (365 * 24 * 60 * 60))
+        else:
+            self.set_header('Cache-Control', 'no-cache, max-age=0')
+            self.set_header('Pragma', 'no-cache')
+            self.set_header('Expires', '0')
+        if self.content_encoding:
+            self.set_header('Content-Encoding', self.content_encoding)
         if sickgear.SEND_SECURITY_HEADERS:
             self.set_header('X-Frame-Options', 'SAMEORIGIN')
 
@@ -503,18 +538,6 @@ class CalendarHandler(BaseHandler):
 
         logger.log(f'Receiving iCal request from {self.request.remote_ip}')
 
-        # Limit dates
-        past_date = (dt_date.today() + timedelta(weeks=-52)).toordinal()
-        future_date = (dt_date.today() + timedelta(weeks=52)).toordinal()
-        utc = tz.gettz('GMT', zoneinfo_priority=True)
-
-        # Get all the shows that are not paused and are currently on air
-        my_db = db.DBConnection()
-        show_list = my_db.select(
-            'SELECT show_name, indexer AS tv_id, indexer_id AS prod_id, network, airs, runtime'
-            ' FROM tv_shows'
-            ' WHERE (status = \'Continuing\' OR status = \'Returning Series\' ) AND paused != \'1\'')
-
         nl = '\\n\\n'
         crlf = '\r\n'
 
@@ -523,34 +546,22 @@ class CalendarHandler(BaseHandler):
         ical = 'BEGIN:VCALENDAR%sVERSION:2.0%sX-WR-CALNAME:%s%sX-WR-CALDESC:%s%sPRODID://%s Upcoming Episodes//%s' \
                % (crlf, crlf, appname, crlf, appname, crlf, appname, crlf)
 
-        for show in show_list:
-            # Get all episodes of this show airing between today and next month
-
-            episode_list = my_db.select(
-                'SELECT name, season, episode, description, airdate'
-                ' FROM tv_episodes'
-                ' WHERE indexer = ? AND showid = ?'
-                ' AND airdate >= ? AND airdate < ? ',
-                [show['tv_id'], show['prod_id']]
-                + [past_date, future_date])
-
-            for episode in episode_list:
-                air_date_time = network_timezones.parse_date_time(episode['airdate'], show['airs'],
-                                                                  show['network']).astimezone(utc)
-                air_date_time_end = air_date_time + timedelta(minutes=helpers.try_int(show['runtime'], 60))
-
-                # Create event for episode
-                desc = '' if not episode['description'] else f'{nl}{episode["description"].splitlines()[0]}'
-                ical += (f'BEGIN:VEVENT{crlf}'
-                         f'DTSTART:{air_date_time.strftime("%Y%m%d")}T{air_date_time.strftime("%H%M%S")}Z{crlf}'
-                         f'DTEND:{air_date_time_end.strftime("%Y%m%d")}T{air_date_time_end.strftime("%H%M%S")}Z{crlf}'
-                         f'SUMMARY:{show["show_name"]} - {episode["season"]}x{episode["episode"]}'
-                            f' - {episode["name"]}{crlf}'
-                         f'UID:{appname}-{dt_date.today().isoformat()}-{show["show_name"].replace(" ", "-")}'
-                            f'-E{episode["episode"]}S{episode["season"]}{crlf}'
-                         f'DESCRIPTION:{(show["airs"] or "(Unknown airs)")} on {(show["network"] or "Unknown network")}'
-                         f'{desc}{crlf}'
-                         f'END:VEVENT{crlf}')
+        # episodes of the shows that are not paused and are currently on air, cached for the day
+        for episode in DAILY_SCHEDULE.calendar():
+            air_date_time, air_date_time_end = episode['air_date_time'], episode['air_date_time_end']
+
+            # Create event for episode
+            desc = '' if not episode['description'] else f'{nl}{episode["description"].splitlines()[0]}'
+            ical += (f'BEGIN:VEVENT{crlf}'
+                     f'DTSTART:{air_date_time.strftime("%Y%m%d")}T{air_date_time.strftime("%H%M%S")}Z{crlf}'
+                     f'DTEND:{air_date_time_end.strftime("%Y%m%d")}T{air_date_time_end.strftime("%H%M%S")}Z{crlf}'
+                     f'SUMMARY:{episode["show_name"]} - {episode["season"]}x{episode["episode"]}'
+                        f' - {episode["name"]}{crlf}'
+                     f'UID:{appname}-{dt_date.today().isoformat()}-{episode["show_name"].replace(" ", "-")}'
+                        f'-E{episode["episode"]}S{episode["season"]}{crlf}'
+                     f'DESCRIPTION:{(episode["airs"] or "(Unknown airs)")} on '
+                        f'{(episode["network"] or "Unknown network")}{desc}{crlf}'
+                     f'END:VEVENT{crlf}')
 
         # Ending the iCal
         return ical + 'END:VCALENDAR'
@@ -1194,63 +1205,11 @@ class MainHandler(WebHandler):
         """ display the episodes """
         today_dt = dt_date.today()
         today = today_dt.toordinal()
-        yesterday_dt = today_dt - timedelta(days=1)
-        yesterday = yesterday_dt.toordinal()
-        tomorrow = (dt_date.today() + timedelta(days=1)).toordinal()
         next_week_dt = (dt_date.today() + timedelta(days=7))
         next_week = (next_week_dt + timedelta(days=1)).toordinal()
-        recently = (yesterday_dt - timedelta(days=sickgear.EPISODE_VIEW_MISSED_RANGE)).toordinal()
 
-        done_show_list = []
-        qualities = Quality.SNATCHED + Quality.DOWNLOADED + Quality.ARCHIVED + [IGNORED, SKIPPED]
-
-        my_db = db.DBConnection()
-        sql_result = my_db.select(
-            'SELECT *, tv_episodes.network as episode_network, tv_shows.status AS show_status,'
-            ' tv_shows.network as show_network, tv_shows.timezone as show_timezone, tv_shows.airtime as show_airtime,'
-            ' tv_episodes.timezone as ep_timezone, tv_episodes.airtime as ep_airtime'
-            ' FROM tv_episodes, tv_shows'
-            ' WHERE tv_shows.indexer = tv_episodes.indexer AND tv_shows.indexer_id = tv_episodes.showid'
-            ' AND season != 0 AND airdate >= ? AND airdate <= ?'
-            ' AND tv_episodes.status NOT IN (%s)' % ','.join(['?'] * len(qualities)),
-            [yesterday, next_week] + qualities)
-
-        for cur_result in sql_result:
-            done_show_list.append('%s-%s' % (cur_result['indexer'], cur_result['showid']))
-
-        # noinspection SqlRedundantOrderingDirection
-        sql_result += my_db.select(
-            'SELECT *, outer_eps.network as episode_network, tv_shows.status AS show_status,'
-            ' tv_shows.network as show_network, tv_shows.timezone as show_timezone, tv_shows.airtime as show_airtime,'
-            ' outer_eps.timezone as ep_timezone, outer_eps.airtime as ep_airtime'
-            ' FROM tv_episodes outer_eps, tv_shows'
-            ' WHERE season != 0'
-            ' AND tv_shows.indexer || \'-\' || showid NOT IN (%s)' % ','.join(done_show_list)
-            + ' AND tv_shows.indexer = outer_eps.indexer AND tv_shows.indexer_id = outer_eps.showid'
-              ' AND airdate = (SELECT airdate FROM tv_episodes inner_eps'
-              ' WHERE inner_eps.season != 0'
-              ' AND inner_eps.indexer = outer_eps.indexer AND inner_eps.showid = outer_eps.showid'
-              ' AND inner_eps.airdate >= ?'
-              ' ORDER BY inner_eps.airdate ASC LIMIT 1) AND outer_eps.status NOT IN (%s)'
-            % ','.join(['?'] * len(Quality.SNATCHED + Quality.DOWNLOADED)),
-            [next_week] + Quality.SNATCHED + Quality.DOWNLOADED)
-
-        sql_result += my_db.select(
-            'SELECT *, tv_episodes.network as episode_network, tv_shows.status AS show_status,'
-            ' tv_shows.network as show_network, tv_shows.timezone as show_timezone, tv_shows.airtime as show_airtime,'
-            ' tv_episodes.timezone as ep_timezone, tv_episodes.airtime as ep_airtime'
-            ' FROM tv_episodes, tv_shows'
-            ' WHERE season != 0'
-            ' AND tv_shows.indexer = tv_episodes.indexer AND tv_shows.indexer_id = tv_episodes.showid'
-            ' AND airdate <= ? AND airdate >= ? AND tv_episodes.status = ? AND tv_episodes.status NOT IN (%s)'
-            % ','.join(['?'] * len(qualities)),
-            [tomorrow, recently, WANTED] + qualities)
-        sql_result = list(set(sql_result))
-
-        # make a dict out of the sql results
-        sql_result = [dict(row) for row in sql_result
-                      if Quality.split_composite_status(helpers.try_int(row['status']))[0] not in
-                      SNATCHED_ANY + [DOWNLOADED, ARCHIVED, IGNORED, SKIPPED]]
+        # episodes with network localised air times are cached for the day
+        sql_result = DAILY_SCHEDULE.schedule()
 
         # multi dimension sort
         sorts = {
@@ -1267,48 +1226,17 @@ class MainHandler(WebHandler):
         # add localtime to the dict
         cache_obj = image_cache.ImageCache()
         fanarts = {}
-        cur_prodid = None
-        for index, item in enumerate(sql_result):
-            tvid_prodid_obj = TVidProdid({item['indexer']: item['showid']})
-            tvid_prodid = str(tvid_prodid_obj)
-            sql_result[index]['tv_id'] = item['indexer']
-            sql_result[index]['prod_id'] = item['showid']
-            sql_result[index]['tvid_prodid'] = tvid_prodid
-            if cur_prodid != tvid_prodid:
-                cur_prodid = tvid_prodid
-
-            sql_result[index]['network'] = (item['show_network'], item['episode_network'])[
-                isinstance(item['episode_network'], string_types) and 0 != len(item['episode_network'].strip())]
-
-            val = network_timezones.get_episode_time(
-                item['airdate'], item['airs'], item['show_network'], item['show_airtime'], item['show_timezone'],
-                item['timestamp'], item['episode_network'], item['ep_airtime'], item['ep_timezone'])
-
-            # noinspection PyCallByClass,PyTypeChecker
-            sql_result[index]['parsed_datetime'] = val
-            sql_result[index]['localtime'] = SGDatetime.convert_to_setting(val)
-            sql_result[index]['data_show_name'] = value_maybe_article(item['show_name'])
-            sql_result[index]['data_network'] = value_maybe_article(item['network'])
-            if not sql_result[index]['runtime']:
-                sql_result[index]['runtime'] = 5
-
-            imdb_id = None
-            if item['imdb_id']:
-                try:
-                    imdb_id = helpers.try_int(re.search(r'(\d+)', item['imdb_id']).group(1))
-                except (BaseException, Exception):
-                    pass
-            if imdb_id:
-                sql_result[index]['imdb_url'] = sickgear.indexers.indexer_config.tvinfo_config[
-                                                    sickgear.indexers.indexer_config.TVINFO_IMDB][
-                                                    'show_url'] % imdb_id
-            else:
-                sql_result[index]['imdb_url'] = ''
+        for item in sql_result:
+            tvid_prodid = item['tvid_prodid'] = str(TVidProdid({item['tv_id']: item['prod_id']}))
+            item['localtime'] = SGDatetime.convert_to_setting(item['parsed_datetime'])
+            item['data_show_name'] = value_maybe_article(item['show_name'])
+            item['data_network'] = value_maybe_article(item['network'])
 
             if tvid_prodid in fanarts:
                 continue
 
-            for img in glob.glob(cache_obj.fanart_path(*tvid_prodid_obj.tuple).replace('fanart.jpg', '*')) or []:
+            fanart_path = cache_obj.fanart_path(item['tv_id'], item['prod_id'])
+            for img in glob.glob(fanart_path.replace('fanart.jpg', '*')) or []:
                 match = re.search(r'(\d+(?:\.\w*)?\.\w{5,8})\.fanart\.', img, re.I)
                 if not match:
                     continue
@@ -1433,6 +1361,15 @@ class MainHandler(WebHandler):
 
         return next_event
 
+    @staticmethod
+    def _file_name(path):
+        # type: (Optional[AnyStr]) -> AnyStr
+        """
+        :param path: path of a file in the style of any os
+        :return: file name, the text after the last / or \\ of path
+        """
+        return re.split(r'[\\/]', path or '')[-1]
+
     @staticmethod
     def update_watched_state(payload=None, as_json=True):
         """
@@ -1510,30 +1447,34 @@ r.close()
         if data:
             my_db = db.DBConnection(row_type='dict')
 
-            media_paths = list(map(lambda arg: os.path.basename(arg[1]['path_file']), iteritems(data)))
+            # file names of any path style, as a file name from a client on another os is also matched
+            media_names = list(set(filter(None, map(
+                lambda arg: MainHandler._file_name(arg[1].get('path_file')), iteritems(data)))))
 
             def chunks(lines, n):
                 for c in range(0, len(lines), n):
                     yield lines[c:c + n]
 
             # noinspection PyTypeChecker
-            for x in chunks(media_paths, 100):
+            for x in chunks(media_names, 500):
+                # the expression matches an index of tv_episodes for the many file names of a payload
                 # noinspection PyTypeChecker
                 sql_result += my_db.select(
-                    'SELECT episode_id, status, location, file_size FROM tv_episodes WHERE file_size > 0 AND (%s)' %
-                    ' OR '.join(['location LIKE "%%%s"' % i for i in x]))
+                    'SELECT episode_id, status, location, file_size FROM tv_episodes'
+                    ' WHERE %s IN (%s) AND file_size > 0'
+                    % (db.file_name_sql('location'), ','.join(['lower(?)'] * len(x))), x)
 
         if sql_result:
             cl = []
 
             ep_results = {}
-            map_consume(lambda r: ep_results.update({'%s' % os.path.basename(r['location']).lower(): dict(
+            map_consume(lambda r: ep_results.update({MainHandler._file_name(r['location']).lower(): dict(
                         episode_id=r['episode_id'], status=r['status'], location=r['location'],
                         file_size=r['file_size'])}), sql_result)
 
             for (k, v) in iteritems(data):
 
-                bname = (os.path.basename(v.get('path_file')) or '').lower()
+                bname = MainHandler._file_name(v.get('path_file')).lower()
                 if not bname:
                     msg = 'Missing media file name provided'
                     data[k] = msg
@@ -1717,38 +1658,10 @@ class Home(MainHandler):
         t.layout = sickgear.HOME_LAYOUT
 
         # Get all show snatched / downloaded / next air date stats
-        my_db = db.DBConnection()
-        today = dt_date.today().toordinal()
-        status_quality = ','.join([str(x) for x in Quality.SNATCHED_ANY])
-        status_download = ','.join([str(x) for x in Quality.DOWNLOADED + Quality.ARCHIVED])
-        status_total = '%s, %s, %s' % (SKIPPED, WANTED, FAILED)
-
-        sql_result = my_db.select(
-            'SELECT indexer AS tvid, showid as prodid, '
-            + '(SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_snatched,'
-              ' (SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1 AND status IN (%s)) AS ep_downloaded,'
-              ' (SELECT COUNT(*) FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND season > 0 AND episode > 0 AND airdate > 1'
-              ' AND ('
-              '(airdate <= %s AND (status IN (%s)))'
-              ' OR (status IN (%s)) OR (status IN (%s)))) AS ep_total,'
-              ' (SELECT airdate FROM tv_episodes'
-              ' WHERE indexer = tv_eps.indexer AND showid = tv_eps.showid'
-              ' AND airdate >= %s AND (status = %s  OR status = %s)'
-              ' ORDER BY airdate ASC LIMIT 1) AS ep_airs_next'
-              ' FROM tv_episodes tv_eps GROUP BY indexer, showid'
-            % (status_quality, status_download, today, status_total,
-               status_quality, status_download, today, UNAIRED, WANTED))
-
         t.show_stat = {}
 
-        for cur_result in sql_result:
-            t.show_stat[TVidProdid({cur_result['tvid']: cur_result['prodid']})()] = cur_result
+        for (cur_tvid, cur_prodid), cur_stats in iteritems(SHOW_STATS.get_all()):
+            t.show_stat[TVidProdid({cur_tvid: cur_prodid})()] = cur_stats
 
         return t.respond()
 
@@ -2557,6 +2470,20 @@ class Home(MainHandler):
         sorted_show_list = sorted(sickgear.showList, key=lambda x: titler(x.name))
         year_check = re.compile(r' \(\d{4}\)$')
         dups = {}
+        first_aired = None
+
+        def start_year(show_obj):
+            # one grouped pass of episodes on the first duplicate name instead of loading all episodes of the shows
+            nonlocal first_aired
+            if None is first_aired:
+                my_db = db.DBConnection()
+                first_aired = {(cur_row['indexer'], cur_row['showid']): cur_row['first_airdate']
+                               for cur_row in my_db.select(
+                                   'SELECT indexer, showid, MIN(airdate) AS first_airdate FROM tv_episodes'
+                                   ' WHERE season != 0 AND airdate > ? GROUP BY indexer, showid',
+                                   [dt_date(1900, 1, 1).toordinal()])}
+            airdate = first_aired.get((show_obj.tvid, show_obj.prodid))
+            return (airdate and dt_date.fromordinal(airdate).year) or show_obj.startyear
 
         for i, val in enumerate(sorted_show_list):
             if val.name not in dups:
@@ -2568,20 +2495,16 @@ class Home(MainHandler):
                 sickgear.name_parser.parser.name_parser_cache.flush(val)
                 if not year_check.search(sorted_show_list[dups[val.name]].name):
                     # add year to first show
-                    first_ep = sorted_show_list[dups[val.name]].first_aired_regular_episode
-                    start_year = (first_ep and first_ep.airdate and first_ep.airdate.year) or \
-                        sorted_show_list[dups[val.name]].startyear
-                    if start_year:
+                    first_year = start_year(sorted_show_list[dups[val.name]])
+                    if first_year:
                         sorted_show_list[dups[val.name]].unique_name = '%s (%s)' % (
-                            sorted_show_list[dups[val.name]].name, start_year)
+                            sorted_show_list[dups[val.name]].name, first_year)
                         dups[sorted_show_list[dups[val.name]].unique_name] = i
                 if not year_check.search(sorted_show_list[i].name):
                     # add year to duplicate
-                    first_ep = sorted_show_list[i].first_aired_regular_episode
-                    start_year = (first_ep and first_ep.airdate and first_ep.airdate.year) or sorted_show_list[
-                        i].startyear
-                    if start_year:
-                        sorted_show_list[i].unique_name = '%s (%s)' % (sorted_show_list[i].name, start_year)
+                    first_year = start_year(sorted_show_list[i])
+                    if first_year:
+                        sorted_show_list[i].unique_name = '%s (%s)' % (sorted_show_list[i].name, first_year)
                         dups[sorted_show_list[i].unique_name] = i
 
         name_cache.build_name_cache()
@@ -3288,6 +3211,7 @@ class Home(MainHandler):
         if None is not eps:
 
             sql_l = []
+            saved_l = []
             # sort episode numbers
             eps_list = eps.split('|')
             eps_list.sort()
@@ -3341,10 +3265,13 @@ class Home(MainHandler):
                     result = ep_obj.get_sql()
                     if None is not result:
                         sql_l.append(result)
+                        saved_l.append(ep_obj)
 
             if 0 < len(sql_l):
                 my_db = db.DBConnection()
                 my_db.mass_action(sql_l)
+                for cur_ep_obj in saved_l:
+                    cur_ep_obj.mark_saved()
 
         if WANTED == status:
             season_list = ''
@@ -3409,7 +3336,7 @@ class Home(MainHandler):
 
         ep_obj_rename_list = []
 
-        ep_obj_list = show_obj.get_all_episodes(has_location=True)
+        ep_obj_list = show_obj.iter_all_episodes(has_location=True)
 
         for cur_ep_obj in ep_obj_list:
             # Only want to rename if we have a location
@@ -8050,34 +7977,40 @@ class History(MainHandler):
 
     @private_call
     @classmethod
-    def query_history(cls, my_db, limit=100):
-        # type: (db.DBConnection, int) -> Tuple[List[dict], List[dict]]
+    def query_history(cls, my_db, limit=100, before=None):
+        # type: (db.DBConnection, int, Optional[AnyStr]) -> Tuple[List[dict], List[dict]]
         """Query db for historical data
         :param my_db: connection should be instantiated with row_type='dict'
-        :param limit: number of db rows to fetch
+        :param limit: number of db rows to fetch, 0 for all
+        :param before: keyset cursor of a page, fetch rows older than a 'date_rowid' cursor of a previous page
         :return: two data sets, detailed and compact
         """
+        where, params = '', [TVidProdid.glue]
+        cursor = cls._parse_cursor(before)
+        if cursor:
+            where, params = ' AND (h.date < ? OR (h.date = ? AND h.rowid < ?))', params + [cursor[0]] * 2 + [cursor[1]]
 
-        sql = 'SELECT h.*, show_name, s.indexer || ? || s.indexer_id AS tvid_prodid' \
+        # index idx_history_hide_date supports the keyset page in date order
+        sql = 'SELECT h.*, h.rowid AS history_id, show_name, s.indexer || ? || s.indexer_id AS tvid_prodid' \
               ' FROM history h, tv_shows s' \
               ' WHERE h.indexer=s.indexer AND h.showid=s.indexer_id' \
-              ' AND h.hide = 0' \
-              ' ORDER BY date DESC' \
-              '%s' % (' LIMIT %s' % limit, '')['0' == limit]
-        sql_result = my_db.select(sql, [TVidProdid.glue])
+              ' AND h.hide = 0%s' \
+              ' ORDER BY h.date DESC, h.rowid DESC' \
+              '%s' % (where, ('', ' LIMIT %s' % helpers.try_int(limit))[0 < helpers.try_int(limit)])
+        sql_result = my_db.select(sql, params)
 
         compact = []
+        compact_index = {}
 
         for cur_result in sql_result:
 
             action = dict(time=cur_result['date'], action=cur_result['action'],
                           provider=cur_result['provider'], resource=cur_result['resource'])
 
-            if not any([(record['show_id'] == cur_result['showid']
-                         and record['indexer'] == cur_result['indexer']
-                         and record['season'] == cur_result['season']
-                         and record['episode'] == cur_result['episode']
-                         and record['quality'] == cur_result['quality']) for record in compact]):
+            key = (cur_result['indexer'], cur_result['showid'], cur_result['season'], cur_result['episode'],
+                   cur_result['quality'])
+            cur_res = compact_index.get(key)
+            if None is cur_res:
                 show_obj = helpers.find_show_by_id({cur_result['indexer']: cur_result['showid']}, no_mapped_ids=False,
                                                    no_exceptions=True)
                 cur_res = dict(show_id=cur_result['showid'], indexer=cur_result['indexer'],
@@ -8085,29 +8018,44 @@ class History(MainHandler):
                                show_name=(show_obj and show_obj.unique_name) or cur_result['show_name'],
                                season=cur_result['season'], episode=cur_result['episode'],
                                quality=cur_result['quality'], resource=cur_result['resource'], actions=[])
-
-                cur_res['actions'].append(action)
-                cur_res['actions'].sort(key=lambda _x: _x['time'])
-
+                compact_index[key] = cur_res
                 compact.append(cur_res)
-            else:
-                index = [i for i, record in enumerate(compact)
-                         if record['show_id'] == cur_result['showid']
-                         and record['season'] == cur_result['season']
-                         and record['episode'] == cur_result['episode']
-                         and record['quality'] == cur_result['quality']][0]
-
-                cur_res = compact[index]
 
-                cur_res['actions'].append(action)
-                cur_res['actions'].sort(key=lambda _x: _x['time'], reverse=True)
+            # rows are in date descending order, so actions are newest first
+            cur_res['actions'].append(action)
 
         return sql_result, compact
 
-    def index(self, limit=100, layout=None):
+    @staticmethod
+    def _parse_cursor(cursor):
+        # type: (Optional[AnyStr]) -> Optional[Tuple[int, int]]
+        """
+        :param cursor: keyset cursor 'date_rowid'
+        :return: date and rowid, or None if not a valid cursor
+        """
+        try:
+            date, rowid = [int(cur_part) for cur_part in cursor.split('_')]
+            return date, rowid
+        except (BaseException, Exception):
+            pass
+
+    @staticmethod
+    def _next_cursor(sql_result, limit):
+        # type: (List[dict], int) -> Optional[AnyStr]
+        """
+        :param sql_result: rows of a page
+        :param limit: page size
+        :return: keyset cursor of the page after a full page, else None
+        """
+        if 0 < helpers.try_int(limit) <= len(sql_result):
+            return '%s_%s' % (sql_result[-1]['date'], sql_result[-1]['history_id'])
+
+    def index(self, limit=100, layout=None, before=None):
 
         t = PageTemplate(web_handler=self, file='history.tmpl')
         t.limit = limit
+        t.before = None
+        t.next_before = None
 
         if 'provider_failures' == layout:  # layout renamed
             layout = 'connect_failures'
@@ -8119,7 +8067,9 @@ class History(MainHandler):
         result_sets = []
         if sickgear.HISTORY_LAYOUT in ('compact', 'detailed'):
 
-            sql_result, compact = self.query_history(my_db, limit)
+            sql_result, compact = self.query_history(my_db, limit, before)
+            t.before = self._parse_cursor(before) and before
+            t.next_before = self._next_cursor(sql_result, limit)
 
             t.compact_results = compact
             t.history_results = sql_result
@@ -8442,19 +8392,31 @@ class History(MainHandler):
 
             if states:
                 # Prune user removed items that are no longer being returned by API
-                media_paths = list(map(lambda arg: os.path.basename(arg[1]['path_file']), iteritems(states)))
-                sql = 'FROM tv_episodes_watched WHERE hide=1 AND label LIKE "%%{Emby}"'
-                my_db = db.DBConnection(row_type='dict')
-                files = my_db.select('SELECT location %s' % sql)
-                for i in filter(lambda f: os.path.basename(f['location']) not in media_paths, files):
-                    loc = i.get('location')
-                    if loc:
-                        my_db.select('DELETE %s AND location="%s"' % (sql, loc))
+                History.prune_watched_state(states, 'Emby')
 
                 MainHandler.update_watched_state(states, False)
 
             logger.log('Finished updating Emby watched episode states')
 
+    @staticmethod
+    def prune_watched_state(states, client):
+        # type: (Dict, AnyStr) -> None
+        """
+        remove hidden watched items of a client with a media file that is not in states
+
+        :param states: watched states of a client, a dict of dicts with a path_file key
+        :param client: client name in label, e.g. Emby or Plex
+        """
+        media_names = set(map(lambda arg: MainHandler._file_name(arg[1]['path_file']).lower(), iteritems(states)))
+        sql = 'FROM tv_episodes_watched WHERE hide=1 AND label LIKE ?'
+        label = '%%{%s}' % client
+        my_db = db.DBConnection(row_type='dict')
+        files = my_db.select('SELECT DISTINCT location %s' % sql, [label])
+        cl = [['DELETE %s AND location = ?' % sql, [label, cur_result['location']]] for cur_result in files
+              if cur_result['location'] and MainHandler._file_name(cur_result['location']).lower() not in media_names]
+        if cl:
+            my_db.mass_action(cl)
+
     @staticmethod
     def update_watched_state_plex():
 
@@ -8510,14 +8472,7 @@ class History(MainHandler):
 
             if states:
                 # Prune user removed items that are no longer being returned by API
-                media_paths = list(map(lambda arg: os.path.basename(arg[1]['path_file']), iteritems(states)))
-                sql = 'FROM tv_episodes_watched WHERE hide=1 AND label LIKE "%%{Plex}"'
-                my_db = db.DBConnection(row_type='dict')
-                files = my_db.select('SELECT location %s' % sql)
-                for i in filter(lambda f: os.path.basename(f['location']) not in media_paths, files):
-                    loc = i.get('location')
-                    if loc:
-                        my_db.select('DELETE %s AND location="%s"' % (sql, loc))
+                History.prune_watched_state(states, 'Plex')
 
                 MainHandler.update_watched_state(states, False)
 
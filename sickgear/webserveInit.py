@@ -9,6 +9,7 @@ from tornado.web import Application, _ApplicationRouter
 
 from . import logger, webapi, webserve
 from .helpers import create_https_certificates, re_valid_hostname
+from .static_assets import ASSETS
 import sickgear
 
 # noinspection PyUnreachableCode
@@ -90,6 +91,9 @@ class WebServer(threading.Thread):
             if update_cfg:
                 sickgear.save_config()
 
+        # fingerprint static assets for long-lived caching of their urls
+        ASSETS.build(self.options['data_root'], sickgear.CACHE_DIR)
+
         # Load the app
         self.app = MyApplication([],
                                  debug=True,